@@ -1,26 +1,149 @@
-from django.contrib import admin
-from .models import K2Model, KeplerModel, TESSModel, DF
+from django import forms
+from django.contrib import admin, messages
+from django.shortcuts import redirect, render
+from django.urls import path
+from .models import K2Model, KeplerModel, TESSModel, DF, PredictionJob, ExoplanetPrediction
+
+class CatalogueImportForm(forms.Form):
+    csv_file = forms.FileField(label="Archive CSV")
+    batch_size = forms.IntegerField(min_value=1, initial=1000)
+    strict = forms.BooleanField(required=False, help_text="Roll back the whole import on the first invalid row")
+    replace = forms.BooleanField(required=False, help_text="Delete existing rows before importing")
+
+class DFAdminForm(forms.ModelForm):
+    """
+    data - только ввод: таблица в JSON (записи, колонки или orient='split') разбирается в
+    DataFrame и сохраняется через set_frame в формате DF.storage; пустое поле не меняет таблицу.
+    """
+    class Meta:
+        model = DF
+        fields = ['mission', 'data']
+        help_texts = {'data': "JSON table (records, columns or split orient); replaces the stored frame"}
+
+    def clean_data(self):
+        from .frames import frame_from_json
+
+        data = self.cleaned_data['data']
+        if data is not None:
+            try:
+                self.frame = frame_from_json(data)
+            except (ValueError, TypeError) as e:
+                raise forms.ValidationError(f"Not a table: {e}")
+        return data
+
+class CatalogueImportMixin:
+    """
+    Кнопка "Import CSV" в списке модели миссии (потоковый bulk-импорт архивного CSV)
+    и действия пакетной оценки выбранных строк ("выбрать все" - вся таблица).
+    """
+    change_list_template = 'admin/aimodel/catalogue_change_list.html'
+    actions = ['score_level_1', 'score_level_2']
+    mission = None
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('import-csv/', self.admin_site.admin_view(self.import_csv_view), name='%s_%s_import_csv' % info),
+        ] + super().get_urls()
+
+    def import_csv_view(self, request):
+        from .importer import import_catalogue
+
+        if not self.has_add_permission(request):
+            return redirect('..')
+        form = CatalogueImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            try:
+                stats = import_catalogue(
+                    form.cleaned_data['csv_file'], self.mission,
+                    batch_size=form.cleaned_data['batch_size'],
+                    strict=form.cleaned_data['strict'],
+                    replace=form.cleaned_data['replace'],
+                )
+            except ValueError as e:
+                self.message_user(request, f"Import failed: {e}", messages.ERROR)
+            else:
+                self.message_user(request, (
+                    f"Imported {stats['imported']} of {stats['rows']} rows ({stats['skipped']} skipped) "
+                    f"in {stats['seconds']:.2f}s - {stats['rows_per_sec']:.0f} rows/sec"
+                ), messages.SUCCESS)
+                for row, message in stats['errors'].items():
+                    self.message_user(request, f"Row {row}: {message}", messages.WARNING)
+                return redirect('..')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': f"Import {self.model._meta.verbose_name_plural} from CSV",
+        }
+        return render(request, 'admin/aimodel/catalogue_import.html', context)
+
+    def _score(self, request, queryset, level):
+        from .scoring import score_mission_rows
+
+        stats = score_mission_rows(queryset, self.mission, level)
+        self.message_user(request, (
+            f"Scored {stats['rows']} rows with the level {level} model "
+            f"in {stats['seconds']:.2f}s - {stats['rows_per_sec']:.0f} rows/sec"
+        ), messages.SUCCESS)
+
+    @admin.action(description="Score selected rows with the level 1 model")
+    def score_level_1(self, request, queryset):
+        self._score(request, queryset, 1)
+
+    @admin.action(description="Score selected rows with the level 2 model")
+    def score_level_2(self, request, queryset):
+        self._score(request, queryset, 2)
 
 @admin.register(K2Model)
-class K2ModelAdmin(admin.ModelAdmin):
-    list_display = ['pl_orbper', 'pl_rade', 'st_teff', 'st_rad']
-    list_filter = ['st_teff']
+class K2ModelAdmin(CatalogueImportMixin, admin.ModelAdmin):
+    mission = 'k2'
+    list_display = ['pl_orbper', 'pl_rade', 'st_teff', 'st_rad', 'planet_probability', 'model_level']
+    list_filter = ['st_teff', 'model_level']
     search_fields = ['pl_orbper']
 
 @admin.register(KeplerModel)
-class KeplerModelAdmin(admin.ModelAdmin):
-    list_display = ['koi_period', 'koi_prad', 'koi_steff', 'koi_srad']
-    list_filter = ['koi_steff']
+class KeplerModelAdmin(CatalogueImportMixin, admin.ModelAdmin):
+    mission = 'kepler'
+    list_display = ['koi_period', 'koi_prad', 'koi_steff', 'koi_srad', 'planet_probability', 'model_level']
+    list_filter = ['koi_steff', 'model_level']
     search_fields = ['koi_period']
 
 @admin.register(TESSModel)
-class TESSModelAdmin(admin.ModelAdmin):
-    list_display = ['pl_orbper', 'pl_rade', 'st_teff', 'st_rad']
-    list_filter = ['st_teff']
+class TESSModelAdmin(CatalogueImportMixin, admin.ModelAdmin):
+    mission = 'tess'
+    list_display = ['pl_orbper', 'pl_rade', 'st_teff', 'st_rad', 'planet_probability', 'model_level']
+    list_filter = ['st_teff', 'model_level']
     search_fields = ['pl_orbper']
 
 @admin.register(DF)
 class DFAdmin(admin.ModelAdmin):
-    list_display = ['mission', 'created_at', 'updated_at']
-    list_filter = ['mission', 'created_at']
+    # Список строится только по метаданным: data и payload не читаются из БД
+    form = DFAdminForm
+    list_display = ['mission', 'storage', 'row_count', 'column_count', 'created_at', 'updated_at']
+    list_filter = ['mission', 'storage', 'created_at']
+    readonly_fields = ['storage', 'row_count', 'columns', 'payload_path', 'created_at', 'updated_at']
+
+    def save_model(self, request, obj, form, change):
+        frame = getattr(form, 'frame', None)
+        if frame is not None:
+            obj.set_frame(frame)
+        super().save_model(request, obj, form, change)
+
+    @admin.display(description='Columns')
+    def column_count(self, obj):
+        return len(obj.columns)
+
+@admin.register(PredictionJob)
+class PredictionJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'mission', 'model_level', 'status', 'processed_rows', 'total_rows', 'created_at']
+    list_filter = ['mission', 'model_level', 'status']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+@admin.register(ExoplanetPrediction)
+class ExoplanetPredictionAdmin(admin.ModelAdmin):
+    list_display = ['mission', 'model_level', 'planet_probability', 'prediction_status', 'status', 'created_at']
+    list_filter = ['mission', 'model_level', 'status']
+    raw_id_fields = ['job']
     readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
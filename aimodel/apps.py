@@ -1,6 +1,41 @@
+import os
+import sys
+import logging
+
 from django.apps import AppConfig
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+def _is_runserver() -> bool:
+    """Процесс - runserver, а не родитель автоперезагрузчика"""
+    if os.path.basename(sys.argv[0]) != 'manage.py' or len(sys.argv) < 2 or sys.argv[1] != 'runserver':
+        return False
+    return '--noreload' in sys.argv or os.environ.get('RUN_MAIN') == 'true'
+
+
+def on_server_start():
+    """Запуск процесса-сервера (drf_server/wsgi.py, asgi.py): прерванные задания и прогрев моделей"""
+    from .jobs import fail_stale_jobs
+    from .warmup import start_configured_warmup
+
+    try:
+        fail_stale_jobs()
+    except DatabaseError:
+        # Ещё не применённые миграции не мешают серверу стартовать
+        logger.exception("Could not check for interrupted prediction jobs")
+    start_configured_warmup()
 
 
 class AimodelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'aimodel'
+
+    def ready(self):
+        # WSGI/ASGI-серверы запускают прогрев из drf_server/wsgi.py и asgi.py (on_server_start);
+        # migrate, test, shell, скрипты с django.setup() и воркеры его не запускают. Прерванные
+        # задания при runserver помечаются при первом запросе их статуса (БД здесь трогать рано)
+        if _is_runserver():
+            from .warmup import start_configured_warmup
+            start_configured_warmup()
@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Windows: пиковый RSS не измеряется
+    resource = None
+
+from .registry import LEVELS, MISSIONS, MODELS_DIR, get_registry, normalize_mission
+from .transform_to_log import EXAMPLE_SAMPLES, predict_exoplanet, predict_exoplanet_batch
+
+# Модуль не импортирует Django: холодный старт замеряется в отдельном интерпретаторе
+COLD_START_CODE = (
+    "import sys, time; started = time.perf_counter(); import catboost, sklearn.preprocessing; "
+    "from aimodel.benchmarks import _cold_start; _cold_start(started, *sys.argv[1:])"
+)
+
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+
+
+def synthetic_frame(mission: str, rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Синтетические входные строки миссии для бенчмарков: поля K2Model / KeplerModel / TESSModel
+    со значениями EXAMPLE_SAMPLES и логнормальным разбросом; знак поля сохраняется,
+    целочисленные поля (koi_num_transits) остаются целыми.
+    """
+    sample = EXAMPLE_SAMPLES[normalize_mission(mission)]
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, value in sample.items():
+        values = value * rng.lognormal(0.0, 0.3, rows) if value else rng.normal(0.0, 1.0, rows)
+        columns[name] = np.rint(values).astype(np.int64) if isinstance(value, int) else values
+    return pd.DataFrame(columns)
+
+
+def _latency_stats(timings: list) -> dict:
+    timings = sorted(timings)
+    return {
+        "n": len(timings),
+        "mean_ms": round(statistics.mean(timings) * 1000, 4),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 4),
+        "p99_ms": round(timings[int(len(timings) * 0.99)] * 1000, 4),
+        "max_ms": round(timings[-1] * 1000, 4),
+    }
+
+
+def measure_single(mission: str, level: int, samples: int = 200, seed: int = 0, base_dir=MODELS_DIR) -> dict:
+    """Задержка predict_exoplanet на одном образце, по разным синтетическим строкам"""
+    records = synthetic_frame(mission, samples, seed).to_dict("records")
+    predict_exoplanet(records[0], mission, level, base_dir)
+    timings = []
+    for record in records:
+        started = time.perf_counter()
+        predict_exoplanet(record, mission, level, base_dir)
+        timings.append(time.perf_counter() - started)
+    return _latency_stats(timings)
+
+
+def measure_batch(mission: str, level: int, sizes=BATCH_SIZES, repeat: int = 3, seed: int = 0,
+                  base_dir=MODELS_DIR) -> list:
+    """Пропускная способность predict_exoplanet_batch; по каждому размеру берётся лучший из repeat прогонов"""
+    frame = synthetic_frame(mission, max(sizes), seed)
+    results = []
+    for size in sizes:
+        batch = frame.iloc[:size]
+        predict_exoplanet_batch(batch, mission, level, base_dir)
+        best = min(_timed(predict_exoplanet_batch, batch, mission, level, base_dir) for _ in range(repeat))
+        results.append({
+            "size": size,
+            "best_ms": round(best * 1000, 4),
+            "rows_per_sec": round(size / best, 1),
+        })
+    return results
+
+
+def _timed(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def measure_cold_start(mission: str, level: int, memory_rows: int = 100000, seed: int = 0,
+                       base_dir=MODELS_DIR) -> dict:
+    """
+    Холодный старт и пик памяти в свежем интерпретаторе: импорт ML-стека, загрузка модели,
+    первое и второе предсказание, затем пакет из memory_rows строк.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START_CODE, mission, str(level), str(memory_rows), str(seed), base_dir],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _peak_rss_bytes():
+    """Пиковый RSS процесса в байтах или None без модуля resource"""
+    if resource is None:
+        return None
+    # ru_maxrss в macOS - в байтах, в Linux и BSD - в килобайтах
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _cold_start(import_started: float, mission: str, level: str, memory_rows: str, seed: str, base_dir: str):
+    # Выполняется в дочернем интерпретаторе: ML-стек уже импортирован, модель ещё не загружена
+    imported = time.perf_counter() - import_started
+    level, memory_rows, seed = int(level), int(memory_rows), int(seed)
+    started = time.perf_counter()
+    entry = get_registry(base_dir).get(mission, level)
+    load = time.perf_counter() - started
+
+    sample = synthetic_frame(mission, 1, seed).to_dict("records")[0]
+    first = _timed(predict_exoplanet, sample, mission, level, base_dir)
+    second = _timed(predict_exoplanet, sample, mission, level, base_dir)
+
+    frame = synthetic_frame(mission, memory_rows, seed)
+    rss_before = _peak_rss_bytes()
+    tracemalloc.start()
+    batch = _timed(predict_exoplanet_batch, frame, mission, level, base_dir)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _peak_rss_bytes()
+
+    print(json.dumps({
+        "import_ms": round(imported * 1000, 3),
+        "model_load_ms": round(load * 1000, 3),
+        "first_predict_ms": round(first * 1000, 3),
+        "warm_predict_ms": round(second * 1000, 3),
+        "model_rss_bytes": entry.memory_bytes,
+        "memory_rows": memory_rows,
+        "memory_batch_ms": round(batch * 1000, 3),
+        "peak_rss_bytes": rss_after,
+        "batch_rss_growth_bytes": rss_after - rss_before if rss_after is not None else None,
+        "batch_traced_peak_bytes": traced_peak,
+    }))
+
+
+def environment() -> dict:
+    import sklearn
+    import catboost
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "catboost": catboost.__version__,
+    }
+
+
+def run_suite(models=None, single_samples: int = 200, batch_sizes=BATCH_SIZES, repeat: int = 3,
+              memory_rows: int = 100000, seed: int = 0, cold: bool = True, base_dir=MODELS_DIR) -> dict:
+    """Полный прогон по парам (mission, level); результат - JSON-совместимый словарь"""
+    models = models or [(mission, level) for mission in MISSIONS for level in LEVELS]
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "parameters": {
+            "single_samples": single_samples,
+            "batch_sizes": list(batch_sizes),
+            "repeat": repeat,
+            "memory_rows": memory_rows,
+            "seed": seed,
+        },
+        "models": [],
+    }
+    for mission, level in models:
+        mission = normalize_mission(mission)
+        result = {"mission": mission, "level": level}
+        if cold:
+            # До тёплых замеров: дочерний процесс не зависит от состояния текущего
+            result["cold"] = measure_cold_start(mission, level, memory_rows, seed, base_dir)
+        result["single"] = measure_single(mission, level, single_samples, seed, base_dir)
+        result["batch"] = measure_batch(mission, level, batch_sizes, repeat, seed, base_dir)
+        report["models"].append(result)
+    return report
+
+
+# Метрики для сравнения прогонов: путь в результате модели и направление "лучше"
+COMPARED_METRICS = {
+    ("single", "p50_ms"): "lower",
+    ("single", "p95_ms"): "lower",
+    ("cold", "model_load_ms"): "lower",
+    ("cold", "first_predict_ms"): "lower",
+    ("cold", "peak_rss_bytes"): "lower",
+}
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float = 0.2) -> list:
+    """
+    Изменения метрик относительно baseline: [{model, metric, baseline, current, change, regression}].
+    Регрессия - ухудшение больше чем на tolerance (доля).
+    """
+    def flatten(model_result):
+        values = {}
+        for (section, key), direction in COMPARED_METRICS.items():
+            if key in model_result.get(section, {}):
+                values[f"{section}.{key}"] = (model_result[section][key], direction)
+        for row in model_result.get("batch", []):
+            values[f"batch.{row['size']}.rows_per_sec"] = (row["rows_per_sec"], "higher")
+        return values
+
+    baseline_models = {(m["mission"], m["level"]): flatten(m) for m in baseline["models"]}
+    changes = []
+    for model_result in current["models"]:
+        key = (model_result["mission"], model_result["level"])
+        previous = baseline_models.get(key, {})
+        for metric, (value, direction) in flatten(model_result).items():
+            # Метрика, не измеренная в одном из прогонов (peak RSS без resource), не сравнивается
+            if value is None or metric not in previous or not previous[metric][0]:
+                continue
+            old = previous[metric][0]
+            change = (value - old) / old
+            worse = change > tolerance if direction == "lower" else change < -tolerance
+            changes.append({
+                "model": f"{key[0]} level {key[1]}",
+                "metric": metric,
+                "baseline": old,
+                "current": value,
+                "change": round(change, 4),
+                "regression": worse,
+            })
+    return changes
+
@@ -0,0 +1,153 @@
+import sys
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MAX_ENTRIES': 10000,
+    'MAX_BYTES': 16 * 1024 * 1024,
+    'TTL': 3600,
+    'CHECK_INTERVAL': 5,
+    'DJANGO_CACHE': None,
+}
+
+
+class PredictionCache:
+    """
+    LRU/TTL-кэш результатов predict_exoplanet.
+    Ключ: (mission, level, отпечаток файлов модели, канонический вектор признаков).
+    Первый уровень - память процесса, второй (опционально) - кэш Django,
+    общий для всех воркеров.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=16 * 1024 * 1024, ttl=3600,
+                 check_interval=5, django_cache=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.django_cache = django_cache
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._checked_at = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(mission: str, level: int, fingerprint: str, features) -> str:
+        # +0.0 сводит -0.0 к 0.0, чтобы одинаковые по значению векторы давали один ключ
+        digest = hashlib.blake2b((features + 0.0).tobytes(), digest_size=16).hexdigest()
+        return f"exoplanet:{mission}:{level}:{fingerprint}:{digest}"
+
+    def refresh_entry(self, registry, mission: str, level: int):
+        """Запись реестра; не чаще раза в check_interval сверяет файлы models_pkl с диском"""
+        now = time.monotonic()
+        key = (registry.base_dir, mission, level)
+        if now - self._checked_at.get(key, float('-inf')) < self.check_interval:
+            return registry.get(mission, level)
+        self._checked_at[key] = now
+        return registry.refresh_if_changed(mission, level)
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                expires_at, result, size = item
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(result)
+                self._remove(key)
+                self.expirations += 1
+
+        if self.django_cache is not None:
+            result = self.django_cache.get(key)
+            if result is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                self._store(key, result)
+                return dict(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, result: dict):
+        self._store(key, result)
+        if self.django_cache is not None:
+            self.django_cache.set(key, result, timeout=self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _store(self, key: str, result: dict):
+        result = dict(result)
+        size = sys.getsizeof(key) + sys.getsizeof(result) + sum(sys.getsizeof(v) for v in result.values())
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, result, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Кэш из settings.AIMODEL_PREDICTION_CACHE или None, если он выключен"""
+    global _cache
+    if _cache is None:
+        from django.conf import settings
+
+        if not settings.configured:
+            return None
+        config = {**DEFAULTS, **getattr(settings, 'AIMODEL_PREDICTION_CACHE', {})}
+        if not config['ENABLED']:
+            return None
+        with _cache_lock:
+            if _cache is None:
+                django_cache = None
+                if config['DJANGO_CACHE']:
+                    from django.core.cache import caches
+                    django_cache = caches[config['DJANGO_CACHE']]
+                _cache = PredictionCache(
+                    max_entries=config['MAX_ENTRIES'],
+                    max_bytes=config['MAX_BYTES'],
+                    ttl=config['TTL'],
+                    check_interval=config['CHECK_INTERVAL'],
+                    django_cache=django_cache,
+                )
+                logger.info("Prediction cache enabled: %s", config)
+    return _cache
@@ -0,0 +1,169 @@
+import numpy as np
+
+from .registry import normalize_mission
+
+
+class FeatureSpec:
+    """
+    Скомпилированное описание признаков миссии: порядок колонок модели и какие
+    из них считаются как log1p(x) / log1p(|x|). Один образец превращается в
+    numpy-вектор без pandas, с тем же результатом, что transform_and_scale.
+    """
+
+    def __init__(self, mission: str, columns: list, log_features: list):
+        self.mission = mission
+        self.columns = tuple(columns)
+        self.size = len(self.columns)
+
+        index = {name: i for i, name in enumerate(self.columns)}
+        log_outputs = {output for output, _, _ in log_features}
+        # Сырые входные поля: всё, что не вычисляется из других колонок
+        self.inputs = tuple((name, index[name]) for name in self.columns if name not in log_outputs)
+        self.required = tuple(source for _, source, _ in log_features)
+
+        self._log_out = np.array([index[output] for output, _, _ in log_features], dtype=np.intp)
+        self._log_src = np.array([index[source] for _, source, _ in log_features], dtype=np.intp)
+        self._log_abs = np.array([use_abs for _, _, use_abs in log_features], dtype=bool)
+
+    def transform(self, sample: dict, out=None) -> np.ndarray:
+        """Признаки одного образца; пропуски заполняются нулями, как fillna(0)"""
+        for name in self.required:
+            if name not in sample:
+                raise KeyError(name)
+
+        x = np.empty(self.size, dtype=np.float64) if out is None else out
+        for name, i in self.inputs:
+            value = sample.get(name)
+            x[i] = np.nan if value is None else value
+
+        source = x[self._log_src]
+        np.abs(source, out=source, where=self._log_abs)
+        x[self._log_out] = np.log1p(source)
+        x[np.isnan(x)] = 0.0
+        return x
+
+    def scale(self, x: np.ndarray, scaler) -> np.ndarray:
+        """StandardScaler.transform на месте, по сохранённым mean_/scale_"""
+        self._check_scaler(scaler)
+        if scaler.with_mean:
+            x -= scaler.mean_
+        if scaler.with_std:
+            x /= scaler.scale_
+        return x
+
+    def matrix(self, columns: dict, rows: int, scaler) -> np.ndarray:
+        """
+        Стандартизированная матрица признаков float32 в порядке колонок модели из колонок
+        {поле: массив float}. Каждая колонка считается в float64 и только потом пишется
+        в float32 - ровно то приведение, которое CatBoost делал бы сам. Порядок Fortran:
+        CatBoost читает данные по признакам, и с C-порядком predict_proba заметно медленнее.
+        """
+        self._check_scaler(scaler)
+        for name in self.required:
+            if name not in columns:
+                raise KeyError(name)
+
+        X = np.empty((rows, self.size), dtype=np.float32, order='F')
+        for name, i in self.inputs:
+            values = columns.get(name)
+            column = np.full(rows, np.nan) if values is None else np.array(values, dtype=np.float64)
+            self._store(X, i, column, scaler)
+        for i, j, use_abs in zip(self._log_out, self._log_src, self._log_abs):
+            source = np.asarray(columns[self.columns[j]], dtype=np.float64)
+            self._store(X, i, np.log1p(np.abs(source) if use_abs else source), scaler)
+        return X
+
+    def check_model(self, model, scaler):
+        """Порядок признаков, сохранённый в модели и скейлере, должен совпадать со спецификацией"""
+        self._check_scaler(scaler)
+        for owner, names in (("Модель", model.feature_names_), ("Скейлер", getattr(scaler, "feature_names_in_", None))):
+            if names is not None and tuple(names) != self.columns:
+                raise ValueError(
+                    f"{owner} {self.mission}: признаки {list(names)} не совпадают со спецификацией {list(self.columns)}"
+                )
+
+    def _check_scaler(self, scaler):
+        if scaler.n_features_in_ != self.size:
+            raise ValueError(
+                f"Скейлер ожидает {scaler.n_features_in_} признаков, а спецификация {self.mission} даёт {self.size}"
+            )
+
+    @staticmethod
+    def _store(X, i, column, scaler):
+        # Тот же порядок, что у pandas-пути: fillna(0), затем (x - mean) / scale
+        column[np.isnan(column)] = 0.0
+        if scaler.with_mean:
+            column -= scaler.mean_[i]
+        if scaler.with_std:
+            column /= scaler.scale_[i]
+        X[:, i] = column
+
+
+FEATURE_SPECS = {
+    "k2": FeatureSpec(
+        "k2",
+        columns=[
+            'pl_orbper', 'pl_trandur', 'pl_rade', 'pl_ratror',
+            'st_teff', 'st_rad', 'sy_pmra', 'sy_pmdec', 'sy_dist',
+            'sy_gaiamag', 'sy_tmag', 'sy_kepmag',
+            'log_pl_orbper', 'log_pl_trandur', 'log_pl_rade',
+            'log_pl_ratror', 'log_sy_dist', 'log_abs_sy_pmra',
+            'log_abs_sy_pmdec',
+        ],
+        log_features=[
+            ('log_pl_orbper', 'pl_orbper', False),
+            ('log_pl_trandur', 'pl_trandur', False),
+            ('log_pl_rade', 'pl_rade', False),
+            ('log_pl_ratror', 'pl_ratror', False),
+            ('log_sy_dist', 'sy_dist', False),
+            ('log_abs_sy_pmra', 'sy_pmra', True),
+            ('log_abs_sy_pmdec', 'sy_pmdec', True),
+        ],
+    ),
+    "kepler": FeatureSpec(
+        "kepler",
+        columns=[
+            'koi_period', 'koi_duration', 'koi_depth', 'koi_ror', 'koi_dor',
+            'koi_incl', 'koi_impact', 'koi_prad', 'koi_sma', 'koi_teq',
+            'koi_insol', 'koi_model_snr', 'koi_num_transits', 'koi_max_sngle_ev',
+            'koi_steff', 'koi_slogg', 'koi_smet', 'koi_srad', 'koi_smass',
+            'koi_srho', 'koi_count', 'koi_kepmag', 'koi_gmag', 'koi_rmag', 'koi_imag',
+            'koi_zmag', 'koi_jmag', 'koi_hmag', 'koi_kmag',
+            'log_koi_period', 'log_koi_depth', 'log_koi_dor',
+            'log_koi_ror', 'log_koi_prad', 'log_koi_model_snr',
+            'log_koi_max_sngle_ev', 'log_koi_num_transits',
+        ],
+        log_features=[
+            ('log_koi_period', 'koi_period', False),
+            ('log_koi_depth', 'koi_depth', False),
+            ('log_koi_dor', 'koi_dor', False),
+            ('log_koi_ror', 'koi_ror', False),
+            ('log_koi_prad', 'koi_prad', False),
+            ('log_koi_model_snr', 'koi_model_snr', False),
+            ('log_koi_max_sngle_ev', 'koi_max_sngle_ev', False),
+            ('log_koi_num_transits', 'koi_num_transits', False),
+        ],
+    ),
+    "tess": FeatureSpec(
+        "tess",
+        columns=[
+            'pl_orbper', 'pl_trandurh', 'pl_trandeperr1', 'pl_trandep',
+            'pl_rade', 'pl_eqt', 'st_teff', 'st_logg', 'st_rad',
+            'st_tmag', 'st_dist', 'log_pl_orbper', 'log_pl_trandeperr1',
+            'log_st_teff', 'log_st_logg',
+        ],
+        log_features=[
+            ('log_pl_orbper', 'pl_orbper', False),
+            ('log_pl_trandeperr1', 'pl_trandeperr1', True),
+            ('log_st_teff', 'st_teff', False),
+            ('log_st_logg', 'st_logg', False),
+        ],
+    ),
+}
+
+
+def get_feature_spec(mission: str) -> FeatureSpec:
+    prefix = normalize_mission(mission)
+    if prefix not in FEATURE_SPECS:
+        raise ValueError(f"Неизвестная миссия: {mission}")
+    return FEATURE_SPECS[prefix]
@@ -0,0 +1,101 @@
+import io
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Хранение DataFrame по колонкам: колонка i лежит массивом "c{i}", маска пропусков
+# строковой колонки - массивом "c{i}_null". Имена колонок хранятся отдельно (DF.columns),
+# поэтому в ключах npz нет произвольных строк.
+NULL_SUFFIX = "_null"
+
+
+def column_key(index: int) -> str:
+    return f"c{index}"
+
+
+def encode_frame(frame: pd.DataFrame) -> tuple:
+    """DataFrame -> (имена колонок, {ключ: numpy-массив}) без object-массивов и pickle"""
+    arrays = {}
+    for i, name in enumerate(frame.columns):
+        values = frame[name]
+        if values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == "string":
+            missing = values.isna().to_numpy()
+            arrays[column_key(i)] = values.astype(object).where(~missing, "").astype(str).to_numpy().astype(str)
+            if missing.any():
+                arrays[column_key(i) + NULL_SUFFIX] = missing
+        elif isinstance(values.dtype, pd.DatetimeTZDtype):
+            # datetime64 с часовым поясом numpy хранит только объектами (pickle): пишем
+            # int64 наносекунд от эпохи UTC
+            arrays[column_key(i)] = values.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy().astype("int64")
+        else:
+            arrays[column_key(i)] = values.to_numpy()
+            if arrays[column_key(i)].dtype == object:
+                raise ValueError(f"Column {name!r} of dtype {values.dtype} can not be stored without pickle")
+    return [str(name) for name in frame.columns], arrays
+
+
+def decode_column(values: np.ndarray, missing=None) -> np.ndarray:
+    if missing is None:
+        return values
+    values = values.astype(object)
+    values[np.asarray(missing)] = None
+    return values
+
+
+def dumps_npz(frame: pd.DataFrame) -> tuple:
+    """DataFrame -> (имена колонок, байты сжатого .npz) для BLOB-хранения"""
+    columns, arrays = encode_frame(frame)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return columns, buffer.getvalue()
+
+
+def open_npz(payload: bytes):
+    """Ленивое чтение .npz: каждая колонка распаковывается только при обращении к ней"""
+    return np.load(io.BytesIO(bytes(payload)), allow_pickle=False)
+
+
+def loads_npz(payload: bytes, columns: list) -> pd.DataFrame:
+    with open_npz(payload) as npz:
+        return pd.DataFrame({name: read_npz_column(npz, i) for i, name in enumerate(columns)}, columns=columns)
+
+
+def write_npy_dir(frame: pd.DataFrame, path: str) -> list:
+    """Колонки отдельными несжатыми .npy-файлами: их можно читать через mmap"""
+    columns, arrays = encode_frame(frame)
+    os.makedirs(path, exist_ok=True)
+    for key, values in arrays.items():
+        np.save(os.path.join(path, f"{key}.npy"), values, allow_pickle=False)
+    return columns
+
+
+def read_npy_column(path: str, index: int) -> np.ndarray:
+    key = column_key(index)
+    # mmap: страницы файла читаются ОС по мере обращения, весь столбец в память не копируется
+    values = np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r", allow_pickle=False)
+    null_path = os.path.join(path, f"{key}{NULL_SUFFIX}.npy")
+    return decode_column(values, np.load(null_path) if os.path.exists(null_path) else None)
+
+
+def read_npz_column(npz, index: int) -> np.ndarray:
+    key = column_key(index)
+    null_key = key + NULL_SUFFIX
+    return decode_column(npz[key], npz[null_key] if null_key in npz.files else None)
+
+
+def remove_npy_dir(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def frame_from_json(data) -> pd.DataFrame:
+    """Старый формат DF.data: список записей, словарь колонок или orient='split'"""
+    if isinstance(data, dict) and "columns" in data and "data" in data:
+        return pd.DataFrame(data["data"], columns=data["columns"], index=data.get("index"))
+    return pd.DataFrame(data)
+
+
+def frame_to_json(frame: pd.DataFrame) -> list:
+    """DataFrame -> список записей, пригодный для JSONField (NaN -> None)"""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
@@ -0,0 +1,132 @@
+import time
+import logging
+from contextlib import nullcontext
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+from django.db import models, transaction
+
+from .models import K2Model, KeplerModel, TESSModel
+
+logger = logging.getLogger(__name__)
+
+MISSION_MODELS = {
+    'k2': K2Model,
+    'kepler': KeplerModel,
+    'tess': TESSModel,
+}
+# Сколько сообщений об ошибках строк сохранять в отчёте
+MAX_REPORTED_ERRORS = 20
+
+
+def catalogue_fields(model) -> dict:
+    """
+    Поля модели миссии, заполняемые из каталога: {имя: поле}.
+    Это обязательные числовые поля; служебные (nullable) поля в CSV не ищутся.
+    """
+    return {
+        field.name: field for field in model._meta.concrete_fields
+        if isinstance(field, (models.FloatField, models.IntegerField)) and not field.primary_key and not field.null
+    }
+
+
+def validate_chunk(frame: pd.DataFrame, fields: dict, offset: int = 0) -> tuple:
+    """
+    Векторная проверка куска CSV: числа, обязательные значения, целые для IntegerField.
+    Возвращает (валидные строки с приведёнными типами, {номер строки: сообщение}).
+    """
+    invalid = pd.Series(False, index=frame.index)
+    messages = pd.Series("", index=frame.index)
+    clean = {}
+    for name, field in fields.items():
+        values = frame[name]
+        numeric = pd.to_numeric(values, errors='coerce')
+        for bad, message in (
+            (values.notna() & numeric.isna(), f"Non-numeric value for {name}"),
+            (values.isna(), f"Missing value for {name}"),
+            (np.isinf(numeric), f"Infinite value for {name}"),
+        ):
+            messages[bad & ~invalid] = message
+            invalid |= bad
+        if isinstance(field, models.IntegerField):
+            fractional = numeric.notna() & (numeric % 1 != 0)
+            messages[fractional & ~invalid] = f"Non-integer value for {name}"
+            invalid |= fractional
+        clean[name] = numeric
+
+    frame = pd.DataFrame(clean)[~invalid]
+    for name, field in fields.items():
+        if isinstance(field, models.IntegerField):
+            frame[name] = frame[name].astype(np.int64)
+    errors = {offset + i: message for i, message in messages[invalid].items()}
+    return frame, errors
+
+
+def import_catalogue(source, mission: str, batch_size: int = 1000, chunk_size: int = 10000,
+                     column_map=None, strict: bool = False, replace: bool = False, progress=None) -> dict:
+    """
+    Потоковый импорт CSV из NASA Exoplanet Archive в таблицу миссии.
+    Файл читается кусками по chunk_size строк; каждый кусок проверяется целиком и пишется
+    bulk_create пачками по batch_size в своей транзакции. strict - первая невалидная строка
+    откатывает весь импорт; replace - таблица очищается в той же транзакции, что и импорт.
+    column_map переименовывает колонки файла: {колонка CSV: поле модели}.
+    """
+    model = MISSION_MODELS[mission]
+    fields = catalogue_fields(model)
+    column_map = column_map or {}
+
+    stats = {'rows': 0, 'imported': 0, 'skipped': 0, 'errors': {}, 'seconds': 0.0, 'rows_per_sec': 0.0}
+    started = time.perf_counter()
+
+    # Одна транзакция на весь импорт нужна только для strict и replace: иначе - на каждый кусок
+    with transaction.atomic() if strict or replace else nullcontext():
+        if replace:
+            model.objects.all().delete()
+
+        try:
+            chunks = pd.read_csv(
+                source, chunksize=chunk_size, comment='#', dtype=str,
+                # Лишние колонки архива (ошибки измерений, флаги) не читаются вовсе
+                usecols=lambda column: column_map.get(column, column) in fields,
+            )
+            # Заголовок проверяется до цикла: файл без строк данных тоже должен его иметь
+            first = next(chunks)
+        except (pd.errors.EmptyDataError, StopIteration):
+            raise ValueError("CSV has no header row") from None
+        missing = [name for name in fields if name not in first.rename(columns=column_map).columns]
+        if missing:
+            raise ValueError(f"Columns not in CSV: {', '.join(missing)}")
+
+        for chunk in chain([first], chunks):
+            chunk = chunk.rename(columns=column_map)
+            offset = stats['rows']
+            chunk.index = range(len(chunk))
+            valid, errors = validate_chunk(chunk, fields, offset)
+            if errors and strict:
+                row, message = next(iter(errors.items()))
+                raise ValueError(f"Row {row}: {message}")
+
+            objects = [model(**row) for row in valid.to_dict('records')]
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=batch_size)
+
+            stats['rows'] += len(chunk)
+            stats['imported'] += len(objects)
+            stats['skipped'] += len(errors)
+            for row, message in errors.items():
+                if len(stats['errors']) >= MAX_REPORTED_ERRORS:
+                    break
+                stats['errors'][row] = message
+
+            stats['seconds'] = time.perf_counter() - started
+            stats['rows_per_sec'] = stats['rows'] / max(stats['seconds'], 1e-9)
+            if progress:
+                progress(stats)
+
+    logger.info(
+        f"Imported {stats['imported']} {mission} rows ({stats['skipped']} skipped) "
+        f"in {stats['seconds']:.2f}s - {stats['rows_per_sec']:.0f} rows/sec"
+    )
+    return stats
+
@@ -0,0 +1,130 @@
+import os
+import csv
+import logging
+import threading
+from datetime import timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import ExoplanetPrediction, PredictionJob
+from .pool import score_chunks
+from .utils import classify_probability
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = ['index', 'planet_prob', 'non_planet_prob', 'error']
+
+
+def jobs_dir() -> str:
+    path = str(getattr(settings, 'AIMODEL_JOBS_DIR', os.path.join(settings.BASE_DIR, 'prediction_jobs')))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def input_path_for(job_id) -> str:
+    return os.path.join(jobs_dir(), f"{job_id}_input.csv")
+
+
+def start_job(job: PredictionJob) -> threading.Thread:
+    """Запускает обработку задания в фоновом потоке; расчёт идёт в пуле процессов"""
+    thread = threading.Thread(target=run_job, args=(job.pk,), name=f"prediction-job-{job.pk}", daemon=True)
+    thread.start()
+    return thread
+
+
+def run_job(job_id):
+    job = PredictionJob.objects.get(pk=job_id)
+    workers = getattr(settings, 'AIMODEL_JOB_WORKERS', 2)
+    chunk_size = getattr(settings, 'AIMODEL_JOB_CHUNK_SIZE', 5000)
+
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.result_path = os.path.join(jobs_dir(), f"{job.pk}_results.csv")
+    job.save(update_fields=['status', 'started_at', 'result_path', 'updated_at'])
+
+    try:
+        job.total_rows = _count_rows(job.input_path, chunk_size)
+        job.save(update_fields=['total_rows', 'updated_at'])
+        logger.info(f"Prediction job {job.pk}: {job.total_rows} rows, {workers} workers, chunks of {chunk_size}")
+
+        with open(job.result_path, 'w', newline='') as result_file:
+            writer = csv.writer(result_file)
+            writer.writerow(RESULT_COLUMNS)
+
+            offset = 0
+            chunks = pd.read_csv(job.input_path, chunksize=chunk_size)
+            for chunk, results in score_chunks(chunks, job.mission, job.model_level, workers):
+                _write_chunk(job, writer, offset, chunk, results)
+                offset += len(chunk)
+
+        job.status = 'success'
+    except Exception as e:
+        logger.exception(f"Prediction job {job.pk} failed")
+        job.status = 'error'
+        job.error_message = str(e)
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'finished_at', 'updated_at'])
+        connection.close()
+
+
+def _write_chunk(job, writer, offset, chunk, results):
+    # NaN из CSV в JSONField не сохраняется как валидный JSON
+    records = chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+
+    predictions = []
+    error_rows = 0
+    for result, record in zip(results, records):
+        index = offset + result['index']
+        if 'error' in result:
+            error_rows += 1
+            writer.writerow([index, '', '', result['error']])
+            predictions.append(ExoplanetPrediction(
+                job=job, row_index=index, mission=job.mission, model_level=job.model_level,
+                input_data=record, status='error', recommendation=result['error'],
+            ))
+            continue
+
+        writer.writerow([index, result['planet_prob'], result['non_planet_prob'], ''])
+        verdict = classify_probability(result['planet_prob'])
+        predictions.append(ExoplanetPrediction(
+            job=job, row_index=index, mission=job.mission, model_level=job.model_level,
+            input_data=record,
+            planet_probability=result['planet_prob'],
+            non_planet_probability=result['non_planet_prob'],
+            confidence_level=verdict['confidence'],
+            prediction_status=verdict['status'],
+            recommendation=verdict['recommendation'],
+        ))
+
+    ExoplanetPrediction.objects.bulk_create(predictions, batch_size=1000)
+    job.processed_rows += len(results)
+    job.error_rows += error_rows
+    job.save(update_fields=['processed_rows', 'error_rows', 'updated_at'])
+
+
+def _count_rows(path, chunk_size=5000) -> int:
+    """Строки CSV по разобранным кускам: поле в кавычках может занимать несколько строк файла"""
+    try:
+        return sum(len(chunk) for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=[0]))
+    except pd.errors.EmptyDataError:
+        return 0
+
+
+def fail_stale_jobs(queryset=None) -> int:
+    """
+    Помечает ошибкой задания pending/running без пульса дольше AIMODEL_JOB_STALE_AFTER секунд:
+    их поток погиб вместе с процессом (перезапуск, OOM), и сами они не завершатся.
+    """
+    now = timezone.now()
+    stale_after = timedelta(seconds=getattr(settings, 'AIMODEL_JOB_STALE_AFTER', 600))
+    queryset = PredictionJob.objects.all() if queryset is None else queryset
+    count = queryset.filter(status__in=['pending', 'running'], updated_at__lt=now - stale_after).update(
+        status='error', error_message='Job was interrupted by a server restart', finished_at=now, updated_at=now,
+    )
+    if count:
+        logger.warning(f"Marked {count} interrupted prediction jobs as failed")
+    return count
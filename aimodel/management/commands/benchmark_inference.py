@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aimodel.benchmarks import BATCH_SIZES, compare_reports, run_suite
+from aimodel.registry import LEVELS, MISSIONS
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the exoplanet models: single-sample latency, batch throughput, cold start and "
+        "memory peak per mission/level, written as JSON and optionally compared with a baseline run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mission', action='append', choices=MISSIONS, dest='missions',
+                            help="Mission to benchmark (repeatable, default: all)")
+        parser.add_argument('--level', action='append', type=int, choices=LEVELS, dest='levels',
+                            help="Model level to benchmark (repeatable, default: all)")
+        parser.add_argument('--single-samples', type=int, default=200)
+        parser.add_argument('--batch-sizes', default=','.join(map(str, BATCH_SIZES)),
+                            help="Comma-separated batch sizes")
+        parser.add_argument('--repeat', type=int, default=3, help="Timed runs per batch size; the best is kept")
+        parser.add_argument('--memory-rows', type=int, default=100000, help="Rows in the cold-start memory batch")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--no-cold', action='store_true', help="Skip cold start and memory measurements")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+        parser.add_argument('--compare', help="Baseline JSON report to compare against")
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Relative slowdown counted as a regression (default 0.2 = 20%%)")
+
+    def handle(self, *args, **options):
+        try:
+            batch_sizes = [int(size) for size in options['batch_sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--batch-sizes must be comma-separated integers")
+        if min(batch_sizes) < 1 or options['single_samples'] < 1 or options['repeat'] < 1 or options['memory_rows'] < 1:
+            raise CommandError("Sizes, samples, repeat and memory rows must be positive")
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        models = [
+            (mission, level)
+            for mission in options['missions'] or MISSIONS
+            for level in options['levels'] or LEVELS
+        ]
+        report = run_suite(
+            models,
+            single_samples=options['single_samples'],
+            batch_sizes=batch_sizes,
+            repeat=options['repeat'],
+            memory_rows=options['memory_rows'],
+            seed=options['seed'],
+            cold=not options['no_cold'],
+        )
+
+        if baseline is not None:
+            report['comparison'] = compare_reports(baseline, report, options['tolerance'])
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Benchmark report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        regressions = [change for change in report.get('comparison', []) if change['regression']]
+        for change in regressions:
+            self.stderr.write(
+                f"REGRESSION {change['model']} {change['metric']}: "
+                f"{change['baseline']} -> {change['current']} ({change['change']:+.1%})"
+            )
+        if regressions:
+            raise CommandError(f"{len(regressions)} metrics regressed by more than {options['tolerance']:.0%}")
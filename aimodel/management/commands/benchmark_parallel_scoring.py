@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aimodel.benchmarks import synthetic_frame
+from aimodel.pool import EXECUTION_MODES, cpu_budget, predict_parallel
+from aimodel.registry import LEVELS, MISSIONS
+
+
+class Command(BaseCommand):
+    help = "Batch scoring throughput from 1 to N cores on synthetic rows, per execution mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mission', default='kepler', choices=MISSIONS)
+        parser.add_argument('--level', type=int, default=1, choices=LEVELS)
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--max-cores', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--mode', action='append', choices=EXECUTION_MODES, dest='modes',
+                            help="Execution mode to measure (repeatable, default: all)")
+        parser.add_argument('--repeat', type=int, default=3, help="Timed runs per point; the best is reported")
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['max_cores'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows, --max-cores and --repeat must be positive")
+
+        mission, level = options['mission'], options['level']
+        samples = synthetic_frame(mission, options['rows'])
+        self.stdout.write(
+            f"{options['rows']} synthetic {mission} rows, level {level}, "
+            f"{cpu_budget()} cores available"
+        )
+
+        for mode in options['modes'] or EXECUTION_MODES:
+            baseline = None
+            for cores in range(1, options['max_cores'] + 1):
+                # threads: один процесс, cores потоков CatBoost; processes: cores процессов по одному потоку
+                if mode == 'threads':
+                    kwargs = {'workers': 1, 'thread_count': cores}
+                else:
+                    kwargs = {'workers': cores, 'thread_count': 1}
+
+                # Прогрев: загрузка моделей и запуск процессов пула в замер не входят
+                predict_parallel(samples, mission, level, mode=mode, **kwargs)
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    predict_parallel(samples, mission, level, mode=mode, **kwargs)
+                    timings.append(time.perf_counter() - started)
+
+                best = min(timings)
+                baseline = baseline or best
+                self.stdout.write(
+                    f"{mode:>9} x{cores}: {best * 1000:.0f} ms, "
+                    f"{options['rows'] / best:.0f} rows/sec, speedup {baseline / best:.2f}x"
+                )
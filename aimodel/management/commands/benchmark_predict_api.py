@@ -0,0 +1,50 @@
+import json
+import time
+import statistics
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from aimodel.transform_to_log import EXAMPLE_SAMPLES
+from aimodel.views import predict_exoplanet_api
+
+
+class Command(BaseCommand):
+    help = "Latency of /api/predict-exoplanet/ per response format (json vs html)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mission', default='kepler', choices=sorted(EXAMPLE_SAMPLES))
+        parser.add_argument('--level', type=int, default=1, choices=[1, 2])
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        mission, level = options['mission'], options['level']
+
+        for response_format in ['json', 'html']:
+            body = json.dumps({
+                'mission': mission,
+                'level': level,
+                'sample_data': EXAMPLE_SAMPLES[mission],
+                'format': response_format,
+            })
+            # Первый запрос загружает модель - в замеры не входит
+            predict_exoplanet_api(factory.post('/api/predict-exoplanet/', body, content_type='application/json'))
+
+            timings = []
+            for _ in range(options['requests']):
+                request = factory.post('/api/predict-exoplanet/', body, content_type='application/json')
+                started = time.perf_counter()
+                response = predict_exoplanet_api(request)
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    self.stderr.write(response.content.decode())
+                    return
+
+            timings.sort()
+            self.stdout.write(
+                f"{response_format:>4}: mean {statistics.mean(timings):.3f} ms, "
+                f"p50 {timings[len(timings) // 2]:.3f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95)]:.3f} ms, "
+                f"{len(response.content)} bytes"
+            )
@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aimodel.importer import MISSION_MODELS, import_catalogue
+
+
+class Command(BaseCommand):
+    help = "Bulk import a NASA Exoplanet Archive CSV into the K2, Kepler or TESS mission table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Path to the archive CSV export")
+        parser.add_argument('--mission', required=True, choices=sorted(MISSION_MODELS))
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per INSERT")
+        parser.add_argument('--chunk-size', type=int, default=10000, help="CSV rows read and validated at a time")
+        parser.add_argument(
+            '--map', action='append', default=[], dest='column_map', metavar='CSV_COLUMN=FIELD',
+            help="Rename a CSV column to a model field (repeatable)",
+        )
+        parser.add_argument('--strict', action='store_true', help="Abort and roll back on the first invalid row")
+        parser.add_argument('--replace', action='store_true', help="Delete existing rows in the same transaction")
+
+    def handle(self, *args, **options):
+        path = options['input']
+        if not os.path.exists(path):
+            raise CommandError(f"Input file not found: {path}")
+        if options['batch_size'] < 1 or options['chunk_size'] < 1:
+            raise CommandError("--batch-size and --chunk-size must be positive")
+        try:
+            column_map = dict(item.split('=', 1) for item in options['column_map'])
+        except ValueError:
+            raise CommandError("--map expects CSV_COLUMN=FIELD")
+
+        def progress(stats):
+            self.stdout.write(f"{stats['rows']} rows read ({stats['rows_per_sec']:.0f} rows/sec)")
+
+        try:
+            stats = import_catalogue(
+                path, options['mission'],
+                batch_size=options['batch_size'],
+                chunk_size=options['chunk_size'],
+                column_map=column_map,
+                strict=options['strict'],
+                replace=options['replace'],
+                progress=progress,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for row, message in stats['errors'].items():
+            self.stderr.write(f"Row {row}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['imported']} of {stats['rows']} rows ({stats['skipped']} skipped) "
+            f"in {stats['seconds']:.2f}s - {stats['rows_per_sec']:.0f} rows/sec"
+        ))
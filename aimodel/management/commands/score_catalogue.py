@@ -0,0 +1,109 @@
+import os
+import csv
+import time
+from itertools import repeat
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from aimodel.pool import score_chunks
+from aimodel.registry import LEVELS, MISSIONS
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise CommandError("Parquet input requires pyarrow: pip install pyarrow")
+    return pq
+
+
+def read_columns(path, file_format) -> list:
+    """Колонки входного файла по заголовку CSV или схеме Parquet, без чтения строк"""
+    if file_format == 'parquet':
+        return _parquet().ParquetFile(path).schema_arrow.names
+    try:
+        return pd.read_csv(path, nrows=0, comment='#').columns.tolist()
+    except pd.errors.EmptyDataError:
+        raise CommandError("Input has no header row") from None
+
+
+def read_chunks(path, chunk_size, file_format):
+    """Куски DataFrame фиксированного размера из CSV или Parquet, без чтения файла целиком"""
+    if file_format == 'parquet':
+        for batch in _parquet().ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # Выгрузки NASA Exoplanet Archive начинаются с комментариев '#'
+        yield from pd.read_csv(path, chunksize=chunk_size, comment='#')
+
+
+class Command(BaseCommand):
+    help = "Score a NASA Exoplanet Archive export (CSV or Parquet) chunk by chunk with the CatBoost models"
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Path to a CSV or Parquet catalogue export")
+        parser.add_argument('--mission', required=True, choices=MISSIONS)
+        parser.add_argument('--level', type=int, default=1, choices=LEVELS)
+        parser.add_argument('--output', help="Result CSV (default: <input>_scored.csv)")
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--workers', type=int, default=1, help="Processes for scoring; 1 scores in-process")
+        parser.add_argument(
+            '--thread-count', type=int,
+            help="CatBoost threads per scoring process (default: available cores split across workers)",
+        )
+        parser.add_argument('--format', choices=['csv', 'parquet'], help="Input format (default: by extension)")
+        parser.add_argument(
+            '--keep-column', action='append', default=[], dest='keep_columns',
+            help="Input column copied to the output, e.g. kepoi_name (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        path = options['input']
+        if not os.path.exists(path):
+            raise CommandError(f"Input file not found: {path}")
+        if options['chunk_size'] < 1 or options['workers'] < 1 or (options['thread_count'] or 1) < 1:
+            raise CommandError("--chunk-size, --workers and --thread-count must be positive")
+
+        file_format = options['format'] or ('parquet' if path.endswith(('.parquet', '.pq')) else 'csv')
+        output = options['output'] or f"{os.path.splitext(path)[0]}_scored.csv"
+        keep_columns = options['keep_columns']
+        # Колонки проверяются до расчёта: иначе ошибка оставила бы частичный файл результата
+        columns = read_columns(path, file_format)
+        missing = [column for column in keep_columns if column not in columns]
+        if missing:
+            raise CommandError(f"Columns not in input: {', '.join(missing)}")
+
+        chunks = read_chunks(path, options['chunk_size'], file_format)
+        scored = score_chunks(
+            chunks, options['mission'], options['level'], options['workers'], thread_count=options['thread_count'],
+        )
+
+        started = time.perf_counter()
+        rows = errors = 0
+        with open(output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['index', *keep_columns, 'planet_prob', 'non_planet_prob', 'error'])
+
+            for chunk, results in scored:
+                # itertuples по DataFrame без колонок ничего не выдаёт
+                kept = chunk[keep_columns].itertuples(index=False, name=None) if keep_columns else repeat(())
+
+                for result, values in zip(results, kept):
+                    if 'error' in result:
+                        errors += 1
+                        writer.writerow([rows + result['index'], *values, '', '', result['error']])
+                    else:
+                        writer.writerow([
+                            rows + result['index'], *values,
+                            result['planet_prob'], result['non_planet_prob'], '',
+                        ])
+                rows += len(results)
+
+                elapsed = max(time.perf_counter() - started, 1e-9)
+                self.stdout.write(f"{rows} rows scored ({rows / elapsed:.0f} rows/sec)")
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {rows} rows ({errors} invalid) in {elapsed:.1f}s - {rows / elapsed:.0f} rows/sec -> {output}"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from aimodel.importer import MISSION_MODELS
+from aimodel.registry import LEVELS
+from aimodel.scoring import score_mission_rows
+
+
+class Command(BaseCommand):
+    help = "Score rows stored in the K2, Kepler or TESS table in place and save planet probabilities"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mission', required=True, choices=sorted(MISSION_MODELS))
+        parser.add_argument('--level', type=int, default=1, choices=LEVELS)
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per feature matrix")
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows per UPDATE")
+        parser.add_argument('--only-unscored', action='store_true', help="Skip rows that already have a probability")
+
+    def handle(self, *args, **options):
+        queryset = MISSION_MODELS[options['mission']].objects.all()
+        if options['only_unscored']:
+            queryset = queryset.filter(planet_probability__isnull=True)
+
+        def progress(stats):
+            self.stdout.write(f"{stats['rows']} rows scored ({stats['rows_per_sec']:.0f} rows/sec)")
+
+        stats = score_mission_rows(
+            queryset, options['mission'], options['level'],
+            chunk_size=options['chunk_size'], batch_size=options['batch_size'], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {stats['rows']} rows in {stats['seconds']:.2f}s - {stats['rows_per_sec']:.0f} rows/sec"
+        ))
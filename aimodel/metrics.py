@@ -0,0 +1,128 @@
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+
+# Отдельный логгер: структурные записи включаются уровнем INFO в LOGGING, по умолчанию выключены
+timings_logger = logging.getLogger('aimodel.timings')
+
+# Границы корзин в секундах: от 100 мкс до 10 с
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Кумулятивная гистограмма в духе Prometheus: счётчики по корзинам, сумма и количество"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        # Последняя корзина - +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> list:
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class StageMetrics:
+    """Гистограммы длительности стадий пайплайна по (stage, mission, level)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, mission, level, seconds: float):
+        self.observe_many(mission, level, {stage: seconds})
+
+    def observe_many(self, mission, level, stages: dict):
+        """Все стадии одного запроса под одной блокировкой"""
+        mission, level = str(mission), str(level)
+        with self._lock:
+            for stage, seconds in stages.items():
+                histogram = self._histograms.get((stage, mission, level))
+                if histogram is None:
+                    histogram = self._histograms[(stage, mission, level)] = Histogram(self.buckets)
+                histogram.observe(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: (h.cumulative(), h.sum, h.count) for key, h in self._histograms.items()}
+
+    def render_prometheus(self, name='aimodel_stage_seconds') -> str:
+        lines = [
+            f"# HELP {name} Latency of exoplanet prediction pipeline stages",
+            f"# TYPE {name} histogram",
+        ]
+        for (stage, mission, level), (cumulative, total, count) in sorted(self.snapshot().items()):
+            labels = f'stage="{stage}",mission="{mission}",level="{level}"'
+            for bound, value in zip((*map(repr, self.buckets), '+Inf'), cumulative):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f"{name}_sum{{{labels}}} {total!r}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+STAGE_METRICS = StageMetrics()
+
+
+class _Stage:
+    """Контекстный менеджер замера одной стадии; класс дешевле генератора @contextmanager"""
+
+    __slots__ = ('stages', 'name', 'started')
+
+    def __init__(self, stages: dict, name: str):
+        self.stages = stages
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.stages[self.name] = self.stages.get(self.name, 0.0) + time.perf_counter() - self.started
+
+
+class StageTimings:
+    """
+    Замеры стадий одного запроса. Длительности копятся в словаре и уходят
+    в гистограммы одним вызовом record(), когда известны mission и level.
+    """
+
+    def __init__(self, mission=None, level=None, metrics=STAGE_METRICS):
+        self.mission = mission
+        self.level = level
+        self.metrics = metrics
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    def stage(self, name: str):
+        return _Stage(self.stages, name)
+
+    def record(self, **fields):
+        """Пишет стадии и общее время в гистограммы и, если включено, структурную запись в лог"""
+        self.stages['total'] = time.perf_counter() - self.started
+        mission = self.mission or 'unknown'
+        level = self.level if self.level is not None else 'unknown'
+        self.metrics.observe_many(mission, level, self.stages)
+
+        if timings_logger.isEnabledFor(logging.INFO):
+            timings_logger.info(json.dumps({
+                'mission': mission,
+                'level': level,
+                'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+                **fields,
+            }))
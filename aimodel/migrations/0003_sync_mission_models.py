@@ -0,0 +1,335 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aimodel', '0002_df_k2model_keplermodel_tessmodel_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='df',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Data Frame', 'verbose_name_plural': 'Data Frames'},
+        ),
+        migrations.AlterModelOptions(
+            name='k2model',
+            options={'verbose_name': 'K2 Mission Data', 'verbose_name_plural': 'K2 Mission Data'},
+        ),
+        migrations.AlterModelOptions(
+            name='keplermodel',
+            options={'verbose_name': 'Kepler Mission Data', 'verbose_name_plural': 'Kepler Mission Data'},
+        ),
+        migrations.AlterModelOptions(
+            name='tessmodel',
+            options={'verbose_name': 'TESS Mission Data', 'verbose_name_plural': 'TESS Mission Data'},
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='gaia_bpmag',
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='gaia_gmag',
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='gaia_rpmag',
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='pl_eqt',
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='pl_insol',
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='pl_ratdor',
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='st_mass',
+        ),
+        migrations.RemoveField(
+            model_name='k2model',
+            name='st_metfe',
+        ),
+        migrations.RemoveField(
+            model_name='tessmodel',
+            name='st_lum',
+        ),
+        migrations.RemoveField(
+            model_name='tessmodel',
+            name='st_mass',
+        ),
+        migrations.RemoveField(
+            model_name='tessmodel',
+            name='st_metfe',
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='pl_ratror',
+            field=models.FloatField(default=0.0, verbose_name='Planet to Star Radius Ratio'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='sy_dist',
+            field=models.FloatField(default=0.0, verbose_name='Distance (pc)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='sy_gaiamag',
+            field=models.FloatField(default=0.0, verbose_name='Gaia Magnitude'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='sy_kepmag',
+            field=models.FloatField(default=0.0, verbose_name='Kepler Magnitude'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='sy_pmdec',
+            field=models.FloatField(default=0.0, verbose_name='Proper Motion Dec (mas/yr)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='sy_pmra',
+            field=models.FloatField(default=0.0, verbose_name='Proper Motion RA (mas/yr)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='sy_tmag',
+            field=models.FloatField(default=0.0, verbose_name='TESS Magnitude'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='k2model',
+            name='pl_orbper',
+            field=models.FloatField(verbose_name='Orbital Period (days)'),
+        ),
+        migrations.AlterField(
+            model_name='k2model',
+            name='pl_rade',
+            field=models.FloatField(verbose_name='Planet Radius (Earth radii)'),
+        ),
+        migrations.AlterField(
+            model_name='k2model',
+            name='pl_trandur',
+            field=models.FloatField(verbose_name='Transit Duration (days)'),
+        ),
+        migrations.AlterField(
+            model_name='k2model',
+            name='st_rad',
+            field=models.FloatField(verbose_name='Stellar Radius (Solar radii)'),
+        ),
+        migrations.AlterField(
+            model_name='k2model',
+            name='st_teff',
+            field=models.FloatField(verbose_name='Stellar Effective Temperature (K)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_depth',
+            field=models.FloatField(verbose_name='Transit Depth (ppm)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_dor',
+            field=models.FloatField(verbose_name='Planet-Star Distance Ratio'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_duration',
+            field=models.FloatField(verbose_name='Transit Duration (hours)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_gmag',
+            field=models.FloatField(verbose_name='Gaia G Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_hmag',
+            field=models.FloatField(verbose_name='2MASS H Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_imag',
+            field=models.FloatField(verbose_name='SDSS i Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_impact',
+            field=models.FloatField(verbose_name='Impact Parameter'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_incl',
+            field=models.FloatField(verbose_name='Inclination (degrees)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_insol',
+            field=models.FloatField(verbose_name='Insolation Flux (Earth units)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_jmag',
+            field=models.FloatField(verbose_name='2MASS J Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_kepmag',
+            field=models.FloatField(verbose_name='Kepler Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_kmag',
+            field=models.FloatField(verbose_name='2MASS K Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_max_sngle_ev',
+            field=models.FloatField(verbose_name='Maximum Single Event Statistic'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_model_snr',
+            field=models.FloatField(verbose_name='Model Signal-to-Noise Ratio'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_num_transits',
+            field=models.IntegerField(verbose_name='Number of Transits'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_period',
+            field=models.FloatField(verbose_name='Orbital Period (days)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_prad',
+            field=models.FloatField(verbose_name='Planet Radius (Earth radii)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_rmag',
+            field=models.FloatField(verbose_name='SDSS r Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_ror',
+            field=models.FloatField(verbose_name='Planet-Star Radius Ratio'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_slogg',
+            field=models.FloatField(verbose_name='Stellar Surface Gravity (log10(cm/s²))'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_sma',
+            field=models.FloatField(verbose_name='Semi-Major Axis (AU)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_smass',
+            field=models.FloatField(verbose_name='Stellar Mass (Solar masses)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_smet',
+            field=models.FloatField(verbose_name='Stellar Metallicity'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_srad',
+            field=models.FloatField(verbose_name='Stellar Radius (Solar radii)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_srho',
+            field=models.FloatField(verbose_name='Stellar Density (g/cm³)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_steff',
+            field=models.FloatField(verbose_name='Stellar Effective Temperature (K)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_teq',
+            field=models.FloatField(verbose_name='Equilibrium Temperature (K)'),
+        ),
+        migrations.AlterField(
+            model_name='keplermodel',
+            name='koi_zmag',
+            field=models.FloatField(verbose_name='SDSS z Magnitude'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='pl_eqt',
+            field=models.FloatField(verbose_name='Equilibrium Temperature (K)'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='pl_orbper',
+            field=models.FloatField(verbose_name='Orbital Period (days)'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='pl_rade',
+            field=models.FloatField(verbose_name='Planet Radius (Earth radii)'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='pl_trandep',
+            field=models.FloatField(verbose_name='Transit Depth'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='pl_trandeperr1',
+            field=models.FloatField(verbose_name='Transit Depth Error'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='pl_trandurh',
+            field=models.FloatField(verbose_name='Transit Duration (hours)'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='st_dist',
+            field=models.FloatField(verbose_name='Distance to Star (pc)'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='st_logg',
+            field=models.FloatField(verbose_name='Stellar Surface Gravity (log10(cm/s²))'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='st_rad',
+            field=models.FloatField(verbose_name='Stellar Radius (Solar radii)'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='st_teff',
+            field=models.FloatField(verbose_name='Stellar Effective Temperature (K)'),
+        ),
+        migrations.AlterField(
+            model_name='tessmodel',
+            name='st_tmag',
+            field=models.FloatField(verbose_name='TESS Magnitude'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:11
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aimodel', '0003_sync_mission_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('mission', models.CharField(choices=[('kepler', 'Kepler'), ('tess', 'TESS'), ('k2', 'K2')], max_length=20)),
+                ('model_level', models.IntegerField(default=1)),
+                ('input_path', models.CharField(max_length=500, verbose_name='Input file')),
+                ('result_path', models.CharField(blank=True, max_length=500, verbose_name='Result file')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('error', 'Error')], default='pending', max_length=10)),
+                ('total_rows', models.IntegerField(blank=True, null=True)),
+                ('processed_rows', models.IntegerField(default=0)),
+                ('error_rows', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Prediction Job',
+                'verbose_name_plural': 'Prediction Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExoplanetPrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_index', models.IntegerField(blank=True, null=True)),
+                ('mission', models.CharField(choices=[('kepler', 'Kepler'), ('tess', 'TESS'), ('k2', 'K2')], max_length=20)),
+                ('model_level', models.IntegerField(default=1)),
+                ('input_data', models.JSONField()),
+                ('planet_probability', models.FloatField(null=True)),
+                ('non_planet_probability', models.FloatField(null=True)),
+                ('confidence_level', models.CharField(blank=True, max_length=20)),
+                ('prediction_status', models.CharField(blank=True, max_length=32)),
+                ('recommendation', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('success', 'Success'), ('error', 'Error')], default='success', max_length=10)),
+                ('session_key', models.CharField(blank=True, max_length=40, null=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to='aimodel.predictionjob')),
+            ],
+            options={
+                'verbose_name': 'Exoplanet Prediction',
+                'verbose_name_plural': 'Exoplanet Predictions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
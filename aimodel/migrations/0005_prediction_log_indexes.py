@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aimodel', '0004_prediction_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exoplanetprediction',
+            index=models.Index(fields=['-created_at', '-id'], name='aimodel_pred_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exoplanetprediction',
+            index=models.Index(fields=['mission', 'model_level', '-created_at', '-id'], name='aimodel_pred_mission_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exoplanetprediction',
+            index=models.Index(fields=['planet_probability'], name='aimodel_pred_prob_idx'),
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:24
+
+import io
+
+import numpy as np
+import pandas as pd
+from django.db import migrations, models
+
+# Копия формата aimodel.frames на момент миграции: изменения frames.py не должны
+# менять то, что делает историческая миграция
+
+
+def frame_from_json(data):
+    if isinstance(data, dict) and "columns" in data and "data" in data:
+        return pd.DataFrame(data["data"], columns=data["columns"], index=data.get("index"))
+    return pd.DataFrame(data)
+
+
+def frame_to_json(frame):
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def dumps_npz(frame):
+    arrays = {}
+    for i, name in enumerate(frame.columns):
+        values = frame[name]
+        if values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == "string":
+            missing = values.isna().to_numpy()
+            arrays[f"c{i}"] = values.astype(object).where(~missing, "").astype(str).to_numpy().astype(str)
+            if missing.any():
+                arrays[f"c{i}_null"] = missing
+        else:
+            arrays[f"c{i}"] = values.to_numpy()
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return [str(name) for name in frame.columns], buffer.getvalue()
+
+
+def loads_npz(payload, columns):
+    data = {}
+    with np.load(io.BytesIO(bytes(payload)), allow_pickle=False) as npz:
+        for i, name in enumerate(columns):
+            values = npz[f"c{i}"]
+            if f"c{i}_null" in npz.files:
+                values = values.astype(object)
+                values[npz[f"c{i}_null"]] = None
+            data[name] = values
+    return pd.DataFrame(data, columns=columns)
+
+
+def json_to_npz(apps, schema_editor):
+    """Существующие DF.data переводятся в сжатый .npz в BLOB, по одной строке за раз"""
+    DF = apps.get_model('aimodel', 'DF')
+    for df in DF.objects.filter(storage='json').iterator(chunk_size=1):
+        frame = frame_from_json(df.data)
+        df.columns, df.payload = dumps_npz(frame)
+        df.row_count = len(frame)
+        df.storage = 'npz'
+        df.data = None
+        df.save(update_fields=['columns', 'payload', 'row_count', 'storage', 'data'])
+
+
+def npz_to_json(apps, schema_editor):
+    DF = apps.get_model('aimodel', 'DF')
+    for df in DF.objects.filter(storage='npz').iterator(chunk_size=1):
+        df.data = frame_to_json(loads_npz(df.payload, df.columns))
+        df.payload = None
+        df.storage = 'json'
+        df.save(update_fields=['data', 'payload', 'storage'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aimodel', '0005_prediction_log_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='df',
+            name='columns',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='df',
+            name='payload',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='df',
+            name='payload_path',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='df',
+            name='row_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        # Существующие строки сначала помечаются как json, затем конвертируются
+        migrations.AddField(
+            model_name='df',
+            name='storage',
+            field=models.CharField(choices=[('json', 'JSON'), ('npz', 'Compressed NumPy (BLOB)'), ('npy', 'Memory-mapped NumPy files')], default='json', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='df',
+            name='data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(json_to_npz, npz_to_json),
+        migrations.AlterField(
+            model_name='df',
+            name='storage',
+            field=models.CharField(choices=[('json', 'JSON'), ('npz', 'Compressed NumPy (BLOB)'), ('npy', 'Memory-mapped NumPy files')], default='npz', max_length=10),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aimodel', '0006_df_columnar_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='k2model',
+            name='model_level',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='Model Level'),
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='planet_probability',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Planet Probability'),
+        ),
+        migrations.AddField(
+            model_name='k2model',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='keplermodel',
+            name='model_level',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='Model Level'),
+        ),
+        migrations.AddField(
+            model_name='keplermodel',
+            name='planet_probability',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Planet Probability'),
+        ),
+        migrations.AddField(
+            model_name='keplermodel',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tessmodel',
+            name='model_level',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='Model Level'),
+        ),
+        migrations.AddField(
+            model_name='tessmodel',
+            name='planet_probability',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Planet Probability'),
+        ),
+        migrations.AddField(
+            model_name='tessmodel',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aimodel', '0007_mission_row_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='predictionjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
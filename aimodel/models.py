@@ -1,3 +1,6 @@
+import os
+import uuid
+
 from django.db import models
 
 class K2Model(models.Model):
@@ -14,6 +17,11 @@ class K2Model(models.Model):
     sy_tmag = models.FloatField(verbose_name="TESS Magnitude")  # Добавил
     sy_kepmag = models.FloatField(verbose_name="Kepler Magnitude")  # Добавил
 
+    # Результат score_mission_rows: заполняется пакетно, не из каталога
+    planet_probability = models.FloatField(null=True, blank=True, editable=False, verbose_name="Planet Probability")
+    model_level = models.IntegerField(null=True, blank=True, editable=False, verbose_name="Model Level")
+    scored_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         verbose_name = "K2 Mission Data"
         verbose_name_plural = "K2 Mission Data"
@@ -51,6 +59,11 @@ class KeplerModel(models.Model):
     koi_hmag = models.FloatField(verbose_name="2MASS H Magnitude")
     koi_kmag = models.FloatField(verbose_name="2MASS K Magnitude")
 
+    # Результат score_mission_rows: заполняется пакетно, не из каталога
+    planet_probability = models.FloatField(null=True, blank=True, editable=False, verbose_name="Planet Probability")
+    model_level = models.IntegerField(null=True, blank=True, editable=False, verbose_name="Model Level")
+    scored_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         verbose_name = "Kepler Mission Data"
         verbose_name_plural = "Kepler Mission Data"
@@ -71,6 +84,11 @@ class TESSModel(models.Model):
     st_tmag = models.FloatField(verbose_name="TESS Magnitude")
     st_dist = models.FloatField(verbose_name="Distance to Star (pc)")
 
+    # Результат score_mission_rows: заполняется пакетно, не из каталога
+    planet_probability = models.FloatField(null=True, blank=True, editable=False, verbose_name="Planet Probability")
+    model_level = models.IntegerField(null=True, blank=True, editable=False, verbose_name="Model Level")
+    scored_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         verbose_name = "TESS Mission Data"
         verbose_name_plural = "TESS Mission Data"
@@ -78,11 +96,30 @@ class TESSModel(models.Model):
     def __str__(self):
         return f"TESS - Period: {self.pl_orbper} days"
 
+class DFManager(models.Manager):
+    def get_queryset(self):
+        # Полезная нагрузка читается отдельным запросом только при обращении к ней
+        return super().get_queryset().defer('data', 'payload')
+
 class DF(models.Model):
+    STORAGE_CHOICES = [
+        ('json', 'JSON'),
+        ('npz', 'Compressed NumPy (BLOB)'),
+        ('npy', 'Memory-mapped NumPy files'),
+    ]
+
     mission = models.CharField(max_length=10)
-    data = models.JSONField()
+    # Старый формат: вся таблица одним JSON; новые строки хранятся по колонкам
+    data = models.JSONField(null=True, blank=True)
+    storage = models.CharField(max_length=10, choices=STORAGE_CHOICES, default='npz')
+    payload = models.BinaryField(null=True, blank=True, editable=False)
+    payload_path = models.CharField(max_length=500, blank=True, editable=False)
+    columns = models.JSONField(default=list, blank=True, editable=False)
+    row_count = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DFManager()
     
     class Meta:
         ordering = ['-created_at']
@@ -90,4 +127,142 @@ class DF(models.Model):
         verbose_name_plural = "Data Frames"
         
     def __str__(self):
-        return f"{self.mission} - {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
\ No newline at end of file
+        return f"{self.mission} - {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
+
+    def set_frame(self, frame, storage=None):
+        """Сохраняет DataFrame в выбранном формате (по умолчанию - в текущем self.storage)"""
+        from django.conf import settings
+        from . import frames
+
+        storage = storage or self.storage
+        self._release_frame()
+        self.data, self.payload = None, None
+        if self.payload_path and storage != 'npy':
+            frames.remove_npy_dir(self.payload_path)
+            self.payload_path = ''
+
+        if storage == 'json':
+            self.columns, self.data = [str(name) for name in frame.columns], frames.frame_to_json(frame)
+        elif storage == 'npz':
+            self.columns, self.payload = frames.dumps_npz(frame)
+        elif storage == 'npy':
+            if not self.payload_path:
+                frames_dir = getattr(settings, 'AIMODEL_FRAMES_DIR', settings.BASE_DIR / 'data_frames')
+                self.payload_path = os.path.join(str(frames_dir), uuid.uuid4().hex)
+            self.columns = frames.write_npy_dir(frame, self.payload_path)
+        else:
+            raise ValueError(f"Unknown storage: {storage}")
+        self.storage = storage
+        self.row_count = len(frame)
+
+    def column(self, name):
+        """Одна колонка numpy-массивом; остальные колонки не читаются и не распаковываются"""
+        from . import frames
+
+        index = self.columns.index(name)
+        if self.storage == 'npz':
+            if getattr(self, '_npz', None) is None:
+                self._npz = frames.open_npz(self.payload)
+            return frames.read_npz_column(self._npz, index)
+        if self.storage == 'npy':
+            return frames.read_npy_column(self.payload_path, index)
+        return self.to_frame([name])[name].to_numpy()
+
+    def to_frame(self, columns=None):
+        import pandas as pd
+        from . import frames
+
+        if self.storage == 'json':
+            frame = frames.frame_from_json(self.data)
+            return frame[list(columns)] if columns is not None else frame
+        names = self.columns if columns is None else list(columns)
+        return pd.DataFrame({name: self.column(name) for name in names}, columns=names)
+
+    def delete(self, *args, **kwargs):
+        from . import frames
+
+        if self.payload_path:
+            frames.remove_npy_dir(self.payload_path)
+        return super().delete(*args, **kwargs)
+
+    def _release_frame(self):
+        npz = getattr(self, '_npz', None)
+        if npz is not None:
+            npz.close()
+            self._npz = None
+
+MISSION_CHOICES = [('kepler', 'Kepler'), ('tess', 'TESS'), ('k2', 'K2')]
+
+class PredictionJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('error', 'Error'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    mission = models.CharField(max_length=20, choices=MISSION_CHOICES)
+    model_level = models.IntegerField(default=1)
+    input_path = models.CharField(max_length=500, verbose_name="Input file")
+    result_path = models.CharField(max_length=500, blank=True, verbose_name="Result file")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.IntegerField(null=True, blank=True)
+    processed_rows = models.IntegerField(default=0)
+    error_rows = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Пульс задания: обновляется после каждого куска; без обновлений дольше
+    # AIMODEL_JOB_STALE_AFTER задание считается прерванным перезапуском процесса
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Prediction Job"
+        verbose_name_plural = "Prediction Jobs"
+
+    def __str__(self):
+        return f"{self.mission} level {self.model_level} - {self.status} ({self.processed_rows} rows)"
+
+    @property
+    def progress(self):
+        if not self.total_rows:
+            return 1.0 if self.status == 'success' else 0.0
+        return min(self.processed_rows / self.total_rows, 1.0)
+
+class ExoplanetPrediction(models.Model):
+    STATUS_CHOICES = [('pending', 'Pending'), ('success', 'Success'), ('error', 'Error')]
+
+    job = models.ForeignKey(PredictionJob, on_delete=models.CASCADE, null=True, blank=True, related_name='predictions')
+    row_index = models.IntegerField(null=True, blank=True)
+    mission = models.CharField(max_length=20, choices=MISSION_CHOICES)
+    model_level = models.IntegerField(default=1)
+    input_data = models.JSONField()
+    planet_probability = models.FloatField(null=True)
+    non_planet_probability = models.FloatField(null=True)
+    confidence_level = models.CharField(max_length=20, blank=True)
+    prediction_status = models.CharField(max_length=32, blank=True)
+    recommendation = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='success')
+    session_key = models.CharField(max_length=40, null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Exoplanet Prediction"
+        verbose_name_plural = "Exoplanet Predictions"
+        # История листается по ключу (created_at, id), а не OFFSET
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='aimodel_pred_created_idx'),
+            models.Index(fields=['mission', 'model_level', '-created_at', '-id'], name='aimodel_pred_mission_idx'),
+            models.Index(fields=['planet_probability'], name='aimodel_pred_prob_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.mission} level {self.model_level} - {self.planet_probability}"
+
+    def get_mission_display_name(self):
+        return self.get_mission_display()
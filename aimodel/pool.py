@@ -0,0 +1,135 @@
+import os
+import math
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .registry import MODELS_DIR
+from .transform_to_log import predict_exoplanet_batch
+
+# Модуль не импортирует Django: его функции выполняются в дочерних процессах пула
+
+EXECUTION_MODES = ('threads', 'processes')
+# Меньшие куски не окупают передачу в другой процесс
+MIN_ROWS_PER_WORKER = 2000
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def cpu_budget() -> int:
+    """
+    Ядра на один веб-процесс: доступные процессу ядра, делённые на WEB_CONCURRENCY
+    (число воркеров gunicorn/uvicorn). Так несколько воркеров вместе не запускают
+    больше потоков CatBoost, чем есть ядер.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    try:
+        web_workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    except ValueError:
+        web_workers = 1
+    return max(1, cpus // max(1, web_workers))
+
+
+def resolve_thread_count(thread_count=None, workers: int = 1) -> int:
+    """Явное число потоков CatBoost или бюджет ядер, поделённый между процессами пула"""
+    if thread_count:
+        return thread_count
+    return max(1, cpu_budget() // max(1, workers))
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Общий пул процессов на заданное число воркеров; у каждого процесса свой реестр моделей"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn: дочерние процессы не наследуют потоки и соединения с БД родителя
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+    return pool
+
+
+def score_chunk(samples, mission: str, level: int, base_dir=MODELS_DIR, thread_count: int = 1) -> list:
+    """Пакетное предсказание для одного куска входа; выполняется в процессе пула"""
+    return predict_exoplanet_batch(samples, mission, level, base_dir, thread_count=thread_count)
+
+
+def score_chunks(chunks, mission: str, level: int, workers: int = 1, base_dir=MODELS_DIR, thread_count=None):
+    """
+    Генератор (chunk, results) в порядке входа. При workers > 1 куски считаются
+    в пуле процессов, но в полёте не больше двух кусков на воркер - память
+    не растёт с размером входа.
+    """
+    thread_count = resolve_thread_count(thread_count, workers)
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, score_chunk(chunk, mission, level, base_dir, thread_count)
+        return
+
+    pool = get_process_pool(workers)
+    pending = deque()
+    for chunk in chunks:
+        pending.append((chunk, pool.submit(score_chunk, chunk, mission, level, base_dir, thread_count)))
+        if len(pending) >= workers * 2:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+    while pending:
+        chunk, future = pending.popleft()
+        yield chunk, future.result()
+
+
+def row_count(samples) -> int:
+    """Число строк во входе predict_exoplanet_batch: DataFrame, список образцов или колонки"""
+    if isinstance(samples, dict):
+        return max((len(values) for values in samples.values() if isinstance(values, list)), default=0)
+    return len(samples)
+
+
+def split_samples(samples, parts: int) -> list:
+    """Делит вход predict_exoplanet_batch на parts кусков подряд -> [(смещение, кусок), ...]"""
+    total = row_count(samples)
+    if isinstance(samples, pd.DataFrame):
+        take = lambda start, stop: samples.iloc[start:stop]
+    elif isinstance(samples, dict):
+        # Не-списки передаются как есть: samples_to_frame отклонит их с понятной ошибкой
+        take = lambda start, stop: {
+            column: values[start:stop] if isinstance(values, list) else values
+            for column, values in samples.items()
+        }
+    else:
+        take = lambda start, stop: samples[start:stop]
+
+    size = math.ceil(total / parts) if total else 0
+    return [(start, take(start, start + size)) for start in range(0, total, size or 1)]
+
+
+def predict_parallel(samples, mission: str, level: int, mode: str = 'threads', workers=None,
+                     thread_count=None, base_dir=MODELS_DIR) -> list:
+    """
+    Пакетное предсказание в выбранном режиме выполнения:
+    threads - в текущем процессе, CatBoost считает в thread_count потоков;
+    processes - матрица делится между workers процессами пула, у каждого свои модели.
+    """
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode: {mode}")
+
+    workers = min(workers or cpu_budget(), max(1, row_count(samples) // MIN_ROWS_PER_WORKER))
+
+    if mode == 'threads' or workers <= 1:
+        return predict_exoplanet_batch(samples, mission, level, base_dir, thread_count=resolve_thread_count(thread_count))
+
+    pool = get_process_pool(workers)
+    thread_count = resolve_thread_count(thread_count, workers)
+    futures = [
+        (offset, pool.submit(score_chunk, part, mission, level, base_dir, thread_count))
+        for offset, part in split_samples(samples, workers)
+    ]
+    results = []
+    for offset, future in futures:
+        for result in future.result():
+            result['index'] += offset
+            results.append(result)
+    return results
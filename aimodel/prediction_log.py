@@ -0,0 +1,71 @@
+import threading
+from collections import deque
+
+from django.conf import settings
+
+from drf_server.background import BackgroundFlusher
+
+DEFAULTS = {
+    'ENABLED': True,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_PENDING': 50000,
+}
+
+
+class PredictionLogWriter(BackgroundFlusher):
+    """
+    Буферизованная запись предсказаний в ExoplanetPrediction.
+    add() только кладёт словарь полей в очередь; фоновый поток раз в flush_interval
+    (или как только набрался batch_size) сохраняет накопленное одним bulk_create,
+    поэтому запрос не ждёт записи в SQLite.
+    """
+
+    buffer_type = deque
+    thread_name = "prediction-log-writer"
+
+    def __init__(self, batch_size=500, flush_interval=2.0, max_pending=50000):
+        super().__init__(flush_interval=flush_interval, max_pending=max_pending)
+        self.batch_size = batch_size
+        self.dropped = 0
+
+    def add(self, **fields):
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                # База не успевает: теряем запись, но не память процесса и не время запроса
+                self.dropped += 1
+                return
+            self._pending.append(fields)
+            full = len(self._pending) >= self.batch_size
+        self._notify(full)
+
+    def _write(self, batch):
+        from .models import ExoplanetPrediction
+
+        ExoplanetPrediction.objects.bulk_create(
+            [ExoplanetPrediction(**fields) for fields in batch], batch_size=self.batch_size,
+        )
+
+    def stats(self) -> dict:
+        return {**super().stats(), 'dropped': self.dropped}
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_prediction_log():
+    """Писатель из settings.AIMODEL_PREDICTION_LOG или None, если журнал выключен"""
+    global _writer
+    config = {**DEFAULTS, **getattr(settings, 'AIMODEL_PREDICTION_LOG', {})}
+    if not config['ENABLED']:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = PredictionLogWriter(
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    max_pending=config['MAX_PENDING'],
+                )
+    return _writer
@@ -0,0 +1,160 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models_pkl")
+MISSIONS = ("k2", "kepler", "tess")
+LEVELS = (1, 2)
+
+
+def normalize_mission(mission: str) -> str:
+    mission = mission.lower()
+    return "tess" if mission == "tes" else mission
+
+
+def model_paths(mission: str, level: int, base_dir=MODELS_DIR) -> tuple:
+    prefix = normalize_mission(mission)
+    model_path = os.path.join(base_dir, prefix, f"{prefix}_model_lvl{level}.cbm")
+    scaler_path = os.path.join(base_dir, prefix, f"{prefix}_scaler_lvl{level}.pkl")
+    return model_path, scaler_path
+
+
+def files_fingerprint(*paths) -> str:
+    """Отпечаток файлов по пути, размеру и mtime: меняется при любой перезаписи модели"""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+def _rss_bytes():
+    """Текущий RSS процесса (только Linux), иначе None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ModelEntry:
+    """Загруженная пара модель + скейлер для (mission, level)"""
+
+    def __init__(self, mission, level, model, scaler, model_path, scaler_path, load_time, memory_bytes):
+        self.mission = mission
+        self.level = level
+        self.model = model
+        self.scaler = scaler
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.load_time = load_time
+        self.memory_bytes = memory_bytes
+        self.file_bytes = os.path.getsize(model_path) + os.path.getsize(scaler_path)
+        self.fingerprint = files_fingerprint(model_path, scaler_path)
+
+    def stats(self) -> dict:
+        return {
+            "mission": self.mission,
+            "level": self.level,
+            "load_time_ms": round(self.load_time * 1000, 3),
+            "memory_bytes": self.memory_bytes,
+            "file_bytes": self.file_bytes,
+            "fingerprint": self.fingerprint,
+        }
+
+
+class ModelRegistry:
+    """
+    Процессный реестр моделей: каждая пара (mission, level) читается с диска
+    один раз и дальше разделяется между всеми запросами.
+    """
+
+    def __init__(self, base_dir=MODELS_DIR):
+        self.base_dir = base_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, mission: str, level: int) -> ModelEntry:
+        key = (normalize_mission(mission), int(level))
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._load(*key)
+                    self._entries[key] = entry
+        return entry
+
+    def preload(self, missions=MISSIONS, levels=LEVELS) -> list:
+        return [self.get(mission, level) for mission in missions for level in levels]
+
+    def stats(self) -> list:
+        return [entry.stats() for _, entry in sorted(self._entries.items())]
+
+    def refresh_if_changed(self, mission: str, level: int) -> ModelEntry:
+        """Перечитывает пару с диска, если файлы в models_pkl изменились после загрузки"""
+        entry = self.get(mission, level)
+        try:
+            changed = files_fingerprint(entry.model_path, entry.scaler_path) != entry.fingerprint
+        except OSError:
+            changed = True
+        if changed:
+            with self._lock:
+                if self._entries.get((entry.mission, entry.level)) is entry:
+                    del self._entries[(entry.mission, entry.level)]
+            logger.info("Model files for %s level %s changed, reloading", entry.mission, entry.level)
+            entry = self.get(mission, level)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _load(self, mission: str, level: int) -> ModelEntry:
+        from catboost import CatBoostClassifier
+
+        from .features import get_feature_spec
+
+        model_path, scaler_path = model_paths(mission, level, self.base_dir)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Модель не найдена: {model_path}")
+        if not os.path.exists(scaler_path):
+            raise FileNotFoundError(f"Скейлер не найден: {scaler_path}")
+
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        # .cbm - нативный формат CatBoost, joblib его не читает
+        model = CatBoostClassifier()
+        model.load_model(model_path)
+        scaler = joblib.load(scaler_path)
+        # Матрицы признаков строятся по спецификации, поэтому расхождение с моделью - ошибка загрузки
+        get_feature_spec(mission).check_model(model, scaler)
+        load_time = time.perf_counter() - started
+        rss_after = _rss_bytes()
+        memory_bytes = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        entry = ModelEntry(mission, level, model, scaler, model_path, scaler_path, load_time, memory_bytes)
+        logger.info(
+            "Loaded %s level %s in %.1f ms (rss +%s bytes, files %s bytes)",
+            mission, level, load_time * 1000, memory_bytes, entry.file_bytes,
+        )
+        return entry
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(base_dir=MODELS_DIR) -> ModelRegistry:
+    base_dir = os.path.abspath(base_dir)
+    registry = _registries.get(base_dir)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(base_dir, ModelRegistry(base_dir))
+    return registry
@@ -0,0 +1,62 @@
+import time
+import logging
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .features import get_feature_spec
+from .importer import MISSION_MODELS
+from .pool import resolve_thread_count
+from .registry import get_registry
+
+logger = logging.getLogger(__name__)
+
+
+def score_mission_rows(queryset, mission: str, level: int = 1, chunk_size: int = 5000,
+                       batch_size: int = 500, progress=None) -> dict:
+    """
+    Оценивает строки таблицы миссии на месте. Queryset читается итератором по chunk_size
+    строк и только нужными колонками (values_list), на кусок строится одна матрица
+    признаков и один вызов predict_proba; вероятности пишутся обратно bulk_update.
+    """
+    model = MISSION_MODELS[mission]
+    spec = get_feature_spec(mission)
+    entry = get_registry().get(mission, level)
+    thread_count = resolve_thread_count()
+
+    # Поля модели, которые идут в признаки; отсутствующие в таблице (koi_count) заполняются нулями
+    table_fields = {field.name for field in model._meta.concrete_fields}
+    columns = [name for name, _ in spec.inputs if name in table_fields]
+
+    rows = queryset.order_by('pk').values_list('pk', *columns).iterator(chunk_size=chunk_size)
+    stats = {'rows': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+    started = time.perf_counter()
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        values = np.array(chunk, dtype=np.float64)
+        X = spec.matrix({name: values[:, i + 1] for i, name in enumerate(columns)}, len(chunk), entry.scaler)
+        probabilities = entry.model.predict_proba(X, thread_count=thread_count)[:, 1]
+
+        ids = [int(pk) for pk in values[:, 0]]
+        objects = [model(pk=pk, planet_probability=float(p)) for pk, p in zip(ids, probabilities)]
+        with transaction.atomic():
+            # bulk_update строит CASE WHEN на каждое поле каждой строки: общие для куска поля
+            # выгоднее записать одним UPDATE
+            model.objects.bulk_update(objects, ['planet_probability'], batch_size=batch_size)
+            model.objects.filter(pk__in=ids).update(model_level=level, scored_at=timezone.now())
+
+        stats['rows'] += len(chunk)
+        stats['seconds'] = time.perf_counter() - started
+        stats['rows_per_sec'] = stats['rows'] / max(stats['seconds'], 1e-9)
+        if progress:
+            progress(stats)
+
+    logger.info(
+        f"Scored {stats['rows']} {mission} rows with level {level} "
+        f"in {stats['seconds']:.2f}s - {stats['rows_per_sec']:.0f} rows/sec"
+    )
+    return stats
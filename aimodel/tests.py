@@ -1,3 +1,838 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from . import benchmarks, frames, pool
+from .jobs import fail_stale_jobs, run_job
+from .metrics import StageMetrics, StageTimings
+from .apps import _is_runserver
+from .cache import PredictionCache
+from .features import get_feature_spec
+from .importer import MISSION_MODELS, catalogue_fields, import_catalogue, validate_chunk
+from .models import DF, ExoplanetPrediction, PredictionJob
+from .prediction_log import PredictionLogWriter
+from .registry import LEVELS, MISSIONS, MODELS_DIR, ModelRegistry, get_registry, model_paths
+from .scoring import score_mission_rows
+from .transform_to_log import EXAMPLE_SAMPLES, predict_exoplanet, predict_exoplanet_batch, transform_and_scale
+from .warmup import WarmupState, warm_up
+
+SAMPLES = dict(
+    EXAMPLE_SAMPLES,
+    # Отрицательное значение проверяет ветку log1p(|x|)
+    tess=dict(EXAMPLE_SAMPLES["tess"], pl_trandeperr1=-0.0012),
+)
+
+
+class FeatureSpecParityTests(SimpleTestCase):
+    """Numpy-путь должен давать ровно те же признаки, что pandas-путь transform_and_scale"""
+
+    def assert_parity(self, sample, mission, level):
+        expected = transform_and_scale(sample, mission, level).to_numpy()[0]
+        spec = get_feature_spec(mission)
+        actual = spec.scale(spec.transform(sample), get_registry().get(mission, level).scaler)
+        self.assertEqual(spec.columns, tuple(transform_and_scale(sample, mission, level).columns))
+        self.assertTrue(np.array_equal(actual, expected), f"{mission} level {level}: {actual} != {expected}")
+
+    def test_features_match_pandas_path(self):
+        for mission in MISSIONS:
+            for level in LEVELS:
+                with self.subTest(mission=mission, level=level):
+                    self.assert_parity(SAMPLES[mission], mission, level)
+
+    def test_missing_optional_fields_are_zero_filled(self):
+        for mission in MISSIONS:
+            spec = get_feature_spec(mission)
+            sample = {name: SAMPLES[mission][name] for name in spec.required}
+            with self.subTest(mission=mission):
+                self.assert_parity(sample, mission, 1)
+
+    def test_missing_log_source_raises(self):
+        sample = dict(SAMPLES["k2"])
+        del sample["sy_dist"]
+        with self.assertRaises(KeyError):
+            get_feature_spec("k2").transform(sample)
+
+    def test_predictions_match_pandas_path(self):
+        for mission in MISSIONS:
+            for level in LEVELS:
+                with self.subTest(mission=mission, level=level):
+                    model = get_registry().get(mission, level).model
+                    expected = model.predict_proba(transform_and_scale(SAMPLES[mission], mission, level))[0]
+                    result = predict_exoplanet(SAMPLES[mission], mission, level)
+                    self.assertEqual(result["planet_prob"], float(expected[1]))
+                    self.assertEqual(result["non_planet_prob"], float(expected[0]))
+
+    def test_batch_matrix_matches_pandas_path(self):
+        for mission in MISSIONS:
+            spec = get_feature_spec(mission)
+            partial = {name: SAMPLES[mission][name] for name in spec.required}
+            for level in LEVELS:
+                with self.subTest(mission=mission, level=level):
+                    model = get_registry().get(mission, level).model
+                    results = predict_exoplanet_batch([SAMPLES[mission], partial], mission, level)
+                    for result, sample in zip(results, [SAMPLES[mission], partial]):
+                        expected = model.predict_proba(transform_and_scale(sample, mission, level))[0]
+                        self.assertEqual(result["planet_prob"], float(expected[1]))
+
+    def test_model_feature_names_match_spec(self):
+        for mission in MISSIONS:
+            entry = get_registry().get(mission, 1)
+            spec = get_feature_spec(mission)
+            spec.check_model(entry.model, entry.scaler)
+            with self.assertRaises(ValueError):
+                get_feature_spec("tess" if mission == "k2" else "k2").check_model(entry.model, entry.scaler)
+
+
+class ScoreMissionRowsTests(TestCase):
+    def test_scores_match_batch_predictions(self):
+        for mission in MISSIONS:
+            model = MISSION_MODELS[mission]
+            row = {name: SAMPLES[mission][name] for name in catalogue_fields(model)}
+            model.objects.bulk_create([model(**row) for _ in range(3)])
+            with self.subTest(mission=mission):
+                stats = score_mission_rows(model.objects.all(), mission, level=2, chunk_size=2, batch_size=2)
+                self.assertEqual(stats["rows"], 3)
+                expected = predict_exoplanet_batch([row], mission, 2)[0]["planet_prob"]
+                for obj in model.objects.all():
+                    self.assertEqual(obj.model_level, 2)
+                    self.assertIsNotNone(obj.scored_at)
+                    self.assertAlmostEqual(obj.planet_probability, expected, places=12)
+
+
+def sample_frame():
+    return pd.DataFrame({
+        "period": [1.5, 2.5, np.nan],
+        "count": [1, 2, 3],
+        "name": ["a", None, "c"],
+    })
+
+
+class FramesTests(SimpleTestCase):
+    def test_encode_frame_masks_missing_strings(self):
+        columns, arrays = frames.encode_frame(sample_frame())
+        self.assertEqual(columns, ["period", "count", "name"])
+        self.assertEqual(sorted(arrays), ["c0", "c1", "c2", "c2_null"])
+        self.assertEqual(arrays["c1"].dtype, np.int64)
+        self.assertEqual(arrays["c2"].tolist(), ["a", "", "c"])
+        self.assertEqual(arrays["c2_null"].tolist(), [False, True, False])
+
+    def test_tz_aware_datetimes_become_epoch_nanoseconds(self):
+        frame = pd.DataFrame({"t": pd.to_datetime(["2024-01-01T02:00:00+02:00"])})
+        columns, payload = frames.dumps_npz(frame)
+        self.assertEqual(frames.loads_npz(payload, columns)["t"].tolist(), [pd.Timestamp("2024-01-01").value])
+
+    def test_object_columns_needing_pickle_are_rejected(self):
+        with self.assertRaises(ValueError):
+            frames.encode_frame(pd.DataFrame({"p": pd.period_range("2020", periods=2, freq="Y")}))
+
+    def test_npz_round_trip(self):
+        columns, payload = frames.dumps_npz(sample_frame())
+        restored = frames.loads_npz(payload, columns)
+        pd.testing.assert_frame_equal(restored, sample_frame(), check_dtype=False)
+
+    def test_read_npy_column_is_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as path:
+            frames.write_npy_dir(sample_frame(), path)
+            period = frames.read_npy_column(path, 0)
+            self.assertIsInstance(period, np.memmap)
+            np.testing.assert_array_equal(period, [1.5, 2.5, np.nan])
+            self.assertEqual(frames.read_npy_column(path, 2).tolist(), ["a", None, "c"])
+
+
+class DFStorageTests(TestCase):
+    def setUp(self):
+        frames_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(frames_dir.cleanup)
+        self.enterContext(override_settings(AIMODEL_FRAMES_DIR=frames_dir.name))
+
+    def test_storage_modes_round_trip(self):
+        for storage in ("json", "npz", "npy"):
+            with self.subTest(storage=storage):
+                df = DF(mission="k2")
+                df.set_frame(sample_frame(), storage=storage)
+                df.save()
+                df = DF.objects.get(pk=df.pk)
+                self.assertEqual((df.storage, df.row_count, df.columns), (storage, 3, ["period", "count", "name"]))
+                self.assertEqual(df.column("name").tolist(), ["a", None, "c"])
+                pd.testing.assert_frame_equal(df.to_frame(), sample_frame(), check_dtype=False)
+                pd.testing.assert_frame_equal(df.to_frame(["count"]), sample_frame()[["count"]], check_dtype=False)
+
+    def test_switching_from_npy_removes_column_files(self):
+        df = DF(mission="k2")
+        df.set_frame(sample_frame(), storage="npy")
+        path = df.payload_path
+        self.assertTrue(os.path.isdir(path))
+        df.set_frame(sample_frame(), storage="npz")
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(df.payload_path, "")
+
+    def test_admin_parses_data_into_storage(self):
+        admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client.force_login(admin)
+        response = self.client.post("/admin/aimodel/df/add/", {
+            "mission": "k2", "data": json.dumps([{"period": 1.5, "name": "a"}, {"period": 2.5, "name": None}]),
+        })
+        self.assertEqual(response.status_code, 302)
+        df = DF.objects.get()
+        self.assertEqual((df.storage, df.columns, df.row_count), ("npz", ["period", "name"], 2))
+        self.assertEqual(df.to_frame()["name"].tolist(), ["a", None])
+
+        response = self.client.post("/admin/aimodel/df/add/", {"mission": "k2", "data": json.dumps("text")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(DF.objects.count(), 1)
+
+
+class DFColumnarMigrationTests(TransactionTestCase):
+    before = [("aimodel", "0005_prediction_log_indexes")]
+    after = [("aimodel", "0006_df_columnar_storage")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_forward_and_backward(self):
+        records = [{"period": 1.5, "name": "a"}, {"period": None, "name": None}]
+        OldDF = self.migrate(self.before).get_model("aimodel", "DF")
+        pk = OldDF.objects.create(mission="k2", data=records).pk
+
+        NewDF = self.migrate(self.after).get_model("aimodel", "DF")
+        df = NewDF.objects.get(pk=pk)
+        self.assertEqual((df.storage, df.data, df.columns, df.row_count), ("npz", None, ["period", "name"], 2))
+        self.assertEqual(frames.loads_npz(df.payload, df.columns)["name"].tolist(), ["a", None])
+
+        OldDF = self.migrate(self.before).get_model("aimodel", "DF")
+        restored = OldDF.objects.get(pk=pk).data
+        self.assertEqual(restored[0], {"period": 1.5, "name": "a"})
+        self.assertIsNone(restored[1]["name"])
+        self.assertTrue(restored[1]["period"] is None or np.isnan(restored[1]["period"]))
+
+
+class WarmupEntryPointTests(SimpleTestCase):
+    def test_only_runserver_child_is_detected(self):
+        cases = [
+            (["manage.py", "runserver"], "true", True),
+            (["manage.py", "runserver", "--noreload"], "", True),
+            (["manage.py", "runserver"], "", False),
+            (["manage.py", "migrate"], "true", False),
+            (["django-admin", "migrate"], "", False),
+            (["-c"], "", False),
+            (["/usr/bin/pytest"], "", False),
+        ]
+        for argv, run_main, expected in cases:
+            with self.subTest(argv=argv), mock.patch("sys.argv", argv), mock.patch.dict(os.environ, {"RUN_MAIN": run_main}):
+                self.assertIs(_is_runserver(), expected)
+
+
+@override_settings(AIMODEL_PRELOAD_MODELS=True)
+class ModelsReadyTests(SimpleTestCase):
+    def setUp(self):
+        self.state = WarmupState()
+        self.enterContext(mock.patch("aimodel.warmup._state", self.state))
+
+    def ready(self):
+        response = self.client.get(reverse("models_ready_api"))
+        return response.status_code, response.json()
+
+    def test_ready_only_after_warm_up(self):
+        status, payload = self.ready()
+        self.assertEqual((status, payload["status"], payload["ready"]), (503, "pending", False))
+
+        warm_up([("k2", 1)])
+        status, payload = self.ready()
+        self.assertEqual((status, payload["status"], payload["ready"]), (200, "ready", True))
+        self.assertIn("load k2 level 1", payload["timings_ms"])
+
+    def test_failed_model_load(self):
+        with mock.patch.object(ModelRegistry, "get", side_effect=OSError("model file is missing")), \
+                self.assertLogs("aimodel.warmup", "ERROR"):
+            warm_up([("k2", 1)])
+        status, payload = self.ready()
+        self.assertEqual((status, payload["status"], payload["error"]), (503, "error", "model file is missing"))
+
+    @override_settings(AIMODEL_PRELOAD_MODELS=False)
+    def test_disabled_preload_is_ready(self):
+        self.assertEqual(self.ready()[0], 200)
+
+
+@override_settings(AIMODEL_PREDICTION_LOG={"ENABLED": False})
+class PredictApiFormatTests(SimpleTestCase):
+    def post(self, url=None, **payload):
+        sample = dict(SAMPLES["k2"], note="<script>alert(1)</script>")
+        return self.client.post(
+            url or reverse("predict_exoplanet_api"), json.dumps({"mission": "k2", "sample_data": sample, **payload}),
+            content_type="application/json",
+        )
+
+    def test_json_by_default(self):
+        data = self.post().json()
+        self.assertEqual(data["mission"], "K2")
+        self.assertIn("planet_prob", data)
+        self.assertNotIn("dataframe_html", data)
+
+    def test_html_table_is_escaped(self):
+        for response in (self.post(format="html"), self.post(f"{reverse('predict_exoplanet_api')}?format=html")):
+            html = response.json()["dataframe_html"]
+            self.assertIn('<table border="1" class="dataframe result-table">', html)
+            self.assertIn("<td>Planet Probability</td>", html)
+            self.assertIn("&lt;script&gt;alert(1)&lt;/script&gt;", html)
+            self.assertNotIn("<script>", html)
+
+    def test_unknown_format(self):
+        response = self.post(format="xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Invalid format. Must be: json or html")
+
+
+class PredictBatchApiTests(SimpleTestCase):
+    def setUp(self):
+        self.samples = [dict(SAMPLES["k2"], pl_orbper=10.0 + i) for i in range(3)]
+
+    def post(self, payload):
+        return self.client.post(reverse("predict_exoplanet_batch_api"), json.dumps(payload), content_type="application/json")
+
+    def test_records_and_columns_give_the_same_results(self):
+        expected = [r["planet_prob"] for r in predict_exoplanet_batch(self.samples, "k2", 1)]
+        columns = {name: [sample[name] for sample in self.samples] for name in self.samples[0]}
+        for payload in ({"samples": self.samples}, {"columns": columns}):
+            with self.subTest(payload=list(payload)):
+                response = self.post({"mission": "k2", "level": 1, **payload})
+                self.assertEqual(response.status_code, 200, response.content)
+                data = response.json()
+                self.assertEqual((data["mission"], data["count"], data["error_count"]), ("K2", 3, 0))
+                self.assertEqual([r["index"] for r in data["results"]], [0, 1, 2])
+                np.testing.assert_allclose([r["planet_prob"] for r in data["results"]], expected, rtol=1e-12)
+
+    def test_invalid_row_does_not_fail_the_batch(self):
+        self.samples[1] = dict(self.samples[1], pl_rade="not a number")
+        data = self.post({"mission": "k2", "samples": self.samples}).json()
+        self.assertEqual((data["count"], data["error_count"]), (3, 1))
+        self.assertEqual(["error" in r for r in data["results"]], [False, True, False])
+
+    def test_limits(self):
+        with override_settings(AIMODEL_BATCH_MAX_ROWS=2):
+            self.assertEqual(self.post({"mission": "k2", "samples": self.samples}).status_code, 413)
+        with override_settings(AIMODEL_BATCH_MAX_BYTES=100):
+            response = self.post({"mission": "k2", "samples": self.samples})
+            self.assertEqual(response.status_code, 413)
+            self.assertIn("Request body too large", response.json()["error"])
+
+    def test_bad_columns(self):
+        columns = {name: [value, value] for name, value in SAMPLES["k2"].items()}
+        for name, broken in (
+            ("shorter", dict(columns, pl_orbper=[1.0])),
+            ("longer", dict(columns, pl_orbper=[1.0, 2.0, 3.0])),
+            ("not a list", dict(columns, pl_orbper=1.0)),
+        ):
+            with self.subTest(name):
+                self.assertEqual(self.post({"mission": "k2", "columns": broken}).status_code, 400)
+        # Отсутствующий признак - ошибка каждой строки, как у образца без поля
+        data = self.post({"mission": "k2", "columns": {k: v for k, v in columns.items() if k != "pl_orbper"}}).json()
+        self.assertEqual((data["count"], data["error_count"]), (2, 2))
+
+
+def prediction_fields(**overrides):
+    return dict({
+        "mission": "k2", "model_level": 1, "input_data": {}, "planet_probability": 0.5,
+        "non_planet_probability": 0.5, "prediction_status": "CANDIDATE",
+    }, **overrides)
+
+
+@mock.patch.object(PredictionLogWriter, "_start")
+class PredictionLogWriterTests(TestCase):
+    def test_flush_writes_recorded_predictions(self, start):
+        writer = PredictionLogWriter(batch_size=2, max_pending=10)
+        for probability in (0.1, 0.2, 0.3):
+            writer.add(**prediction_fields(planet_probability=probability))
+        start.assert_called()
+        self.assertEqual(writer.stats()["pending"], 3)
+        self.assertEqual(writer.flush(), 3)
+        self.assertEqual(writer.flush(), 0)
+        self.assertEqual(sorted(ExoplanetPrediction.objects.values_list("planet_probability", flat=True)), [0.1, 0.2, 0.3])
+        self.assertEqual(writer.stats(), {"pending": 0, "written": 3, "dropped": 0, "failed": 0})
+
+    def test_records_beyond_max_pending_are_dropped(self, start):
+        writer = PredictionLogWriter(max_pending=2)
+        for _ in range(3):
+            writer.add(**prediction_fields())
+        self.assertEqual(writer.stats()["dropped"], 1)
+        self.assertEqual(writer.flush(), 2)
+
+    def test_failed_batch_is_counted(self, start):
+        writer = PredictionLogWriter()
+        writer.add(**prediction_fields(no_such_field=1))
+        with self.assertLogs("aimodel.prediction_log", "ERROR"):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(writer.stats()["failed"], 1)
+
+
+class PredictionHistoryApiTests(TestCase):
+    def setUp(self):
+        self.job = PredictionJob.objects.create(mission="kepler", input_path="in.csv")
+        self.predictions = [
+            ExoplanetPrediction.objects.create(**prediction_fields(
+                mission="kepler" if i % 2 else "k2", model_level=1 + i % 3 // 2, planet_probability=i / 10,
+                job=self.job if i < 3 else None,
+            ))
+            for i in range(10)
+        ]
+
+    def ids(self, **params):
+        """id всех страниц истории по курсорам next_cursor"""
+        seen, params = [], dict(params)
+        while True:
+            response = self.client.get(reverse("prediction_history_api"), params)
+            self.assertEqual(response.status_code, 200)
+            payload = response.json()
+            seen += [row["id"] for row in payload["results"]]
+            if not payload["next_cursor"]:
+                self.assertIsNone(payload["next"])
+                return seen
+            self.assertEqual(QueryDict(payload["next"].split("?", 1)[1])["cursor"], payload["next_cursor"])
+            params["cursor"] = payload["next_cursor"]
+
+    def expected(self, keep):
+        return [p.pk for p in reversed(self.predictions) if keep(p)]
+
+    def test_pages_newest_first(self):
+        self.assertEqual(self.ids(limit=3), self.expected(lambda p: True))
+
+    def test_filters(self):
+        cases = [
+            ({"mission": "KEPLER"}, lambda p: p.mission == "kepler"),
+            ({"level": 2}, lambda p: p.model_level == 2),
+            ({"min_probability": 0.35}, lambda p: p.planet_probability >= 0.35),
+            ({"max_probability": 0.35}, lambda p: p.planet_probability <= 0.35),
+            ({"job": str(self.job.pk)}, lambda p: p.job_id == self.job.pk),
+        ]
+        for params, keep in cases:
+            with self.subTest(params=params):
+                self.assertEqual(self.ids(limit=2, **params), self.expected(keep))
+
+    def test_invalid_parameters(self):
+        for params in ({"job": "not-a-uuid"}, {"cursor": "nope"}, {"mission": "mars"}, {"level": "x"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse("prediction_history_api"), params).status_code, 400)
+
+    def test_detail(self):
+        prediction = self.predictions[0]
+        response = self.client.get(reverse("prediction_detail_api", args=[prediction.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], prediction.pk)
+        self.assertEqual(response.json()["job_id"], str(self.job.pk))
+        self.assertEqual(response.json()["input_data"], {})
+        self.assertEqual(self.client.get(reverse("prediction_detail_api", args=[10**6])).status_code, 404)
+
+
+def job_csv(samples, note=None):
+    """CSV образцов k2; note добавляет текстовую колонку с переводом строки внутри кавычек"""
+    frame = pd.DataFrame(samples)
+    if note is not None:
+        frame["note"] = note
+    return frame.to_csv(index=False).encode()
+
+
+@override_settings(AIMODEL_JOB_WORKERS=1, AIMODEL_JOB_CHUNK_SIZE=2)
+@mock.patch("aimodel.jobs.start_job", side_effect=lambda job: run_job(job.pk))
+class PredictionJobTests(TestCase):
+    def setUp(self):
+        jobs_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(jobs_dir.cleanup)
+        self.enterContext(override_settings(AIMODEL_JOBS_DIR=jobs_dir.name))
+        self.samples = [dict(SAMPLES["k2"], pl_orbper=10.0 + i) for i in range(5)]
+
+    def submit(self, **kwargs):
+        response = self.client.post(reverse("prediction_jobs_api"), **kwargs)
+        self.assertEqual(response.status_code, 202, response.content)
+        return PredictionJob.objects.get(pk=response.json()["id"])
+
+    def result_rows(self, job):
+        response = self.client.get(reverse("prediction_job_result_api", args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        return pd.read_csv(io.BytesIO(b"".join(response.streaming_content)), keep_default_na=False)
+
+    def test_json_submission(self, start_job):
+        job = self.submit(data=json.dumps({"mission": "k2", "level": 2, "samples": self.samples}), content_type="application/json")
+        self.assertEqual((job.status, job.model_level, job.total_rows, job.processed_rows), ("success", 2, 5, 5))
+        expected = [r["planet_prob"] for r in predict_exoplanet_batch(self.samples, "k2", 2)]
+        np.testing.assert_allclose(self.result_rows(job)["planet_prob"], expected, rtol=1e-12)
+
+    def test_multipart_submission_counts_parsed_rows(self, start_job):
+        # Перевод строки внутри кавычек - не новая строка CSV
+        upload = SimpleUploadedFile("rows.csv", job_csv(self.samples, note="line one\nline two"))
+        job = self.submit(data={"file": upload, "mission": "k2", "level": "1"})
+        self.assertEqual((job.status, job.total_rows, job.processed_rows), ("success", 5, 5))
+        self.assertEqual(job.progress, 1.0)
+        self.assertEqual(job.predictions.get(row_index=0).input_data["note"], "line one\nline two")
+
+    def test_invalid_rows_are_reported_per_row(self, start_job):
+        samples = list(self.samples)
+        samples[1] = dict(samples[1], pl_rade="not a number")
+        job = self.submit(data=json.dumps({"mission": "k2", "samples": samples}), content_type="application/json")
+        self.assertEqual((job.status, job.processed_rows, job.error_rows), ("success", 5, 1))
+        rows = self.result_rows(job)
+        self.assertEqual(rows["error"].astype(bool).tolist(), [False, True, False, False, False])
+        self.assertEqual(job.predictions.get(row_index=1).status, "error")
+
+    def test_status_and_result_before_success(self, start_job):
+        job = PredictionJob.objects.create(mission="k2", input_path="missing.csv", status="running", total_rows=4, processed_rows=1)
+        status = self.client.get(reverse("prediction_job_api", args=[job.pk])).json()
+        self.assertEqual((status["status"], status["progress"]), ("running", 0.25))
+        response = self.client.get(reverse("prediction_job_result_api", args=[job.pk]))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["status"], "running")
+
+    def test_missing_result_file(self, start_job):
+        job = self.submit(data=json.dumps({"mission": "k2", "samples": self.samples}), content_type="application/json")
+        os.remove(job.result_path)
+        without_path = PredictionJob.objects.create(mission="k2", input_path="a.csv", status="success", result_path="")
+        for pk in (job.pk, without_path.pk):
+            response = self.client.get(reverse("prediction_job_result_api", args=[pk]))
+            self.assertEqual(response.status_code, 410)
+            self.assertEqual((response.json()["error"], response.json()["status"]), ("Job result is no longer available", "success"))
+
+    def test_malformed_input_fails_the_job(self, start_job):
+        job = self.submit(data={"file": SimpleUploadedFile("rows.csv", b""), "mission": "k2"})
+        self.assertEqual(job.status, "error")
+        self.assertEqual(self.client.get(reverse("prediction_job_result_api", args=[job.pk])).status_code, 409)
+
+    def test_stale_jobs_are_marked_failed(self, start_job):
+        stale = PredictionJob.objects.create(mission="k2", input_path="a.csv", status="running")
+        fresh = PredictionJob.objects.create(mission="k2", input_path="b.csv", status="running")
+        PredictionJob.objects.filter(pk=stale.pk).update(updated_at=stale.updated_at - timedelta(hours=1))
+        self.assertEqual(self.client.get(reverse("prediction_job_api", args=[stale.pk])).json()["status"], "error")
+        self.assertEqual(fail_stale_jobs(), 0)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, "running")
+
+
+class PoolTests(SimpleTestCase):
+    def test_score_chunks_keeps_input_order(self):
+        frame = pd.DataFrame([dict(SAMPLES["k2"], pl_orbper=10.0 + i) for i in range(5)])
+        chunks = [frame[i:i + 2] for i in range(0, 5, 2)]
+        expected = [results for _, results in pool.score_chunks(iter(chunks), "k2", 1)]
+        original = pool.score_chunk
+
+        def slow_first_chunk(chunk, *args):
+            # Первый кусок считается дольше следующих: результаты всё равно идут по порядку
+            if chunk.index[0] == 0:
+                time.sleep(0.2)
+            return original(chunk, *args)
+
+        with ThreadPoolExecutor(2) as executor, mock.patch.object(pool, "get_process_pool", return_value=executor), \
+                mock.patch.object(pool, "score_chunk", side_effect=slow_first_chunk):
+            scored = list(pool.score_chunks(iter(chunks), "k2", 1, workers=2))
+        self.assertEqual([chunk.index[0] for chunk, _ in scored], [0, 2, 4])
+        self.assertEqual([results for _, results in scored], expected)
+
+    def test_split_samples(self):
+        rows = list(range(10))
+        self.assertEqual(pool.split_samples(rows, 2), [(0, rows[:5]), (5, rows[5:])])
+        self.assertEqual(pool.split_samples(rows, 3), [(0, rows[:4]), (4, rows[4:8]), (8, rows[8:])])
+        self.assertEqual(pool.split_samples([7], 4), [(0, [7])])
+        self.assertEqual(pool.split_samples([], 4), [])
+
+        frame = pd.DataFrame({"a": rows})
+        self.assertEqual([(offset, len(part)) for offset, part in pool.split_samples(frame, 4)], [(0, 3), (3, 3), (6, 3), (9, 1)])
+        # Колонка-не-список не режется: её отклонит samples_to_frame
+        parts = pool.split_samples({"a": rows, "b": 1.0}, 2)
+        self.assertEqual(parts, [(0, {"a": rows[:5], "b": 1.0}), (5, {"a": rows[5:], "b": 1.0})])
+
+    def test_cpu_budget_is_split_between_web_workers(self):
+        with mock.patch("os.sched_getaffinity", return_value=set(range(8)), create=True):
+            for web_concurrency, expected in (("1", 8), ("2", 4), ("3", 2), ("16", 1), ("nope", 8)):
+                with self.subTest(web_concurrency), mock.patch.dict(os.environ, {"WEB_CONCURRENCY": web_concurrency}):
+                    self.assertEqual(pool.cpu_budget(), expected)
+            with mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "2"}):
+                self.assertEqual(pool.resolve_thread_count(workers=2), 2)
+                self.assertEqual(pool.resolve_thread_count(3, workers=2), 3)
+
+    def test_predict_parallel_keeps_input_order(self):
+        samples = [dict(SAMPLES["k2"], pl_orbper=10.0 + i) for i in range(7)]
+        samples[4] = dict(samples[4], pl_rade="not a number")
+        expected = predict_exoplanet_batch(samples, "k2", 1)
+        self.assertEqual(pool.predict_parallel(samples[:1], "k2", 1, mode="processes", workers=4), expected[:1])
+
+        with ThreadPoolExecutor(3) as executor, mock.patch.object(pool, "get_process_pool", return_value=executor), \
+                mock.patch.object(pool, "MIN_ROWS_PER_WORKER", 1):
+            results = pool.predict_parallel(samples, "k2", 1, mode="processes", workers=3)
+        self.assertEqual([r["index"] for r in results], list(range(7)))
+        self.assertEqual(results, expected)
+
+
+class PredictionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.enterContext(mock.patch("aimodel.cache.time.monotonic", side_effect=lambda: self.now))
+
+    def result(self, value):
+        return {"mission": "k2", "planet_prob": value, "non_planet_prob": 1 - value}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PredictionCache(max_entries=2)
+        cache.set("a", self.result(0.1))
+        cache.set("b", self.result(0.2))
+        self.assertEqual(cache.get("a"), self.result(0.1))
+        cache.set("c", self.result(0.3))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats(), {
+            "entries": 2, "bytes": cache.stats()["bytes"], "hits": 3, "shared_hits": 0,
+            "misses": 1, "evictions": 1, "expirations": 0,
+        })
+
+    def test_entries_expire_after_ttl(self):
+        cache = PredictionCache(ttl=10)
+        cache.set("a", self.result(0.1))
+        self.now += 9.9
+        self.assertIsNotNone(cache.get("a"))
+        self.now += 0.2
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((cache.stats()["expirations"], cache.stats()["entries"], cache.stats()["bytes"]), (1, 0, 0))
+
+    def test_byte_budget_evicts_oldest_entries(self):
+        probe = PredictionCache()
+        probe.set("a", self.result(0.1))
+        entry_bytes = probe.stats()["bytes"]
+
+        cache = PredictionCache(max_bytes=entry_bytes * 2)
+        for key in "abc":
+            cache.set(key, self.result(0.1))
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertLessEqual(cache.stats()["bytes"], entry_bytes * 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_results_are_copies(self):
+        cache = PredictionCache()
+        result = self.result(0.1)
+        cache.set("a", result)
+        result["planet_prob"] = 0.9
+        cache.get("a")["planet_prob"] = 0.8
+        self.assertEqual(cache.get("a")["planet_prob"], 0.1)
+
+    def test_shared_tier_fills_local_cache(self):
+        shared = LocMemCache("prediction-cache-test", {})
+        PredictionCache(django_cache=shared).set("a", self.result(0.1))
+        cache = PredictionCache(django_cache=shared)
+        self.assertEqual(cache.get("a"), self.result(0.1))
+        self.assertEqual(cache.get("a"), self.result(0.1))
+        self.assertEqual((cache.stats()["shared_hits"], cache.stats()["hits"], cache.stats()["misses"]), (1, 1, 0))
+
+    def test_key_ignores_sign_of_zero(self):
+        self.assertEqual(
+            PredictionCache.make_key("k2", 1, "f", np.array([0.0, 1.0])),
+            PredictionCache.make_key("k2", 1, "f", np.array([-0.0, 1.0])),
+        )
+        self.assertNotEqual(
+            PredictionCache.make_key("k2", 1, "f", np.array([0.0, 1.0])),
+            PredictionCache.make_key("k2", 1, "g", np.array([0.0, 1.0])),
+        )
+
+    def test_changed_model_files_invalidate_cached_predictions(self):
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir)
+        shutil.copytree(os.path.join(MODELS_DIR, "k2"), os.path.join(base_dir, "k2"))
+        cache = PredictionCache(check_interval=5)
+
+        with mock.patch("aimodel.transform_to_log.get_prediction_cache", return_value=cache):
+            first = predict_exoplanet(SAMPLES["k2"], "k2", 1, base_dir)
+            predict_exoplanet(SAMPLES["k2"], "k2", 1, base_dir)
+            self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+
+            model_path, _ = model_paths("k2", 1, base_dir)
+            stat = os.stat(model_path)
+            os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            # Файлы сверяются не чаще раза в check_interval
+            predict_exoplanet(SAMPLES["k2"], "k2", 1, base_dir)
+            self.assertEqual(cache.stats()["hits"], 2)
+
+            self.now += 5
+            second = predict_exoplanet(SAMPLES["k2"], "k2", 1, base_dir)
+            self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (2, 2))
+            self.assertEqual(first["planet_prob"], second["planet_prob"])
+
+
+class CatalogueImportTests(TestCase):
+    def setUp(self):
+        self.fields = catalogue_fields(MISSION_MODELS["kepler"])
+        self.row = {name: SAMPLES["kepler"][name] for name in self.fields}
+
+    def csv(self, rows, drop=()):
+        columns = [name for name in self.fields if name not in drop]
+        return io.StringIO(pd.DataFrame(rows, columns=columns).to_csv(index=False))
+
+    def test_validate_chunk(self):
+        rows = [dict(self.row) for _ in range(5)]
+        rows[1]["koi_period"] = "abc"
+        rows[2]["koi_depth"] = None
+        rows[3]["koi_prad"] = "inf"
+        rows[4]["koi_num_transits"] = "2.5"
+        valid, errors = validate_chunk(pd.DataFrame(rows, dtype=object), self.fields, offset=10)
+        self.assertEqual(list(valid.index), [0])
+        self.assertEqual(valid["koi_num_transits"].dtype, np.int64)
+        self.assertEqual(errors, {
+            11: "Non-numeric value for koi_period",
+            12: "Missing value for koi_depth",
+            13: "Infinite value for koi_prad",
+            14: "Non-integer value for koi_num_transits",
+        })
+
+    def test_bad_rows_are_skipped_unless_strict(self):
+        rows = [dict(self.row) for _ in range(5)]
+        rows[3]["koi_period"] = "abc"
+        stats = import_catalogue(self.csv(rows), "kepler", chunk_size=2, batch_size=2)
+        self.assertEqual((stats["rows"], stats["imported"], stats["skipped"]), (5, 4, 1))
+        self.assertEqual(stats["errors"], {3: "Non-numeric value for koi_period"})
+        self.assertEqual(MISSION_MODELS["kepler"].objects.count(), 4)
+
+        with self.assertRaisesMessage(ValueError, "Row 3: Non-numeric value for koi_period"):
+            import_catalogue(self.csv(rows), "kepler", chunk_size=2, strict=True)
+        # strict: уже записанные куски этого импорта откатываются
+        self.assertEqual(MISSION_MODELS["kepler"].objects.count(), 4)
+
+    def test_replace(self):
+        import_catalogue(self.csv([self.row] * 3), "kepler")
+        stats = import_catalogue(self.csv([self.row] * 2), "kepler", replace=True)
+        self.assertEqual(stats["imported"], 2)
+        self.assertEqual(MISSION_MODELS["kepler"].objects.count(), 2)
+
+        # Ошибка откатывает и очистку таблицы
+        with self.assertRaises(ValueError):
+            import_catalogue(self.csv([self.row], drop=["koi_period"]), "kepler", replace=True)
+        self.assertEqual(MISSION_MODELS["kepler"].objects.count(), 2)
+
+    def test_header_is_checked_before_rows(self):
+        for source, message in (
+            (io.StringIO(""), "CSV has no header row"),
+            (io.StringIO("# archive comment\n"), "CSV has no header row"),
+            (self.csv([], drop=["koi_period"]), "Columns not in CSV: koi_period"),
+            (self.csv([self.row], drop=["koi_period", "koi_kmag"]), "Columns not in CSV: koi_period, koi_kmag"),
+        ):
+            with self.subTest(message=message), self.assertRaisesMessage(ValueError, message):
+                import_catalogue(source, "kepler")
+        stats = import_catalogue(self.csv([]), "kepler")
+        self.assertEqual((stats["rows"], stats["imported"]), (0, 0))
+
+
+class ScoreCatalogueCommandTests(SimpleTestCase):
+    def setUp(self):
+        output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(output_dir.cleanup)
+        self.path = os.path.join(output_dir.name, "k2.csv")
+        self.samples = [dict(SAMPLES["k2"], pl_orbper=10.0 + i) for i in range(5)]
+        self.samples[2] = dict(self.samples[2], pl_rade="not a number")
+        frame = pd.DataFrame(self.samples)
+        frame.insert(0, "pl_name", [f"K2-{i}" for i in range(5)])
+        with open(self.path, "w", newline="") as f:
+            # Выгрузки архива начинаются с комментариев
+            f.write("# NASA Exoplanet Archive\n")
+            frame.to_csv(f, index=False)
+
+    def score(self, *args):
+        stdout = io.StringIO()
+        call_command("score_catalogue", self.path, "--mission", "k2", "--chunk-size", "2", *args, stdout=stdout)
+        rows = pd.read_csv(self.path.replace(".csv", "_scored.csv"), keep_default_na=False)
+        return rows, stdout.getvalue()
+
+    def test_keep_column_and_invalid_rows(self):
+        rows, stdout = self.score("--keep-column", "pl_name")
+        self.assertEqual(rows.columns.tolist(), ["index", "pl_name", "planet_prob", "non_planet_prob", "error"])
+        self.assertEqual(rows["pl_name"].tolist(), [f"K2-{i}" for i in range(5)])
+        # Невалидная строка попадает в отчёт, а не прерывает прогон
+        self.assertEqual(rows["error"].astype(bool).tolist(), [False, False, True, False, False])
+        self.assertIn("Scored 5 rows (1 invalid)", stdout)
+
+        valid = [sample for i, sample in enumerate(self.samples) if i != 2]
+        expected = [r["planet_prob"] for r in predict_exoplanet_batch(valid, "k2", 1)]
+        np.testing.assert_allclose(rows["planet_prob"].drop(index=2).astype(float), expected, rtol=1e-12)
+
+    def test_missing_keep_column_fails_before_scoring(self):
+        with mock.patch("aimodel.management.commands.score_catalogue.score_chunks") as score_chunks, \
+                self.assertRaisesMessage(CommandError, "Columns not in input: kepoi_name"):
+            self.score("--keep-column", "kepoi_name")
+        score_chunks.assert_not_called()
+        self.assertFalse(os.path.exists(self.path.replace(".csv", "_scored.csv")))
+
+
+class StageMetricsTests(SimpleTestCase):
+    def test_render_prometheus(self):
+        metrics = StageMetrics(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.5, 0.7, 3.0):
+            metrics.observe("predict", "k2", 1, seconds)
+        labels = 'stage="predict",mission="k2",level="1"'
+        lines = metrics.render_prometheus().splitlines()
+        self.assertEqual(lines[1], "# TYPE aimodel_stage_seconds histogram")
+        # Корзины кумулятивны: в +Inf попадает всё
+        self.assertEqual(lines[2:], [
+            f'aimodel_stage_seconds_bucket{{{labels},le="0.1"}} 1',
+            f'aimodel_stage_seconds_bucket{{{labels},le="1.0"}} 3',
+            f'aimodel_stage_seconds_bucket{{{labels},le="+Inf"}} 4',
+            f"aimodel_stage_seconds_sum{{{labels}}} {0.05 + 0.5 + 0.7 + 3.0!r}",
+            f"aimodel_stage_seconds_count{{{labels}}} 4",
+        ])
+
+    def test_stage_timings_record_their_stage(self):
+        metrics = StageMetrics()
+        timings = StageTimings("k2", 2, metrics=metrics)
+        with timings.stage("transform"):
+            time.sleep(0.01)
+        timings.record()
+        snapshot = metrics.snapshot()
+        self.assertEqual(set(snapshot), {("transform", "k2", "2"), ("total", "k2", "2")})
+        _, transform_sum, transform_count = snapshot[("transform", "k2", "2")]
+        self.assertEqual(transform_count, 1)
+        self.assertGreaterEqual(transform_sum, 0.01)
+        self.assertGreaterEqual(snapshot[("total", "k2", "2")][1], transform_sum)
+
+        StageTimings(metrics=metrics).record()
+        self.assertIn(("total", "unknown", "unknown"), metrics.snapshot())
+
+    @override_settings(AIMODEL_METRICS_ALLOWED_IPS=["10.0.0.1"])
+    def test_metrics_api_allow_list(self):
+        self.assertEqual(self.client.get(reverse("metrics_api"), REMOTE_ADDR="10.0.0.2").status_code, 403)
+        response = self.client.get(reverse("metrics_api"), REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn("# TYPE aimodel_stage_seconds histogram", response.content.decode())
+
+
+class BenchmarkRssTests(SimpleTestCase):
+    def test_peak_rss_units_and_missing_resource(self):
+        usage = mock.Mock(ru_maxrss=2048)
+        with mock.patch.object(benchmarks, "resource", mock.Mock(getrusage=mock.Mock(return_value=usage))):
+            for platform_name, expected in (("linux", 2048 * 1024), ("darwin", 2048)):
+                with self.subTest(platform_name), mock.patch.object(benchmarks.sys, "platform", platform_name):
+                    self.assertEqual(benchmarks._peak_rss_bytes(), expected)
+        with mock.patch.object(benchmarks, "resource", None):
+            self.assertIsNone(benchmarks._peak_rss_bytes())
+
+    def test_unmeasured_metrics_are_not_compared(self):
+        def report(peak_rss):
+            return {"models": [{"mission": "k2", "level": 1, "cold": {"peak_rss_bytes": peak_rss, "model_load_ms": 10.0}}]}
+
+        changes = benchmarks.compare_reports(report(1000), report(None))
+        self.assertEqual([change["metric"] for change in changes], ["cold.model_load_ms"])
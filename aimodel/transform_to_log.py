@@ -1,12 +1,19 @@
-import os
 import numpy as np
 import pandas as pd
-import joblib
+
+from .cache import get_prediction_cache
+from .features import FEATURE_SPECS, get_feature_spec
+from .metrics import StageTimings
+from .registry import MODELS_DIR, get_registry, normalize_mission
 
 
 # === 1. Feature transformation ===
 def transform_features(sample_dict: dict, mission: str) -> pd.DataFrame:
-    df = pd.DataFrame([sample_dict])
+    return transform_frame(pd.DataFrame([sample_dict]), mission)
+
+
+def transform_frame(df: pd.DataFrame, mission: str) -> pd.DataFrame:
+    """Логарифмические признаки для таблицы из одной или многих строк (df дополняется на месте)"""
     mission = mission.lower()
 
     # === K2 ===
@@ -45,7 +52,7 @@ def transform_features(sample_dict: dict, mission: str) -> pd.DataFrame:
             'koi_incl', 'koi_impact', 'koi_prad', 'koi_sma', 'koi_teq',
             'koi_insol', 'koi_model_snr', 'koi_num_transits', 'koi_max_sngle_ev',
             'koi_steff', 'koi_slogg', 'koi_smet', 'koi_srad', 'koi_smass',
-            'koi_srho', 'koi_kepmag', 'koi_gmag', 'koi_rmag', 'koi_imag',
+            'koi_srho', 'koi_count', 'koi_kepmag', 'koi_gmag', 'koi_rmag', 'koi_imag',
             'koi_zmag', 'koi_jmag', 'koi_hmag', 'koi_kmag',
             'log_koi_period', 'log_koi_depth', 'log_koi_dor',
             'log_koi_ror', 'log_koi_prad', 'log_koi_model_snr',
@@ -73,17 +80,11 @@ def transform_features(sample_dict: dict, mission: str) -> pd.DataFrame:
 
 
 # === 2. Трансформация + стандартизация ===
-def transform_and_scale(sample_dict: dict, mission: str, level: int, base_dir="models_pkl") -> pd.DataFrame:
-    mission = mission.lower()
-    prefix = "tess" if mission == "tes" else mission
-
-    scaler_path = os.path.join(base_dir, mission, f"{prefix}_scaler_lvl{level}.pkl")
-    if not os.path.exists(scaler_path):
-        raise FileNotFoundError(f"Скейлер не найден: {scaler_path}")
+def transform_and_scale(sample_dict: dict, mission: str, level: int, base_dir=MODELS_DIR) -> pd.DataFrame:
+    prefix = normalize_mission(mission)
+    scaler = get_registry(base_dir).get(prefix, level).scaler
 
     X = transform_features(sample_dict, prefix)
-    scaler = joblib.load(scaler_path)
-
     X_scaled = pd.DataFrame(
         scaler.transform(X.fillna(0)),
         columns=X.columns
@@ -92,100 +93,207 @@ def transform_and_scale(sample_dict: dict, mission: str, level: int, base_dir="m
 
 
 # === 3. Полный пайплайн: трансформация → стандартизация → предсказание ===
-def predict_exoplanet(sample_dict: dict, mission: str, level: int, base_dir="models_pkl") -> dict:
+def predict_exoplanet(sample_dict: dict, mission: str, level: int, base_dir=MODELS_DIR, timings=None) -> dict:
+    """
+    timings - StageTimings вызывающего кода (тогда в гистограммы его пишет он сам);
+    без него замеры стадий записываются здесь же.
+    """
     mission = mission.lower()
-    prefix = "tess" if mission == "tes" else mission
+    registry = get_registry(base_dir)
+    cache = get_prediction_cache()
+    own_timings = timings is None
+    if own_timings:
+        timings = StageTimings(normalize_mission(mission), level)
+
+    # Модель и скейлер берутся из процессного реестра, а не читаются с диска
+    with timings.stage("model_load"):
+        entry = cache.refresh_entry(registry, mission, level) if cache else registry.get(mission, level)
+    # Горячий путь без pandas: признаки и стандартизация прямо в numpy-векторе
+    spec = get_feature_spec(mission)
+    with timings.stage("transform"):
+        x = spec.transform(sample_dict)
+
+    result = None
+    if cache:
+        with timings.stage("cache_lookup"):
+            cache_key = cache.make_key(entry.mission, entry.level, entry.fingerprint, x)
+            result = cache.get(cache_key)
+    if result is None:
+        with timings.stage("scale"):
+            X = spec.scale(x, entry.scaler).astype(np.float32).reshape(1, -1)
+        # Одна строка не параллелится: лишние потоки CatBoost только конкурируют с другими воркерами
+        with timings.stage("predict_proba"):
+            proba = entry.model.predict_proba(X, thread_count=1)[0]
+        result = {
+            "mission": mission,
+            "planet_prob": float(proba[1]),
+            "non_planet_prob": float(proba[0])
+        }
+        if cache:
+            cache.set(cache_key, result)
 
-    model_path = os.path.join(base_dir, mission, f"{prefix}_model_lvl{level}.cbm")
-    scaler_path = os.path.join(base_dir, mission, f"{prefix}_scaler_lvl{level}.pkl")
+    if own_timings:
+        timings.record(planet_prob=result["planet_prob"])
+    return result
 
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Модель не найдена: {model_path}")
-    if not os.path.exists(scaler_path):
-        raise FileNotFoundError(f"Скейлер не найден: {scaler_path}")
 
-    X_scaled = transform_and_scale(sample_dict, mission, level, base_dir)
-    model = joblib.load(model_path)
-    proba = model.predict_proba(X_scaled)[0]
+# === 4. Пакетное предсказание ===
+# Поля, из которых считаются логарифмические признаки: без них строку не оценить
+REQUIRED_FIELDS = {mission: spec.required for mission, spec in FEATURE_SPECS.items()}
 
-    result = {
-        "mission": mission,
-        "planet_prob": float(proba[1]),
-        "non_planet_prob": float(proba[0])
-    }
 
-    print(f"\n🪐 Миссия: {mission.upper()} | Уровень: {level}")
-    print(f"Вероятность планеты: {result['planet_prob']:.4f}")
-    print(f"Вероятность не-планеты: {result['non_planet_prob']:.4f}")
-    return result
+def feature_columns(mission: str) -> tuple:
+    """Колонки, которые реально идут в модель (сырые + логарифмические)"""
+    return get_feature_spec(mission).columns
 
 
-# === Пример запуска для всех миссий ===
-if __name__ == "__main__":
-    samples = {
-        "k2": {
-            "pl_orbper": 41.688644,
-            "pl_trandur": 2.3,
-            "pl_rade": 2.355,
-            "pl_ratror": 0.022,
-            "st_teff": 5703.0,
-            "st_rad": 0.95,
-            "sy_pmra": 36.5,
-            "sy_pmdec": -51.3,
-            "sy_dist": 179.46,
-            "sy_gaiamag": 10.86,
-            "sy_tmag": 10.40,
-            "sy_kepmag": 11.04,
-        },
-
-        "kepler": {
-            "koi_period": 3.45,
-            "koi_duration": 2.4,
-            "koi_depth": 400.0,
-            "koi_ror": 0.02,
-            "koi_dor": 25.0,
-            "koi_incl": 89.5,
-            "koi_impact": 0.3,
-            "koi_prad": 1.5,
-            "koi_sma": 0.05,
-            "koi_teq": 1200.0,
-            "koi_insol": 1800.0,
-            "koi_model_snr": 25.0,
-            "koi_num_transits": 15,
-            "koi_max_sngle_ev": 100.0,
-            "koi_steff": 5800,
-            "koi_slogg": 4.4,
-            "koi_smet": 0.1,
-            "koi_srad": 1.0,
-            "koi_smass": 1.0,
-            "koi_srho": 1.2,
-            "koi_kepmag": 12.3,
-            "koi_gmag": 13.0,
-            "koi_rmag": 12.8,
-            "koi_imag": 12.7,
-            "koi_zmag": 12.5,
-            "koi_jmag": 11.2,
-            "koi_hmag": 11.0,
-            "koi_kmag": 10.8,
-        },
-
-        "tess": {
-            "pl_orbper": 12.34,
-            "pl_trandurh": 3.21,
-            "pl_trandeperr1": 0.0012,
-            "pl_trandep": 0.0021,
-            "pl_rade": 1.2,
-            "pl_eqt": 800,
-            "st_teff": 5400,
-            "st_logg": 4.5,
-            "st_rad": 0.9,
-            "st_tmag": 10.8,
-            "st_dist": 100.0,
-        }
+def samples_to_frame(samples, mission: str) -> tuple:
+    """
+    Список словарей, колоночный словарь {поле: [значения]} или DataFrame -> (DataFrame, ошибки).
+    Индекс DataFrame - позиции строк во входе; невалидные строки в него не попадают,
+    а описываются в словаре ошибок {позиция: сообщение}.
+    """
+    prefix = normalize_mission(mission)
+    errors = {}
+
+    if isinstance(samples, pd.DataFrame):
+        df = samples.reset_index(drop=True)
+    elif isinstance(samples, dict):
+        lengths = {len(values) if isinstance(values, list) else -1 for values in samples.values()}
+        if len(lengths) > 1 or -1 in lengths:
+            raise ValueError("All columns must be lists of the same length")
+        df = pd.DataFrame(samples)
+    elif isinstance(samples, list):
+        rows, index = [], []
+        for i, sample in enumerate(samples):
+            if isinstance(sample, dict):
+                rows.append(sample)
+                index.append(i)
+            else:
+                errors[i] = "Sample must be an object"
+        df = pd.DataFrame(rows, index=index)
+    else:
+        raise ValueError("Samples must be a list of objects or an object of columns")
+
+    # Лишние поля (имена объектов, комментарии) в модель не идут и не проверяются
+    df = df[[column for column in df.columns if column in feature_columns(prefix)]]
+    invalid = pd.Series(False, index=df.index)
+    messages = pd.Series("", index=df.index)
+    for column in df.columns:
+        values = df[column]
+        numeric = pd.to_numeric(values, errors="coerce")
+        bad = values.notna() & numeric.isna()
+        messages[bad & ~invalid] = f"Non-numeric value for {column}"
+        invalid |= bad
+        df[column] = numeric.astype(float)
+
+    for column in REQUIRED_FIELDS[prefix]:
+        missing = df[column].isna() if column in df.columns else pd.Series(True, index=df.index)
+        messages[missing & ~invalid] = f"Missing value for {column}"
+        invalid |= missing
+
+    errors.update(messages[invalid].to_dict())
+    return df[~invalid], errors
+
+
+def predict_exoplanet_batch(samples, mission: str, level: int, base_dir=MODELS_DIR, thread_count=-1) -> list:
+    """
+    Предсказание для многих образцов за один проход трансформаций, скейлера и модели.
+    Возвращает результаты в порядке входа; для невалидных строк - {"index", "error"}.
+    thread_count - потоки CatBoost (-1 = все ядра, как по умолчанию в CatBoost).
+    """
+    prefix = normalize_mission(mission)
+    entry = get_registry(base_dir).get(prefix, level)
+    df, errors = samples_to_frame(samples, prefix)
+
+    probas = {}
+    if len(df):
+        # float32-матрица в порядке колонок модели: CatBoost берёт её без своей конвертации
+        X = get_feature_spec(prefix).matrix({column: df[column].to_numpy() for column in df.columns}, len(df), entry.scaler)
+        proba = entry.model.predict_proba(X, thread_count=thread_count)
+        probas = dict(zip(df.index, proba))
+
+    results = []
+    for i in range(len(df) + len(errors)):
+        if i in probas:
+            results.append({
+                "index": i,
+                "planet_prob": float(probas[i][1]),
+                "non_planet_prob": float(probas[i][0]),
+            })
+        else:
+            results.append({"index": i, "error": errors.get(i, "Invalid sample")})
+    return results
+
+
+# === Примеры образцов для всех миссий ===
+EXAMPLE_SAMPLES = {
+    "k2": {
+        "pl_orbper": 41.688644,
+        "pl_trandur": 2.3,
+        "pl_rade": 2.355,
+        "pl_ratror": 0.022,
+        "st_teff": 5703.0,
+        "st_rad": 0.95,
+        "sy_pmra": 36.5,
+        "sy_pmdec": -51.3,
+        "sy_dist": 179.46,
+        "sy_gaiamag": 10.86,
+        "sy_tmag": 10.40,
+        "sy_kepmag": 11.04,
+    },
+
+    "kepler": {
+        "koi_period": 3.45,
+        "koi_duration": 2.4,
+        "koi_depth": 400.0,
+        "koi_ror": 0.02,
+        "koi_dor": 25.0,
+        "koi_incl": 89.5,
+        "koi_impact": 0.3,
+        "koi_prad": 1.5,
+        "koi_sma": 0.05,
+        "koi_teq": 1200.0,
+        "koi_insol": 1800.0,
+        "koi_model_snr": 25.0,
+        "koi_num_transits": 15,
+        "koi_max_sngle_ev": 100.0,
+        "koi_steff": 5800,
+        "koi_slogg": 4.4,
+        "koi_smet": 0.1,
+        "koi_srad": 1.0,
+        "koi_smass": 1.0,
+        "koi_srho": 1.2,
+        "koi_kepmag": 12.3,
+        "koi_gmag": 13.0,
+        "koi_rmag": 12.8,
+        "koi_imag": 12.7,
+        "koi_zmag": 12.5,
+        "koi_jmag": 11.2,
+        "koi_hmag": 11.0,
+        "koi_kmag": 10.8,
+    },
+
+    "tess": {
+        "pl_orbper": 12.34,
+        "pl_trandurh": 3.21,
+        "pl_trandeperr1": 0.0012,
+        "pl_trandep": 0.0021,
+        "pl_rade": 1.2,
+        "pl_eqt": 800,
+        "st_teff": 5400,
+        "st_logg": 4.5,
+        "st_rad": 0.9,
+        "st_tmag": 10.8,
+        "st_dist": 100.0,
     }
+}
+
 
+# === Пример запуска для всех миссий ===
+if __name__ == "__main__":
     results = []
-    for mission, sample in samples.items():
+    for mission, sample in EXAMPLE_SAMPLES.items():
         result = predict_exoplanet(sample, mission=mission, level=1)
         results.append(result)
 
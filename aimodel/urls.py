@@ -9,4 +9,12 @@ urlpatterns = [
     
     # API endpoints
     path('api/predict-exoplanet/', views.predict_exoplanet_api, name='predict_exoplanet_api'),
+    path('api/predict-exoplanet/batch/', views.predict_exoplanet_batch_api, name='predict_exoplanet_batch_api'),
+    path('api/prediction-jobs/', views.prediction_jobs_api, name='prediction_jobs_api'),
+    path('api/prediction-jobs/<uuid:job_id>/', views.prediction_job_api, name='prediction_job_api'),
+    path('api/prediction-jobs/<uuid:job_id>/result/', views.prediction_job_result_api, name='prediction_job_result_api'),
+    path('api/models/ready/', views.models_ready_api, name='models_ready_api'),
+    path('api/metrics/', views.metrics_api, name='metrics_api'),
+    path('api/predictions/', views.prediction_history_api, name='prediction_history_api'),
+    path('api/predictions/<int:prediction_id>/', views.prediction_detail_api, name='prediction_detail_api'),
 ]
\ No newline at end of file
@@ -0,0 +1,25 @@
+def classify_probability(planet_prob: float) -> dict:
+    """Статус, рекомендация и оформление результата по вероятности планеты"""
+    if planet_prob > 0.7:
+        return {
+            'status': "HIGH PLANET PROBABILITY",
+            'recommendation': "✅ Strong exoplanet candidate - further observation recommended",
+            'status_class': "success",
+            'icon': "🪐",
+            'confidence': "high",
+        }
+    elif planet_prob > 0.5:
+        return {
+            'status': "LIKELY PLANET",
+            'recommendation': "⚠️ Promising candidate - additional verification needed",
+            'status_class': "warning",
+            'icon': "🌍",
+            'confidence': "medium",
+        }
+    return {
+        'status': "LOW PLANET PROBABILITY",
+        'recommendation': "❌ Likely false positive - consider alternative explanations",
+        'status_class': "error",
+        'icon': "⭐",
+        'confidence': "low",
+    }
@@ -1,13 +1,92 @@
 import json
+import uuid
 import logging
-import pandas as pd
-from django.shortcuts import render
-from django.http import JsonResponse
+from django.conf import settings
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
+from django.template.loader import render_to_string
+from django.http import FileResponse, HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.csrf import ensure_csrf_cookie
+from drf_server.pagination import keyset_page, with_cursor
+from .metrics import STAGE_METRICS, StageTimings
+from .utils import classify_probability
 
 logger = logging.getLogger(__name__)
 
+VALID_MISSIONS = ['k2', 'kepler', 'tess']
+VALID_LEVELS = [1, 2]
+RESPONSE_FORMATS = ['json', 'html']
+
+
+def _validate_mission_level(mission, level):
+    """Общая проверка миссии и уровня модели; возвращает JsonResponse с ошибкой или None"""
+    if mission not in VALID_MISSIONS:
+        return JsonResponse({'error': 'Invalid mission. Must be: k2, kepler, or tess'}, status=400)
+    if level not in VALID_LEVELS:
+        return JsonResponse({'error': 'Invalid level. Must be: 1 or 2'}, status=400)
+    return None
+
+
+def _read_json_body(request):
+    """
+    JSON-объект из тела запроса -> (data, None) или (None, JsonResponse с ошибкой).
+    request.body ограничен DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 МБ), поэтому поток читается напрямую
+    со своим лимитом AIMODEL_BATCH_MAX_BYTES.
+    """
+    max_bytes = getattr(settings, 'AIMODEL_BATCH_MAX_BYTES', 64 * 1024 * 1024)
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > max_bytes:
+        return None, JsonResponse({'error': f'Request body too large: {content_length} > {max_bytes} bytes'}, status=413)
+
+    try:
+        data = json.loads(request.read(max_bytes + 1))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.error("Invalid JSON in request body")
+        return None, JsonResponse({'error': 'Invalid JSON format'}, status=400)
+    if not isinstance(data, dict):
+        return None, JsonResponse({'error': 'Invalid JSON format'}, status=400)
+    return data, None
+
+
+def _result_rows(result, sample_data):
+    """Строки таблицы результата: вероятности, затем входные параметры"""
+    rows = [
+        {'parameter': 'Planet Probability', 'value': f"{result['planet_prob']:.4f}", 'type': 'Result'},
+        {'parameter': 'Non-Planet Probability', 'value': f"{result['non_planet_prob']:.4f}", 'type': 'Result'},
+    ]
+    for key, value in sample_data.items():
+        rows.append({
+            'parameter': key,
+            'value': f"{float(value):.6f}" if isinstance(value, (int, float)) else str(value),
+            'type': 'Input Parameter',
+        })
+    return rows
+
+
+def _log_prediction(request, mission, level, sample_data, result, verdict):
+    """Ставит предсказание в очередь журнала; запись в БД идёт в фоне пакетами"""
+    from .prediction_log import get_prediction_log
+
+    prediction_log = get_prediction_log()
+    if prediction_log is None:
+        return
+    prediction_log.add(
+        mission=mission.lower(),
+        model_level=level,
+        input_data=sample_data,
+        planet_probability=result['planet_prob'],
+        non_planet_probability=result['non_planet_prob'],
+        confidence_level=verdict['confidence'],
+        prediction_status=verdict['status'],
+        recommendation=verdict['recommendation'],
+        session_key=request.session.session_key if hasattr(request, 'session') else None,
+    )
+
+
 @ensure_csrf_cookie
 def exoplanet_predictor(request):
     """Главная страница предсказания экзопланет"""
@@ -28,11 +107,15 @@ def exoplanet_predictor(request):
 def predict_exoplanet_api(request):
     """API для предсказания экзопланет"""
     if request.method == 'POST':
+        timings = StageTimings()
         try:
-            data = json.loads(request.body.decode('utf-8'))
+            with timings.stage('json_decode'):
+                data = json.loads(request.body.decode('utf-8'))
             mission = data.get('mission')
             sample_data = data.get('sample_data')
             level = data.get('level', 1)
+            # json - только структурированные поля; html - дополнительно таблица для страницы предсказателя
+            response_format = data.get('format') or request.GET.get('format', 'json')
             
             logger.info(f"Received prediction request: mission={mission}, level={level}")
             logger.debug(f"Sample data: {sample_data}")
@@ -41,78 +124,49 @@ def predict_exoplanet_api(request):
             if not mission or not sample_data:
                 return JsonResponse({'error': 'Missing mission or sample data'}, status=400)
             
-            # Проверка допустимых миссий
-            if mission not in ['k2', 'kepler', 'tess']:
-                return JsonResponse({'error': 'Invalid mission. Must be: k2, kepler, or tess'}, status=400)
-            
-            # Проверка уровня модели
-            if level not in [1, 2]:
-                return JsonResponse({'error': 'Invalid level. Must be: 1 or 2'}, status=400)
+            # Проверка допустимых миссий и уровня модели
+            error_response = _validate_mission_level(mission, level)
+            if error_response:
+                return error_response
+            if response_format not in RESPONSE_FORMATS:
+                return JsonResponse({'error': 'Invalid format. Must be: json or html'}, status=400)
             
             # Импортируем здесь чтобы избежать циклических импортов
+            from .registry import normalize_mission
             from .transform_to_log import predict_exoplanet
+            timings.mission, timings.level = normalize_mission(mission), level
             
             try:
                 # Предсказание
-                result = predict_exoplanet(sample_data, mission=mission, level=level)
+                result = predict_exoplanet(sample_data, mission=mission, level=level, timings=timings)
                 
                 # Определяем статус и рекомендации
-                planet_prob = result['planet_prob']
-                if planet_prob > 0.7:
-                    status = "HIGH PLANET PROBABILITY"
-                    recommendation = "✅ Strong exoplanet candidate - further observation recommended"
-                    status_class = "success"
-                    icon = "🪐"
-                elif planet_prob > 0.5:
-                    status = "LIKELY PLANET"
-                    recommendation = "⚠️ Promising candidate - additional verification needed"
-                    status_class = "warning"
-                    icon = "🌍"
-                else:
-                    status = "LOW PLANET PROBABILITY"
-                    recommendation = "❌ Likely false positive - consider alternative explanations"
-                    status_class = "error"
-                    icon = "⭐"
-                
-                # Создаем DataFrame с результатами
-                df_data = []
-                
-                # Добавляем основные результаты
-                df_data.append({
-                    'Parameter': 'Planet Probability',
-                    'Value': f"{result['planet_prob']:.4f}",
-                    'Type': 'Result'
-                })
-                df_data.append({
-                    'Parameter': 'Non-Planet Probability', 
-                    'Value': f"{result['non_planet_prob']:.4f}",
-                    'Type': 'Result'
-                })
-                
-                # Добавляем входные параметры
-                for key, value in sample_data.items():
-                    df_data.append({
-                        'Parameter': key,
-                        'Value': f"{float(value):.6f}" if isinstance(value, (int, float)) else str(value),
-                        'Type': 'Input Parameter'
-                    })
+                verdict = classify_probability(result['planet_prob'])
                 
-                df = pd.DataFrame(df_data)
+                with timings.stage('response_build'):
+                    response_data = {
+                        "mission": mission.upper(),
+                        "level": level,
+                        "planet_prob": float(result['planet_prob']),
+                        "non_planet_prob": float(result['non_planet_prob']),
+                        "status": verdict['status'],
+                        "recommendation": verdict['recommendation'],
+                        "status_class": verdict['status_class'],
+                        "icon": verdict['icon'],
+                    }
                 
-                response_data = {
-                    "mission": mission.upper(),
-                    "level": level,
-                    "planet_prob": float(result['planet_prob']),
-                    "non_planet_prob": float(result['non_planet_prob']),
-                    "status": status,
-                    "recommendation": recommendation,
-                    "status_class": status_class,
-                    "icon": icon,
-                    "dataframe_html": df.to_html(classes='result-table', index=False, escape=False)
-                }
+                    # HTML-таблица рендерится шаблоном и только по запросу
+                    if response_format == 'html':
+                        response_data["dataframe_html"] = render_to_string(
+                            'hackathon/prediction_result_table.html',
+                            {'rows': _result_rows(result, sample_data)},
+                        )
+                    response = JsonResponse(response_data)
                 
                 logger.info(f"Prediction successful: {mission} level {level} - planet_prob: {result['planet_prob']:.4f}")
-                return JsonResponse(response_data)
+                timings.record(planet_prob=result['planet_prob'], format=response_format)
+                _log_prediction(request, mission, level, sample_data, result, verdict)
+                return response
                 
             except FileNotFoundError as e:
                 logger.error(f"Model file not found: {str(e)}")
@@ -130,4 +184,246 @@ def predict_exoplanet_api(request):
             traceback.print_exc()
             return JsonResponse({'error': f'Server error: {str(e)}'}, status=500)
     
-    return JsonResponse({'error': 'Only POST requests allowed'}, status=405)
\ No newline at end of file
+    return JsonResponse({'error': 'Only POST requests allowed'}, status=405)
+
+
+@csrf_exempt
+def predict_exoplanet_batch_api(request):
+    """API для пакетного предсказания: список образцов или колонки одной миссии/уровня"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST requests allowed'}, status=405)
+
+    data, error_response = _read_json_body(request)
+    if error_response:
+        return error_response
+    mission = data.get('mission')
+    level = data.get('level', 1)
+    samples = data.get('samples', data.get('columns'))
+
+    if not mission or not samples:
+        return JsonResponse({'error': 'Missing mission or samples'}, status=400)
+    error_response = _validate_mission_level(mission, level)
+    if error_response:
+        return error_response
+
+    if not isinstance(samples, (dict, list)):
+        return JsonResponse({'error': 'Samples must be a list of objects or a dict of columns'}, status=400)
+
+    from .pool import predict_parallel, row_count
+
+    rows = row_count(samples)
+    max_rows = getattr(settings, 'AIMODEL_BATCH_MAX_ROWS', 50000)
+    if rows > max_rows:
+        return JsonResponse({'error': f'Too many samples: {rows} > {max_rows}'}, status=413)
+
+    execution = getattr(settings, 'AIMODEL_EXECUTION', {})
+    try:
+        results = predict_parallel(
+            samples, mission=mission, level=level,
+            mode=execution.get('MODE', 'threads'),
+            workers=execution.get('WORKERS'),
+            thread_count=execution.get('THREAD_COUNT'),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except FileNotFoundError as e:
+        logger.error(f"Model file not found: {str(e)}")
+        return JsonResponse({'error': f'Model file not found: {str(e)}'}, status=500)
+    except Exception as e:
+        logger.error(f"Batch prediction error in ML model: {str(e)}")
+        return JsonResponse({'error': f'ML model error: {str(e)}'}, status=500)
+
+    error_count = sum(1 for result in results if 'error' in result)
+    logger.info(f"Batch prediction: {mission} level {level} - {len(results)} samples, {error_count} invalid")
+    return JsonResponse({
+        'mission': mission.upper(),
+        'level': level,
+        'count': len(results),
+        'error_count': error_count,
+        'results': results,
+    })
+
+
+def _job_payload(job):
+    return {
+        'id': str(job.pk),
+        'mission': job.mission.upper(),
+        'level': job.model_level,
+        'status': job.status,
+        'progress': round(job.progress, 4),
+        'total_rows': job.total_rows,
+        'processed_rows': job.processed_rows,
+        'error_rows': job.error_rows,
+        'error_message': job.error_message,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': reverse('prediction_job_api', args=[job.pk]),
+        'result_url': reverse('prediction_job_result_api', args=[job.pk]),
+    }
+
+
+@csrf_exempt
+def prediction_jobs_api(request):
+    """
+    Отправка фонового задания на оценку каталога.
+    multipart: file (CSV) + mission + level; JSON: mission, level, samples или columns.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST requests allowed'}, status=405)
+
+    import pandas as pd
+    from .jobs import input_path_for, start_job
+    from .models import PredictionJob
+
+    upload = request.FILES.get('file')
+    if upload:
+        mission = request.POST.get('mission')
+        try:
+            level = int(request.POST.get('level', 1))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid level. Must be: 1 or 2'}, status=400)
+        samples = None
+    else:
+        data, error_response = _read_json_body(request)
+        if error_response:
+            return error_response
+        mission = data.get('mission')
+        level = data.get('level', 1)
+        samples = data.get('samples', data.get('columns'))
+        if not samples:
+            return JsonResponse({'error': 'Missing file or samples'}, status=400)
+
+    if not mission:
+        return JsonResponse({'error': 'Missing mission'}, status=400)
+    error_response = _validate_mission_level(mission, level)
+    if error_response:
+        return error_response
+
+    job = PredictionJob(mission=mission, model_level=level)
+    job.input_path = input_path_for(job.pk)
+    if upload:
+        with open(job.input_path, 'wb') as f:
+            for chunk in upload.chunks():
+                f.write(chunk)
+    else:
+        try:
+            pd.DataFrame(samples).to_csv(job.input_path, index=False)
+        except ValueError as e:
+            return JsonResponse({'error': f'Invalid samples: {str(e)}'}, status=400)
+    job.save()
+    start_job(job)
+
+    logger.info(f"Prediction job {job.pk} submitted: {mission} level {level}")
+    return JsonResponse(_job_payload(job), status=202)
+
+
+def prediction_job_api(request, job_id):
+    """Статус и прогресс фонового задания"""
+    from .jobs import fail_stale_jobs
+    from .models import PredictionJob
+
+    fail_stale_jobs(PredictionJob.objects.filter(pk=job_id))
+    job = get_object_or_404(PredictionJob, pk=job_id)
+    return JsonResponse(_job_payload(job))
+
+
+def prediction_job_result_api(request, job_id):
+    """Скачивание CSV с результатами завершённого задания"""
+    from .jobs import fail_stale_jobs
+    from .models import PredictionJob
+
+    fail_stale_jobs(PredictionJob.objects.filter(pk=job_id))
+    job = get_object_or_404(PredictionJob, pk=job_id)
+    if job.status != 'success':
+        return JsonResponse({'error': f'Job is {job.status}', **_job_payload(job)}, status=409)
+    try:
+        result_file = open(job.result_path, 'rb')
+    except FileNotFoundError:
+        # Файл результата удалён (очистка каталога заданий) или путь не записан
+        return JsonResponse({'error': 'Job result is no longer available', **_job_payload(job)}, status=410)
+    return FileResponse(result_file, as_attachment=True, filename=f"predictions_{job.pk}.csv")
+
+
+
+def models_ready_api(request):
+    """Readiness-проба: 200 только после прогрева моделей, до этого 503"""
+    from .registry import get_registry
+    from .warmup import get_warmup_state
+
+    if not getattr(settings, 'AIMODEL_PRELOAD_MODELS', False):
+        # Прогрев выключен: модели грузятся лениво, ждать нечего
+        return JsonResponse({'status': 'disabled', 'ready': True, 'models': get_registry().stats()})
+
+    state = get_warmup_state()
+    payload = {**state.as_dict(), 'models': get_registry().stats()}
+    return JsonResponse(payload, status=200 if state.ready else 503)
+
+
+def metrics_api(request):
+    """Гистограммы стадий предсказания в текстовом формате Prometheus"""
+    allowed_ips = getattr(settings, 'AIMODEL_METRICS_ALLOWED_IPS', None)
+    if allowed_ips and request.META.get('REMOTE_ADDR') not in allowed_ips:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return HttpResponse(STAGE_METRICS.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+HISTORY_FIELDS = [
+    'id', 'mission', 'model_level', 'planet_probability', 'non_planet_probability',
+    'confidence_level', 'prediction_status', 'status', 'job_id', 'row_index', 'created_at',
+]
+
+
+def prediction_history_api(request):
+    """
+    История предсказаний, новые сначала. Пагинация по ключу (created_at, id): следующая
+    страница начинается после последней строки предыдущей, поэтому её стоимость не растёт
+    с глубиной, как у OFFSET. Фильтры: mission, level, min_probability, max_probability, job.
+    """
+    from .models import ExoplanetPrediction
+
+    predictions = ExoplanetPrediction.objects.all()
+    mission = request.GET.get('mission')
+    if mission:
+        if mission.lower() not in VALID_MISSIONS:
+            return JsonResponse({'error': f'Invalid mission. Must be one of: {", ".join(VALID_MISSIONS)}'}, status=400)
+        predictions = predictions.filter(mission=mission.lower())
+    try:
+        if request.GET.get('level'):
+            predictions = predictions.filter(model_level=int(request.GET['level']))
+        if request.GET.get('min_probability'):
+            predictions = predictions.filter(planet_probability__gte=float(request.GET['min_probability']))
+        if request.GET.get('max_probability'):
+            predictions = predictions.filter(planet_probability__lte=float(request.GET['max_probability']))
+        limit = min(max(int(request.GET.get('limit', 50)), 1), 500)
+    except ValueError:
+        return JsonResponse({'error': 'level, limit and probabilities must be numbers'}, status=400)
+    if request.GET.get('job'):
+        try:
+            predictions = predictions.filter(job_id=uuid.UUID(request.GET['job']))
+        except ValueError:
+            return JsonResponse({'error': 'job must be a UUID'}, status=400)
+
+    try:
+        # input_data (JSON) в списке не нужен и не читается
+        rows, next_cursor = keyset_page(predictions.values(*HISTORY_FIELDS), request.GET.get('cursor'), limit)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'results': rows,
+        'next_cursor': next_cursor,
+        'next': f"{request.path}?{with_cursor(request, next_cursor)}" if next_cursor else None,
+    })
+
+
+def prediction_detail_api(request, prediction_id):
+    """Одно предсказание вместе с входными данными"""
+    from .models import ExoplanetPrediction
+
+    prediction = get_object_or_404(ExoplanetPrediction, pk=prediction_id)
+    return JsonResponse({
+        **{field: getattr(prediction, field) for field in HISTORY_FIELDS},
+        'recommendation': prediction.recommendation,
+        'input_data': prediction.input_data,
+    })
@@ -0,0 +1,112 @@
+import time
+import logging
+import importlib
+import threading
+
+from .registry import LEVELS, MISSIONS, MODELS_DIR, normalize_mission
+
+logger = logging.getLogger(__name__)
+
+# Тяжёлые модули, которые иначе импортируются при первом запросе
+ML_MODULES = ('numpy', 'pandas', 'sklearn.preprocessing', 'joblib', 'catboost')
+
+
+class WarmupState:
+    """Состояние прогрева процесса: pending -> running -> ready | error"""
+
+    def __init__(self):
+        self.status = 'pending'
+        self.error = None
+        self.timings = {}
+        self.started_at = None
+        self.finished_at = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == 'ready'
+
+    def as_dict(self) -> dict:
+        return {
+            'status': self.status,
+            'ready': self.ready,
+            'error': self.error,
+            'timings_ms': dict(self.timings),
+            'duration_ms': round((self.finished_at - self.started_at) * 1000, 3) if self.finished_at else None,
+        }
+
+
+_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    return _state
+
+
+def warm_up(models=None, base_dir=MODELS_DIR, state=None) -> WarmupState:
+    """
+    Импортирует ML-стек, загружает модели в реестр и делает по одному синтетическому
+    предсказанию на модель, чтобы первый настоящий запрос не платил за инициализацию.
+    models - пары (mission, level); по умолчанию все миссии и уровни.
+    """
+    state = state or _state
+    models = models or [(mission, level) for mission in MISSIONS for level in LEVELS]
+    state.status = 'running'
+    state.started_at = time.perf_counter()
+
+    def timed(stage, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        state.timings[stage] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info("Warm-up %s: %.1f ms", stage, state.timings[stage])
+        return result
+
+    try:
+        for module in ML_MODULES:
+            timed(f"import {module}", importlib.import_module, module)
+
+        from .registry import get_registry
+        from .transform_to_log import EXAMPLE_SAMPLES, predict_exoplanet_batch
+
+        registry = get_registry(base_dir)
+        for mission, level in models:
+            mission = normalize_mission(mission)
+            timed(f"load {mission} level {level}", registry.get, mission, level)
+            timed(
+                f"predict {mission} level {level}", predict_exoplanet_batch,
+                [EXAMPLE_SAMPLES[mission]], mission, level, base_dir, 1,
+            )
+        state.status = 'ready'
+    except Exception as e:
+        logger.exception("Model warm-up failed")
+        state.status = 'error'
+        state.error = str(e)
+    finally:
+        state.finished_at = time.perf_counter()
+
+    logger.info(
+        "Model warm-up %s in %.1f ms (%d models)",
+        state.status, (state.finished_at - state.started_at) * 1000, len(models),
+    )
+    return state
+
+
+def start_warmup(models=None, base_dir=MODELS_DIR) -> threading.Thread:
+    """Прогрев в фоновом потоке, не больше одного раза на процесс"""
+    with _state.lock:
+        if _state.thread is None:
+            _state.thread = threading.Thread(
+                target=warm_up, args=(models, base_dir), name="aimodel-warmup", daemon=True,
+            )
+            _state.thread.start()
+    return _state.thread
+
+
+def start_configured_warmup():
+    """Прогрев по AIMODEL_PRELOAD_MODELS / AIMODEL_WARMUP_MODELS; вызывается только процессами-серверами"""
+    from django.conf import settings
+
+    if getattr(settings, 'AIMODEL_PRELOAD_MODELS', False):
+        return start_warmup(getattr(settings, 'AIMODEL_WARMUP_MODELS', None))
+    return None
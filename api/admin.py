@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import VideoJob
 
-# Register your models here.
+@admin.register(VideoJob)
+class VideoJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'processed_frames', 'total_frames', 'created_at']
+    list_filter = ['status']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
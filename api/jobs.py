@@ -0,0 +1,144 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import VideoJob
+from .uploads import read_frame_stream, write_frame_stream
+from .video import default_workers, render_video
+
+logger = logging.getLogger(__name__)
+
+# Файл кадров задания пишется сервером, поэтому ограничение размера кадра - только формат
+MAX_JOB_FRAME_BYTES = 2 ** 32
+# Как часто (в кадрах) сохранять прогресс задания
+PROGRESS_EVERY = 30
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def jobs_dir() -> str:
+    path = str(getattr(settings, 'API_VIDEO_JOBS_DIR', os.path.join(settings.BASE_DIR, 'video_jobs')))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def input_path_for(job_id) -> str:
+    return os.path.join(jobs_dir(), f"{job_id}_frames.bin")
+
+
+def outputs_dir() -> str:
+    path = os.path.join(jobs_dir(), 'outputs')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def new_output_path() -> tuple:
+    """Уникальный файл результата синхронного запроса: (id видео, путь)"""
+    video_id = uuid.uuid4()
+    return video_id, output_path_for(video_id)
+
+
+def output_path_for(video_id) -> str:
+    return os.path.join(outputs_dir(), f"{video_id}.mp4")
+
+
+def purge_outputs(ttl=None) -> int:
+    """Удаляет результаты синхронных запросов старше ttl секунд; возвращает число удалённых"""
+    ttl = getattr(settings, 'API_VIDEO_OUTPUT_TTL', 3600) if ttl is None else ttl
+    cutoff = time.time() - ttl
+    removed = 0
+    with os.scandir(outputs_dir()) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                # Параллельный запрос успел удалить тот же файл
+                pass
+    return removed
+
+
+def write_frames(path, encoded_frames) -> int:
+    """Сохраняет закодированные кадры как есть (без imdecode) и возвращает их число"""
+    with open(path, 'wb') as f:
+        return write_frame_stream(f, encoded_frames)
+
+
+def read_frames(path):
+    """Генератор байтов кадров из файла задания: в памяти одна запись за раз"""
+    with open(path, 'rb') as f:
+        yield from read_frame_stream(f, max_frame_bytes=MAX_JOB_FRAME_BYTES)
+
+
+def detect_workers() -> int:
+    """Потоков детекции на один ролик: settings.API_VIDEO_DETECT_WORKERS, None - по числу CPU"""
+    return getattr(settings, 'API_VIDEO_DETECT_WORKERS', None) or default_workers()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Общий пул обработки видео. Потоков достаточно: imdecode, detectMultiScale и VideoWriter
+    отпускают GIL. Задания сверх WORKERS ждут в очереди пула, а не занимают WSGI-воркеры.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'API_VIDEO_JOB_WORKERS', 2)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-job")
+    return _executor
+
+
+def submit_job(job_id):
+    return get_executor().submit(run_video_job, job_id)
+
+
+def run_video_job(job_id):
+    close_old_connections()
+    job = None
+    try:
+        # Задание могли удалить до начала обработки, а БД - быть недоступной: это тоже ошибки задания
+        job = VideoJob.objects.get(pk=job_id)
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.result_path = os.path.join(jobs_dir(), f"{job.pk}.mp4")
+        job.save(update_fields=['status', 'started_at', 'result_path'])
+
+        def progress(written):
+            if written % PROGRESS_EVERY == 0:
+                VideoJob.objects.filter(pk=job.pk).update(processed_frames=written)
+
+        job.processed_frames = render_video(
+            read_frames(job.input_path), job.result_path, progress, detect_workers(), job.metadata.get('detection'),
+        )
+        if not job.processed_frames:
+            raise ValueError("No valid frames provided")
+        job.status = 'success'
+    except Exception as e:
+        logger.exception(f"Video job {job_id} failed")
+        if job is not None:
+            job.status = 'error'
+            job.error_message = str(e)
+    finally:
+        try:
+            if job is not None:
+                job.finished_at = timezone.now()
+                job.save(update_fields=['status', 'processed_frames', 'error_message', 'finished_at'])
+        except Exception:
+            logger.exception(f"Could not save the result of video job {job_id}")
+        finally:
+            # Загруженные кадры не нужны ни после успеха, ни после ошибки
+            try:
+                os.remove(job.input_path if job is not None else input_path_for(job_id))
+            except FileNotFoundError:
+                pass
+            close_old_connections()
@@ -0,0 +1,77 @@
+import io
+import json
+import time
+import base64
+import statistics
+
+import cv2
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.client import MULTIPART_CONTENT, encode_multipart
+
+from api.uploads import FRAME_STREAM_CONTENT_TYPE, write_frame_stream
+from api.video import decode_frames
+from api.views import ReceiveMLDataView
+
+BOUNDARY = 'BoUnDaRyStRiNg'
+
+
+class Command(BaseCommand):
+    help = "Upload throughput of receive-ml-data/ per format: parse the request and decode every frame"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames', type=int, default=120)
+        parser.add_argument('--width', type=int, default=1280)
+        parser.add_argument('--height', type=int, default=720)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        # Шум плохо сжимается: размер JPEG близок к реальному кадру камеры
+        images = [
+            cv2.imencode('.jpg', rng.integers(0, 255, (options['height'], options['width'], 3), dtype=np.uint8))[1].tobytes()
+            for _ in range(8)
+        ]
+        frames = [images[i % len(images)] for i in range(options['frames'])]
+        metadata = {'strings': ['bench'], 'integers': [1]}
+
+        stream = io.BytesIO()
+        write_frame_stream(stream, frames)
+        files = []
+        for i, frame in enumerate(frames):
+            part = io.BytesIO(frame)
+            part.name = f'{i}.jpg'
+            files.append(part)
+        bodies = {
+            'json/base64': (
+                json.dumps({'base64_frames': [base64.b64encode(f).decode() for f in frames], **metadata}).encode(),
+                'application/json', '',
+            ),
+            'multipart': (
+                encode_multipart(BOUNDARY, {'frames': files, **metadata}),
+                f'multipart/form-data; boundary={BOUNDARY}', '',
+            ),
+            'frame-stream': (stream.getvalue(), FRAME_STREAM_CONTENT_TYPE, '?strings=bench&integers=1'),
+        }
+
+        factory = RequestFactory()
+        view = ReceiveMLDataView()
+        self.stdout.write(f"{options['frames']} frames of {options['width']}x{options['height']}, "
+                          f"{sum(map(len, frames)) / 1e6:.1f} MB of JPEG")
+        for name, (body, content_type, query) in bodies.items():
+            timings = []
+            for _ in range(options['repeat']):
+                for part in files:
+                    part.seek(0)
+                started = time.perf_counter()
+                request = view.initialize_request(factory.generic('POST', f'/api/receive-ml-data/{query}', body, content_type))
+                serializer, source = view.frame_source(request)
+                serializer.is_valid(raise_exception=True)
+                decoded = sum(1 for _ in decode_frames(source))
+                timings.append(time.perf_counter() - started)
+            seconds = statistics.median(timings)
+            self.stdout.write(
+                f"{name:<13} {len(body) / 1e6:7.1f} MB on the wire, {seconds * 1000:8.1f} ms, "
+                f"{decoded / seconds:7.1f} frames/s, {len(body) / 1e6 / seconds:7.1f} MB/s"
+            )
@@ -0,0 +1,110 @@
+import os
+import time
+import tempfile
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.video import FastFaceOverlay, available_trackers, decode_frame, default_workers, detect_faces, render_video
+
+DEFAULT_IMAGE = os.path.join('static', 'hackathon', 'images', 'member', 'ibrokhim.jpg')
+
+
+def synthetic_clip(image_path, frames, width, height):
+    """JPEG-кадры 'камеры', медленно проезжающей по фото с лицами"""
+    image = cv2.imread(image_path)
+    if image is None:
+        raise FileNotFoundError(image_path)
+    rows, cols = image.shape[:2]
+    crop_w, crop_h = int(cols * 0.8), int(rows * 0.8)
+    clip = []
+    for i in range(frames):
+        x = int((cols - crop_w) * i / max(frames - 1, 1))
+        crop = cv2.resize(image[:crop_h, x:x + crop_w], (width, height))
+        clip.append(cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes())
+    return clip
+
+
+def iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    intersection = w * h
+    return intersection / (aw * ah + bw * bh - intersection)
+
+
+def frame_agreement(expected, actual, threshold=0.5) -> float:
+    """F1 совпадения рамок кадра с эталоном (рамки сопоставляются жадно по IoU >= threshold)"""
+    if not expected and not actual:
+        return 1.0
+    unmatched = list(actual)
+    matched = 0
+    for box in expected:
+        scores = [iou(box, other) for other in unmatched]
+        if scores and max(scores) >= threshold:
+            unmatched.pop(int(np.argmax(scores)))
+            matched += 1
+    return 2 * matched / (len(expected) + len(actual))
+
+
+class Command(BaseCommand):
+    help = "Per-clip time of decode -> face detection -> MP4 encode for several detection thread counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--image', default=os.path.join(settings.BASE_DIR, DEFAULT_IMAGE))
+        parser.add_argument('--frames', type=int, default=90)
+        parser.add_argument('--width', type=int, default=1280)
+        parser.add_argument('--height', type=int, default=720)
+        parser.add_argument('--workers', default='1,2,4', help="Comma-separated detection thread counts")
+        parser.add_argument('--detect-every', type=int, default=5)
+        parser.add_argument('--downscale', type=float, default=0.5)
+        parser.add_argument('--trackers', default=','.join(available_trackers()))
+        parser.add_argument('--skip-workers', action='store_true', help="Only compare fast mode with exhaustive detection")
+
+    def handle(self, *args, **options):
+        clip = synthetic_clip(options['image'], options['frames'], options['width'], options['height'])
+        self.stdout.write(f"{len(clip)} frames of {options['width']}x{options['height']}, "
+                          f"{default_workers()} CPUs available")
+
+        if not options['skip_workers']:
+            self.compare_workers(clip, options)
+        self.compare_fast_mode(clip, options)
+
+    def compare_workers(self, clip, options):
+        baseline = None
+        with tempfile.TemporaryDirectory() as directory:
+            for workers in [int(value) for value in options['workers'].split(',')]:
+                # Прогон вхолостую: потоки пула загружают каскад до замера
+                render_video(clip[:workers * 2], os.path.join(directory, 'warmup.mp4'), workers=workers)
+                started = time.perf_counter()
+                written = render_video(clip, os.path.join(directory, f'{workers}.mp4'), workers=workers)
+                seconds = time.perf_counter() - started
+                baseline = baseline or seconds
+                self.stdout.write(
+                    f"workers {workers:>2}: {seconds:7.2f} s per clip, {written / seconds:6.1f} fps, "
+                    f"speedup x{baseline / seconds:.2f}"
+                )
+
+    def compare_fast_mode(self, clip, options):
+        """Стадия детекции (без декодирования и записи): скорость и совпадение с полным перебором"""
+        frames = [decode_frame(data) for data in clip]
+        started = time.perf_counter()
+        expected = [detect_faces(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)) for frame in frames]
+        seconds = time.perf_counter() - started
+        self.stdout.write(f"exhaustive:        {len(frames) / seconds:7.1f} fps, agreement IoU>=0.5 1.000, IoU>=0.75 1.000")
+
+        for tracker in options['trackers'].split(','):
+            overlay = FastFaceOverlay(options['detect_every'], options['downscale'], tracker)
+            started = time.perf_counter()
+            actual = [overlay.faces(frame) for frame in frames]
+            seconds = time.perf_counter() - started
+            loose, strict = (
+                np.mean([frame_agreement(e, a, threshold) for e, a in zip(expected, actual)]) for threshold in (0.5, 0.75)
+            )
+            self.stdout.write(
+                f"fast/{tracker:<12} {len(frames) / seconds:7.1f} fps, agreement IoU>=0.5 {loose:.3f}, IoU>=0.75 {strict:.3f} "
+                f"({overlay.detections} detections, every {options['detect_every']}, downscale {options['downscale']})"
+            )
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:33
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('input_path', models.CharField(max_length=500, verbose_name='Frames file')),
+                ('result_path', models.CharField(blank=True, max_length=500, verbose_name='Result video')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('error', 'Error')], default='pending', max_length=10)),
+                ('total_frames', models.IntegerField(default=0)),
+                ('processed_frames', models.IntegerField(default=0)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Video Job',
+                'verbose_name_plural': 'Video Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
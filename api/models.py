@@ -1,3 +1,39 @@
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+class VideoJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('error', 'Error'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    input_path = models.CharField(max_length=500, verbose_name="Frames file")
+    result_path = models.CharField(max_length=500, blank=True, verbose_name="Result video")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_frames = models.IntegerField(default=0)
+    processed_frames = models.IntegerField(default=0)
+    # strings/integers из запроса, как есть
+    metadata = models.JSONField(default=dict, blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Video Job"
+        verbose_name_plural = "Video Jobs"
+
+    def __str__(self):
+        return f"{self.pk} - {self.status} ({self.processed_frames}/{self.total_frames} frames)"
+
+    @property
+    def progress(self):
+        if not self.total_frames:
+            return 1.0 if self.status == 'success' else 0.0
+        return min(self.processed_frames / self.total_frames, 1.0)
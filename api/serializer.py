@@ -1,6 +1,27 @@
 from rest_framework import serializers
 
-class MLDataSerializer(serializers.Serializer):
+from .video import available_trackers
+
+class MLOptionsSerializer(serializers.Serializer):
     strings = serializers.ListField(child=serializers.CharField(), required=False)
     integers = serializers.ListField(child=serializers.IntegerField(), required=False)
-    base64_frames = serializers.ListField(child=serializers.CharField(), required=True)  # List of base64-encoded image strings (frames)
\ No newline at end of file
+    # sync - видео собирается в запросе; async - задание в фоне, ответ 202 с id задания
+    mode = serializers.ChoiceField(choices=['sync', 'async'], default='sync')
+    # json - ссылка на видео; video - сам MP4 в ответе (только для sync)
+    response = serializers.ChoiceField(choices=['json', 'video'], default='json')
+    # exhaustive - каскад на каждом полном кадре; fast - на уменьшенном кадре раз в detect_every
+    # кадров (и при смене сцены), между детекциями рамки ведёт tracker
+    detection = serializers.ChoiceField(choices=['exhaustive', 'fast'], default='exhaustive')
+    detect_every = serializers.IntegerField(min_value=1, max_value=300, default=5)
+    downscale = serializers.FloatField(min_value=0.1, max_value=1.0, default=0.5)
+    tracker = serializers.ChoiceField(choices=available_trackers(), default='flow')
+
+    def detection_options(self):
+        """Параметры FastFaceOverlay или None для полного перебора"""
+        data = self.validated_data
+        if data['detection'] != 'fast':
+            return None
+        return {'detect_every': data['detect_every'], 'downscale': data['downscale'], 'tracker': data['tracker']}
+
+class MLDataSerializer(MLOptionsSerializer):
+    base64_frames = serializers.ListField(child=serializers.CharField(), required=True)  # List of base64-encoded image strings (frames)
@@ -1,3 +1,220 @@
-from django.test import TestCase
+import base64
+import io
+import os
+import tempfile
 
-# Create your tests here.
+import cv2
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .jobs import run_video_job
+from .models import VideoJob
+from .uploads import FRAME_STREAM_CONTENT_TYPE, write_frame_stream
+from .video import FastFaceOverlay, detect_faces, process_frames
+
+
+def encoded_frames(count, size=(48, 64)):
+    frames = []
+    for i in range(count):
+        image = np.full((*size, 3), i * 10 % 255, np.uint8)
+        frames.append(base64.b64encode(cv2.imencode('.jpg', image)[1].tobytes()).decode())
+    return frames
+
+
+class VideoJobsDirMixin:
+    """Каталог заданий и результатов во временной папке, удаляемой после теста"""
+
+    def setUp(self):
+        super().setUp()
+        jobs_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(jobs_dir.cleanup)
+        self.jobs_dir = jobs_dir.name
+        self.enterContext(override_settings(API_VIDEO_JOBS_DIR=self.jobs_dir))
+
+
+class VideoJobTests(VideoJobsDirMixin, TestCase):
+    def submit(self, frames):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                '/api/receive-ml-data/', {'base64_frames': frames, 'mode': 'async', 'strings': ['a']},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 202)
+        # Задание ставится в пул только после коммита; здесь выполняем его в потоке теста
+        self.assertEqual(len(callbacks), 1)
+        run_video_job(response.json()['id'])
+        return VideoJob.objects.get(pk=response.json()['id'])
+
+    def test_async_job_renders_video(self):
+        job = self.submit(encoded_frames(5))
+        self.assertEqual(job.status, 'success')
+        self.assertEqual((job.total_frames, job.processed_frames), (5, 5))
+        self.assertEqual(job.metadata['strings'], ['a'])
+        self.assertFalse(os.path.exists(job.input_path))
+
+        status = self.client.get(f'/api/video-jobs/{job.pk}/').json()
+        self.assertEqual(status['progress'], 1.0)
+        response = self.client.get(status['result_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(b''.join(response.streaming_content)), 0)
+
+    def test_async_job_without_valid_frames_fails(self):
+        job = self.submit([base64.b64encode(b'not an image').decode()])
+        self.assertEqual(job.status, 'error')
+        self.assertEqual(self.client.get(f'/api/video-jobs/{job.pk}/result/').status_code, 409)
+
+    def test_failed_job_removes_its_upload(self):
+        job = self.submit([base64.b64encode(b'not an image').decode()])
+        self.assertFalse(os.path.exists(job.input_path))
+
+    def test_deleted_job_is_logged_and_its_upload_removed(self):
+        with self.captureOnCommitCallbacks():
+            job_id = self.client.post(
+                '/api/receive-ml-data/', {'base64_frames': encoded_frames(2), 'mode': 'async'},
+                content_type='application/json',
+            ).json()['id']
+        input_path = VideoJob.objects.get(pk=job_id).input_path
+        VideoJob.objects.filter(pk=job_id).delete()
+        with self.assertLogs('api.jobs', 'ERROR'):
+            run_video_job(job_id)
+        self.assertFalse(os.path.exists(input_path))
+
+    def test_invalid_base64_is_rejected(self):
+        response = self.client.post(
+            '/api/receive-ml-data/', {'base64_frames': ['***'], 'mode': 'async'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class SyncVideoTests(VideoJobsDirMixin, TestCase):
+    def post(self, frames, **extra):
+        return self.client.post(
+            '/api/receive-ml-data/', {'base64_frames': frames, **extra}, content_type='application/json',
+        )
+
+    def test_each_request_gets_its_own_file(self):
+        first, second = self.post(encoded_frames(3)).json(), self.post(encoded_frames(4)).json()
+        self.assertNotEqual(first['video_path'], second['video_path'])
+        self.assertEqual((first['frames'], second['frames']), (3, 4))
+        self.assertEqual(first['video_path'], f"{first['video_id']}.mp4")
+        self.assertTrue(os.path.exists(os.path.join(self.jobs_dir, 'outputs', first['video_path'])))
+        self.assertEqual(self.client.get(first['video_url']).status_code, 200)
+
+    def test_range_requests(self):
+        url = self.post(encoded_frames(3)).json()['video_url']
+        full = b''.join(self.client.get(url).streaming_content)
+
+        response = self.client.get(url, headers={'Range': 'bytes=10-109'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-109/{len(full)}')
+        self.assertEqual(b''.join(response.streaming_content), full[10:110])
+
+        response = self.client.get(url, headers={'Range': 'bytes=-20'})
+        self.assertEqual(b''.join(response.streaming_content), full[-20:])
+        self.assertEqual(self.client.get(url, headers={'Range': f'bytes={len(full)}-'}).status_code, 416)
+
+    def test_video_response_and_invalid_frames(self):
+        response = self.post(encoded_frames(2), response='video')
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.post([base64.b64encode(b'not an image').decode()]).status_code, 400)
+        # Файл отклонённого запроса удалён, остался только результат первого
+        self.assertEqual(len(os.listdir(os.path.join(self.jobs_dir, 'outputs'))), 1)
+
+
+class BinaryUploadTests(VideoJobsDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.frames = [base64.b64decode(frame) for frame in encoded_frames(4)]
+
+    def stream_body(self, frames):
+        body = io.BytesIO()
+        write_frame_stream(body, frames)
+        return body.getvalue()
+
+    def test_multipart_frames(self):
+        files = [io.BytesIO(frame) for frame in self.frames]
+        for i, f in enumerate(files):
+            f.name = f'{i}.jpg'
+        response = self.client.post('/api/receive-ml-data/', {'frames': files, 'strings': ['a', 'b'], 'integers': [1]})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['frames'], 4)
+
+    def test_length_prefixed_stream(self):
+        body = self.stream_body(self.frames)
+        response = self.client.post(
+            '/api/receive-ml-data/?strings=a&integers=7', body, content_type=FRAME_STREAM_CONTENT_TYPE,
+        )
+        self.assertEqual(response.json()['frames'], 4)
+
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(
+                '/api/receive-ml-data/?mode=async&integers=7', body, content_type=FRAME_STREAM_CONTENT_TYPE,
+            )
+        self.assertEqual(response.status_code, 202)
+        job = VideoJob.objects.get(pk=response.json()['id'])
+        self.assertEqual((job.total_frames, job.metadata['integers']), (4, [7]))
+
+    def test_truncated_stream_and_bad_metadata(self):
+        body = self.stream_body(self.frames)[:-10]
+        for mode in ['sync', 'async']:
+            response = self.client.post(
+                f'/api/receive-ml-data/?mode={mode}', body, content_type=FRAME_STREAM_CONTENT_TYPE,
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['error'], "Truncated frame")
+        response = self.client.post(
+            '/api/receive-ml-data/?integers=x', self.stream_body(self.frames), content_type=FRAME_STREAM_CONTENT_TYPE,
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ProcessFramesTests(SimpleTestCase):
+    def test_thread_pool_preserves_order(self):
+        frames = [base64.b64decode(frame) for frame in encoded_frames(12)]
+        frames.insert(5, b'not an image')
+        serial = list(process_frames(frames, workers=1))
+        parallel = list(process_frames(iter(frames), workers=3))
+        self.assertEqual(len(parallel), 12)
+        for expected, actual in zip(serial, parallel):
+            self.assertTrue(np.array_equal(expected, actual))
+
+
+class FastDetectionTests(VideoJobsDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        image = cv2.imread(os.path.join(settings.BASE_DIR, 'static', 'hackathon', 'images', 'member', 'ibrokhim.jpg'))
+        self.frames = [cv2.resize(image[:, i * 20:i * 20 + 1000], (400, 400)) for i in range(6)]
+
+    def test_every_frame_at_full_size_matches_exhaustive(self):
+        overlay = FastFaceOverlay(detect_every=1, downscale=1.0, tracker='none')
+        for frame in self.frames:
+            expected = detect_faces(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            self.assertEqual(overlay.faces(frame), expected)
+        self.assertEqual(overlay.detections, len(self.frames))
+
+    def test_detects_every_n_frames_and_on_scene_change(self):
+        overlay = FastFaceOverlay(detect_every=4, downscale=0.5, tracker='flow')
+        for frame in self.frames:
+            overlay.faces(frame)
+        self.assertEqual(overlay.detections, 2)
+        overlay.faces(np.zeros_like(self.frames[0]))
+        self.assertEqual(overlay.detections, 3)
+
+    def test_downscale_of_tiny_frames(self):
+        for tracker in ('none', 'flow'):
+            overlay = FastFaceOverlay(detect_every=1, downscale=0.1, tracker=tracker)
+            for frame in (np.zeros((4, 4, 3), np.uint8), np.zeros((4, 200, 3), np.uint8)):
+                self.assertEqual(overlay.faces(frame), [])
+
+    def test_request_parameters(self):
+        frames = encoded_frames(2)
+        response = self.client.post('/api/receive-ml-data/', {
+            'base64_frames': frames, 'detection': 'fast', 'detect_every': 3, 'downscale': 0.25, 'tracker': 'flow',
+        }, content_type='application/json')
+        self.assertEqual(response.json()['frames'], 2)
+        response = self.client.post('/api/receive-ml-data/', {
+            'base64_frames': frames, 'detection': 'fast', 'tracker': 'nope',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
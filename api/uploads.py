@@ -0,0 +1,73 @@
+import base64
+import struct
+
+# Поток кадров (тело запроса application/x-frame-stream и файл кадров задания):
+# последовательность записей <длина uint32 big-endian><байты JPEG/PNG>
+FRAME_STREAM_CONTENT_TYPE = 'application/x-frame-stream'
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME_BYTES = 32 * 1024 * 1024
+
+
+def _read_exactly(stream, size) -> bytes:
+    # WSGI-поток может вернуть меньше запрошенного, даже если данные ещё есть
+    data = stream.read(size)
+    if len(data) == size or not data:
+        return data
+    parts = [data]
+    received = len(data)
+    while received < size:
+        chunk = stream.read(size - received)
+        if not chunk:
+            break
+        parts.append(chunk)
+        received += len(chunk)
+    return b''.join(parts)
+
+
+def read_frame_stream(stream, max_frame_bytes=MAX_FRAME_BYTES):
+    """
+    Генератор кадров из потока с префиксами длины. Кадр читается одним read() и отдаётся
+    как есть: np.frombuffer над ним не копирует. Обрыв посреди кадра - ValueError.
+    """
+    while True:
+        header = _read_exactly(stream, FRAME_HEADER.size)
+        if not header:
+            return
+        if len(header) < FRAME_HEADER.size:
+            raise ValueError("Truncated frame header")
+        (size,) = FRAME_HEADER.unpack(header)
+        if size > max_frame_bytes:
+            raise ValueError(f"Frame of {size} bytes exceeds the {max_frame_bytes} byte limit")
+        data = _read_exactly(stream, size)
+        if len(data) < size:
+            raise ValueError("Truncated frame")
+        yield data
+
+
+def write_frame_stream(stream, frames) -> int:
+    """Пишет кадры в формате read_frame_stream; возвращает их число"""
+    count = 0
+    for data in frames:
+        stream.write(FRAME_HEADER.pack(len(data)))
+        stream.write(data)
+        count += 1
+    return count
+
+
+def uploaded_frames(files):
+    """
+    Байты кадров из частей multipart. Части в памяти (InMemoryUploadedFile) отдаются
+    memoryview над их буфером без копирования, части на диске читаются целиком по одной.
+    """
+    for upload in files:
+        buffer = getattr(upload.file, 'getbuffer', None)
+        if buffer is not None:
+            yield buffer()
+        else:
+            upload.seek(0)
+            yield upload.read()
+
+
+def base64_frames(encoded):
+    for b64_frame in encoded:
+        yield base64.b64decode(b64_frame, validate=True)
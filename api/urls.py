@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import ReceiveMLDataView
+from .views import ReceiveMLDataView, VideoJobResultView, VideoJobView, VideoOutputView
 
 urlpatterns = [
     path('receive-ml-data/', ReceiveMLDataView.as_view()),
-    
-]
\ No newline at end of file
+    path('video-jobs/<uuid:job_id>/', VideoJobView.as_view(), name='video_job'),
+    path('video-jobs/<uuid:job_id>/result/', VideoJobResultView.as_view(), name='video_job_result'),
+    path('videos/<uuid:video_id>/', VideoOutputView.as_view(), name='video_output'),
+]
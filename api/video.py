@@ -0,0 +1,248 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+FPS = 30.0
+FOURCC = 'mp4v'
+CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+# Кадров в обработке на один поток пула: больше - лучше загрузка, но больше кадров в памяти
+FRAMES_PER_WORKER = 2
+
+_local = threading.local()
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+
+def get_face_cascade():
+    """
+    Каскад Хаара, загруженный один раз на поток. Один экземпляр CascadeClassifier
+    нельзя безопасно вызывать из нескольких потоков, а XML читается десятки миллисекунд.
+    """
+    cascade = getattr(_local, 'face_cascade', None)
+    if cascade is None:
+        cascade = _local.face_cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    return cascade
+
+
+def get_detect_pool(workers: int) -> ThreadPoolExecutor:
+    """
+    Общий пул детекции на процесс (по одному на размер): потоки живут между запросами,
+    поэтому каждый загружает каскад один раз. imdecode и detectMultiScale отпускают GIL.
+    """
+    pool = _pools.get(workers)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(workers)
+            if pool is None:
+                pool = _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-detect")
+    return pool
+
+
+def decode_frame(data):
+    """Байты JPEG/PNG -> BGR-кадр или None, если изображение не читается"""
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def decode_frames(encoded_frames):
+    """Генератор BGR-кадров: декодируется по одному кадру за раз, нечитаемые пропускаются"""
+    for data in encoded_frames:
+        frame = decode_frame(data)
+        if frame is not None:
+            yield frame
+
+
+def detect_faces(gray, face_cascade=None):
+    face_cascade = face_cascade or get_face_cascade()
+    return [tuple(int(v) for v in box) for box in face_cascade.detectMultiScale(gray, 1.1, 4)]
+
+
+def draw_faces(frame, faces):
+    for (x, y, w, h) in faces:
+        cv2.circle(frame, (x + w//2, y + h//2), w//2, (0, 0, 255), 2)
+    return frame
+
+
+def apply_ar_effects(frame, face_cascade=None):
+    """Простой AR-эффект: красный круг вокруг каждого найденного лица (рисуется в кадре на месте)"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return draw_faces(frame, detect_faces(gray, face_cascade))
+
+
+def decode_and_apply(data):
+    frame = decode_frame(data)
+    return None if frame is None else apply_ar_effects(frame)
+
+
+# Трекеры OpenCV, которым не нужны файлы моделей: доступны, если есть в сборке cv2
+OPENCV_TRACKERS = {'mil': 'TrackerMIL_create', 'kcf': 'TrackerKCF_create', 'csrt': 'TrackerCSRT_create'}
+# Средняя разница (0-255) миниатюр кадра и кадра последней детекции, после которой сцена считается новой
+SCENE_CHANGE_THRESHOLD = 30.0
+SCENE_THUMBNAIL = (64, 36)
+
+
+def available_trackers() -> list:
+    """none - держать рамки последней детекции; flow - сдвигать их по оптическому потоку"""
+    return ['none', 'flow'] + [name for name, factory in OPENCV_TRACKERS.items() if hasattr(cv2, factory)]
+
+
+class FastFaceOverlay:
+    """
+    Быстрый режим AR-эффекта для одного ролика. Каскад запускается на уменьшенной в downscale
+    раз серой копии и только на каждом detect_every-м кадре или при смене сцены; между
+    детекциями рамки ведёт tracker. Рамки хранятся в координатах уменьшенного кадра и
+    переводятся в полное разрешение при отрисовке.
+    """
+
+    def __init__(self, detect_every=5, downscale=0.5, tracker='flow', scene_threshold=SCENE_CHANGE_THRESHOLD):
+        if tracker not in available_trackers():
+            raise ValueError(f"Unknown tracker {tracker!r}, available: {', '.join(available_trackers())}")
+        if detect_every < 1 or not 0 < downscale <= 1:
+            raise ValueError("detect_every must be >= 1 and downscale in (0, 1]")
+        self.detect_every = detect_every
+        self.downscale = downscale
+        self.tracker = tracker
+        self.scene_threshold = scene_threshold
+
+        self.frame_index = 0
+        self.detections = 0
+        self._faces = []
+        self._trackers = []
+        self._previous = None
+        self._scene = None
+
+    def _resize(self, image):
+        if self.downscale == 1:
+            return image
+        # Кадр меньше 1 / downscale пикселей не должен сжиматься до пустого: cv2.resize на нём падает
+        height, width = image.shape[:2]
+        size = (max(1, round(width * self.downscale)), max(1, round(height * self.downscale)))
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    def faces(self, frame) -> list:
+        """Рамки лиц (x, y, w, h) в координатах полного кадра"""
+        small = self._resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        thumbnail = cv2.resize(small, SCENE_THUMBNAIL, interpolation=cv2.INTER_AREA)
+        scene_changed = self._scene is None or cv2.absdiff(thumbnail, self._scene).mean() > self.scene_threshold
+
+        if scene_changed or self.frame_index % self.detect_every == 0:
+            self._faces = detect_faces(small)
+            self._scene = thumbnail
+            self.detections += 1
+            if self.tracker in OPENCV_TRACKERS:
+                small_bgr = self._resize(frame)
+                self._trackers = []
+                for box in self._faces:
+                    tracker = getattr(cv2, OPENCV_TRACKERS[self.tracker])()
+                    tracker.init(small_bgr, box)
+                    self._trackers.append(tracker)
+        elif self.tracker == 'flow':
+            self._faces = [self._shift_by_flow(box, small) for box in self._faces]
+        elif self.tracker in OPENCV_TRACKERS:
+            small_bgr = self._resize(frame)
+            updates = [tracker.update(small_bgr) for tracker in self._trackers]
+            self._trackers = [tracker for tracker, (ok, _) in zip(self._trackers, updates) if ok]
+            self._faces = [tuple(int(v) for v in box) for ok, box in updates if ok]
+
+        self._previous = small
+        self.frame_index += 1
+        return [tuple(int(round(v / self.downscale)) for v in box) for box in self._faces]
+
+    def _shift_by_flow(self, box, small):
+        """Сдвиг рамки на медианное смещение углов внутри неё (Lucas-Kanade)"""
+        x, y, w, h = box
+        corners = cv2.goodFeaturesToTrack(self._previous[y:y + h, x:x + w], 20, 0.01, 3)
+        if corners is None:
+            return box
+        corners = (corners + np.array([x, y], np.float32)).astype(np.float32)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._previous, small, corners, None)
+        found = status.ravel() == 1
+        if not found.any():
+            return box
+        dx, dy = np.median((moved - corners)[found].reshape(-1, 2), axis=0)
+        rows, cols = small.shape
+        return (
+            int(min(max(x + dx, 0), cols - w)),
+            int(min(max(y + dy, 0), rows - h)),
+            w, h,
+        )
+
+    def apply(self, frame):
+        return draw_faces(frame, self.faces(frame))
+
+
+def ordered_map(func, items, workers=1):
+    """
+    func над items с результатами в исходном порядке. При workers > 1 вызовы идут в общем
+    пуле, в работе одновременно не больше workers * FRAMES_PER_WORKER элементов: порядок
+    держит очередь futures, память - её длина.
+    """
+    if workers <= 1:
+        yield from map(func, items)
+        return
+
+    pool = get_detect_pool(workers)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= workers * FRAMES_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Ошибка источника или закрытый генератор: не тратим пул на ненужные кадры
+        for future in pending:
+            future.cancel()
+
+
+def process_frames(encoded_frames, workers=1, detection=None):
+    """
+    Генератор обработанных кадров в исходном порядке (нечитаемые пропускаются).
+    detection=None - детекция на каждом полном кадре, параллельно в пуле; иначе - параметры
+    FastFaceOverlay: в пуле только декодирование, а детекция с трекингом идёт по порядку,
+    так как каждый кадр зависит от предыдущего.
+    """
+    if detection is None:
+        frames = ordered_map(decode_and_apply, encoded_frames, workers)
+    else:
+        overlay = FastFaceOverlay(**detection)
+        frames = (
+            overlay.apply(frame) for frame in ordered_map(decode_frame, encoded_frames, workers)
+            if frame is not None
+        )
+    for frame in frames:
+        if frame is not None:
+            yield frame
+
+
+def render_video(encoded_frames, video_path, progress=None, workers=1, detection=None) -> int:
+    """
+    Декодирует кадры, накладывает AR-эффекты и пишет MP4 (размер видео - по первому кадру).
+    encoded_frames может быть генератором: в памяти только окно кадров в обработке, поэтому
+    она не растёт с длиной ролика. progress(число записанных кадров) вызывается после
+    каждого кадра. detection - параметры быстрого режима (см. process_frames).
+    Возвращает число кадров.
+    """
+    out = None
+    written = 0
+    try:
+        for frame in process_frames(encoded_frames, workers, detection):
+            if out is None:
+                height, width, _ = frame.shape
+                out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*FOURCC), FPS, (width, height))
+            out.write(frame)
+            written += 1
+            if progress:
+                progress(written)
+    finally:
+        if out is not None:
+            out.release()
+    return written
@@ -1,57 +1,150 @@
-from django.shortcuts import render
+import os
+import logging
 
-# Create your views here.
-import base64
-import cv2
-import numpy as np
-from django.http import HttpResponse
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializer import MLDataSerializer
+from .jobs import detect_workers, input_path_for, new_output_path, output_path_for, purge_outputs, submit_job, write_frames
+from .models import VideoJob
+from .serializer import MLDataSerializer, MLOptionsSerializer
+from .streaming import ranged_file_response
+from .uploads import FRAME_STREAM_CONTENT_TYPE, MAX_FRAME_BYTES, base64_frames, read_frame_stream, uploaded_frames
+from .video import render_video
+
+logger = logging.getLogger(__name__)
+
+
+def _job_payload(job):
+    return {
+        'id': str(job.pk),
+        'status': job.status,
+        'progress': round(job.progress, 4),
+        'total_frames': job.total_frames,
+        'processed_frames': job.processed_frames,
+        'error_message': job.error_message,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'status_url': reverse('video_job', args=[job.pk]),
+        'result_url': reverse('video_job_result', args=[job.pk]),
+    }
+
+
+def _validated_base64_frames(serializer):
+    # Тело генератора выполняется при первом кадре - уже после is_valid()
+    yield from base64_frames(serializer.validated_data['base64_frames'])
+
 
 class ReceiveMLDataView(APIView):
+    """
+    Кадры принимаются тремя способами: JSON с base64_frames; multipart - части frames с
+    сырыми JPEG/PNG и поля strings/integers/mode/response; application/x-frame-stream -
+    тело из кадров с префиксами длины, параметры в query string. Два последних не тратят
+    треть трафика и копию на base64 и не разбирают многомегабайтный JSON.
+    """
+
     def post(self, request):
-        serializer = MLDataSerializer(data=request.data)
+        serializer, frames = self.frame_source(request)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         # Extract data
         strings = serializer.validated_data.get('strings', [])
         integers = serializer.validated_data.get('integers', [])
-        base64_frames = serializer.validated_data['base64_frames']
-
-        # Decode base64 frames to images
-        frames = []
-        for b64_frame in base64_frames:
-            img_data = base64.b64decode(b64_frame)
-            np_arr = np.frombuffer(img_data, np.uint8)
-            frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-            if frame is not None:
-                frames.append(frame)
-
-        if not frames:
-            return Response({"error": "No valid frames provided"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Assemble frames into a video (assuming same dimensions; adjust FPS as needed)
-        height, width, _ = frames[0].shape
-        video_path = 'output_video.mp4'
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(video_path, fourcc, 30.0, (width, height))  # 30 FPS
-
-        # Apply AR effects (simple example: detect faces and overlay a red circle)
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        for frame in frames:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-            for (x, y, w, h) in faces:
-                cv2.circle(frame, (x + w//2, y + h//2), w//2, (0, 0, 255), 2)  # Red circle overlay
-            out.write(frame)
-
-        out.release()
-
-        # Use strings/integers if needed (e.g., metadata logging)
-        print(f"Received strings: {strings}, integers: {integers}")
-
-        # Return success (or video URL if hosted)
-        return Response({"message": "Video processed and AR effects applied", "video_path": video_path})
\ No newline at end of file
+
+        detection = serializer.detection_options()
+
+        if serializer.validated_data['mode'] == 'async':
+            return self.enqueue(frames, strings, integers, detection)
+
+        # Конвейер decode -> detect -> encode идёт генераторами: в памяти один BGR-кадр,
+        # а не весь ролик; каждый запрос пишет в свой файл
+        purge_outputs()
+        video_id, video_path = new_output_path()
+        error = None
+        try:
+            written = render_video(frames, video_path, workers=detect_workers(), detection=detection)
+        except ValueError as e:
+            # Невалидный base64 или оборванный поток кадров
+            written, error = 0, str(e)
+        if not written:
+            if os.path.exists(video_path):
+                os.remove(video_path)
+            return Response({"error": error or "No valid frames provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Video {video_id}: {written} frames, strings: {strings}, integers: {integers}")
+
+        if serializer.validated_data['response'] == 'video':
+            return ranged_file_response(request, video_path, f"video_{video_id}.mp4")
+        return Response({
+            "message": "Video processed and AR effects applied",
+            # Только имя файла, как раньше output_video.mp4: раскладку сервера клиенту знать незачем
+            "video_path": os.path.basename(video_path),
+            "video_id": str(video_id),
+            "video_url": reverse('video_output', args=[video_id]),
+            "frames": written,
+        })
+
+    def frame_source(self, request):
+        """(сериализатор параметров, генератор байтов кадров) для формата запроса"""
+        if request.content_type.startswith('multipart/form-data'):
+            return MLOptionsSerializer(data=request.data), uploaded_frames(request.FILES.getlist('frames'))
+        if request.content_type.startswith(FRAME_STREAM_CONTENT_TYPE):
+            # request.data не трогаем: тело читается потоком по одному кадру
+            max_frame_bytes = getattr(settings, 'API_VIDEO_MAX_FRAME_BYTES', MAX_FRAME_BYTES)
+            frames = read_frame_stream(request.stream, max_frame_bytes) if request.stream else iter(())
+            return MLOptionsSerializer(data=request.query_params), frames
+        serializer = MLDataSerializer(data=request.data)
+        return serializer, _validated_base64_frames(serializer)
+
+    def enqueue(self, frames, strings, integers, detection=None):
+        """
+        Асинхронный режим: кадры сохраняются в файл задания без декодирования изображений,
+        обработка идёт в пуле потоков, клиент опрашивает status_url и скачивает result_url.
+        """
+        job = VideoJob(metadata={'strings': strings, 'integers': integers, 'detection': detection})
+        job.input_path = input_path_for(job.pk)
+        try:
+            job.total_frames = write_frames(job.input_path, frames)
+        except ValueError as e:
+            os.remove(job.input_path)
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not job.total_frames:
+            os.remove(job.input_path)
+            return Response({"error": "No frames provided"}, status=status.HTTP_400_BAD_REQUEST)
+        job.save()
+        # Воркер читает задание из БД: ставим в очередь только после коммита
+        transaction.on_commit(lambda: submit_job(job.pk))
+        return Response(_job_payload(job), status=status.HTTP_202_ACCEPTED)
+
+
+class VideoJobView(APIView):
+    """Статус и прогресс задания обработки видео"""
+
+    def get(self, request, job_id):
+        return Response(_job_payload(get_object_or_404(VideoJob, pk=job_id)))
+
+
+class VideoJobResultView(APIView):
+    """Скачивание MP4 завершённого задания"""
+
+    def get(self, request, job_id):
+        job = get_object_or_404(VideoJob, pk=job_id)
+        if job.status != 'success':
+            return Response({'error': f'Job is {job.status}', **_job_payload(job)}, status=status.HTTP_409_CONFLICT)
+        return ranged_file_response(request, job.result_path, f"video_{job.pk}.mp4")
+
+
+class VideoOutputView(APIView):
+    """MP4 синхронного запроса (хранится API_VIDEO_OUTPUT_TTL секунд), с поддержкой Range"""
+
+    def get(self, request, video_id):
+        path = output_path_for(video_id)
+        if not os.path.exists(path):
+            raise Http404("Video not found")
+        return ranged_file_response(request, path, f"video_{video_id}.mp4")
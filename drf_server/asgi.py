@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drf_server.settings')
 
 application = get_asgi_application()
+
+# Только в процессах, которые обслуживают запросы: прогрев ML-моделей в фоне
+# (AIMODEL_PRELOAD_MODELS) и пометка заданий, прерванных прошлым перезапуском
+from aimodel.apps import on_server_start  # noqa: E402
+
+on_server_start()
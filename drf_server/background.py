@@ -0,0 +1,86 @@
+import atexit
+import logging
+import threading
+
+from django.db import close_old_connections
+
+
+class BackgroundFlusher:
+    """
+    Буфер в памяти с фоновой записью. add() подклассов кладёт запись в self._pending под
+    self._lock и вызывает _notify(); поток раз в flush_interval (или сразу, если add() сообщил
+    о заполнении) забирает буфер целиком и передаёт его в _write(). Запрос не ждёт БД;
+    при выходе процесса недописанное сохраняется через atexit.
+    """
+
+    buffer_type = list
+    thread_name = "background-flusher"
+
+    def __init__(self, flush_interval=5.0, max_pending=10000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending = self.buffer_type()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.written = 0
+        self.failed = 0
+
+    def add(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def _write(self, batch):
+        """Сохраняет забранный буфер; исключение оставляет запись неудачной"""
+        raise NotImplementedError
+
+    def _write_failed(self, batch):
+        """Что делать с буфером, запись которого упала; по умолчанию он теряется"""
+
+    def _notify(self, full=False):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Синхронно записывает накопленное; возвращает число записанных элементов буфера"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, self.buffer_type()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                self._write_failed(batch)
+                self.failed += len(batch)
+                # Лог - от модуля подкласса: по нему видно, чья запись упала
+                logging.getLogger(type(self).__module__).exception(
+                    "%s failed to write %d items", type(self).__name__, len(batch),
+                )
+                return 0
+            self.written += len(batch)
+            return len(batch)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {'pending': pending, 'written': self.written, 'failed': self.failed}
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            # Поток живёт долго: соединение переоткрывается по правилам CONN_MAX_AGE
+            close_old_connections()
+            self.flush()
@@ -0,0 +1,59 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(created_at, pk) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(pk)
+
+
+def row_key(row) -> tuple:
+    """(created_at, id) строки: модели или словаря из values()"""
+    if isinstance(row, dict):
+        return row['created_at'], row['id']
+    return row.created_at, row.pk
+
+
+def keyset_page(queryset, cursor=None, page_size=20, newest_first=True) -> tuple:
+    """
+    Страница queryset (моделей или values()) по ключу (created_at, id): следующая начинается
+    сразу после последней строки предыдущей, поэтому стоимость страницы не зависит от её
+    глубины, в отличие от OFFSET. Общая для форума и истории предсказаний (aimodel).
+    Возвращает (строки, курсор следующей страницы или None). Невалидный курсор - ValueError.
+    """
+    if cursor:
+        try:
+            created_at, pk = decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Invalid cursor") from e
+        # created_at <= X AND NOT (created_at = X AND id >= pk): в отличие от OR, это
+        # диапазон по индексу (..., created_at, id), который читается в порядке сортировки
+        if newest_first:
+            queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=pk)
+        else:
+            queryset = queryset.filter(created_at__gte=created_at).exclude(created_at=created_at, id__lte=pk)
+    order = ['-created_at', '-id'] if newest_first else ['created_at', 'id']
+    rows = list(queryset.order_by(*order)[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(*row_key(rows[-1]))
+    return rows, next_cursor
+
+
+def last_page(queryset, page_size=20) -> list:
+    """Последние page_size строк в хронологическом порядке - конец списка без обхода страниц"""
+    return list(reversed(queryset.order_by('-created_at', '-id')[:page_size]))
+
+
+def with_cursor(request, cursor) -> str:
+    """Query string текущего запроса (фильтры) с курсором следующей страницы"""
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return params.urlencode()
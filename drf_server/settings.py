@@ -170,8 +170,114 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR /  'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic also writes resized WebP copies (plus a PNG/JPEG fallback) of the images matching
+# STATIC_PATTERNS under <dir>/responsive/ with content-hashed names and lists them in
+# responsive-images.json; uploaded profile, news and team photos get the same copies in a
+# background thread after the save commits.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'main_app.storage.ResponsiveStaticFilesStorage'},
+}
+RESPONSIVE_IMAGES = {
+    'WIDTHS': [320, 640, 1280, 1920],
+    'WEBP_QUALITY': 80,
+    'WEBP_METHOD': 4,
+    'JPEG_QUALITY': 85,
+    'STATIC_PATTERNS': ['hackathon/suns/*.png', 'hackathon/images/*.jpg', 'hackathon/images/member/*.jpg'],
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Home page leaderboard (users with forum post/thread counts) is kept in the default cache and
+# dropped whenever a user, thread or post is saved or deleted. The per-process default cache is
+# only invalidated in the process that made the change, so with several workers point CACHES at
+# a shared backend; the TTL bounds staleness either way.
+LEADERBOARD_CACHE_TTL = 300
+# Forum lists are paginated by (created_at, id) cursor, not OFFSET
+FORUM_THREADS_PER_PAGE = 20
+FORUM_POSTS_PER_PAGE = 50
+# Page views of news articles and forum threads are buffered in memory and written every
+# FLUSH_INTERVAL seconds (or once MAX_PENDING rows are pending) as UPDATE views = views + n;
+# with ENABLED False every view is an immediate single-column UPDATE.
+VIEW_COUNTERS = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 5.0,
+    'MAX_PENDING': 10000,
+}
+
+# Async video jobs of /api/receive-ml-data/ (mode=async): uploaded frames and result videos,
+# size of the thread pool doing decode/detect/encode
+API_VIDEO_JOBS_DIR = BASE_DIR / 'video_jobs'
+API_VIDEO_JOB_WORKERS = 2
+# Threads decoding frames and running face detection for one clip (shared per process,
+# frames are written in their original order); None means one per available CPU
+API_VIDEO_DETECT_WORKERS = None
+# Videos rendered synchronously get a per-request file under API_VIDEO_JOBS_DIR/outputs,
+# served with Range support from /api/videos/<id>/ and removed after this many seconds
+API_VIDEO_OUTPUT_TTL = 3600
+# Largest single frame accepted in an application/x-frame-stream upload
+API_VIDEO_MAX_FRAME_BYTES = 32 * 1024 * 1024
+
+# Exoplanet models (aimodel)
+# Warm up the ML stack and models in a background thread when a server process starts (WSGI/ASGI
+# entry points in drf_server/ and runserver; management commands and scripts never warm up);
+# /api/models/ready/ returns 503 until warm-up is done. AIMODEL_WARMUP_MODELS lists
+# (mission, level) pairs to warm, None means every mission and level.
+AIMODEL_PRELOAD_MODELS = True
+AIMODEL_WARMUP_MODELS = None
+# Model loading and warm-up timings are logged by the aimodel logger
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'aimodel': {'handlers': ['console'], 'level': os.environ.get('AIMODEL_LOG_LEVEL', 'INFO')},
+        # INFO writes one JSON record with per-stage timings for every prediction
+        'aimodel.timings': {'level': os.environ.get('AIMODEL_TIMINGS_LOG_LEVEL', 'WARNING')},
+    },
+}
+# Predictions from /api/predict-exoplanet/ are queued and written to ExoplanetPrediction by a
+# background thread with bulk_create every FLUSH_INTERVAL seconds or BATCH_SIZE rows;
+# beyond MAX_PENDING unwritten rows new records are dropped rather than blocking requests.
+AIMODEL_PREDICTION_LOG = {
+    'ENABLED': True,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_PENDING': 50000,
+}
+# Clients allowed to scrape /api/metrics/ (Prometheus text format); empty allows everyone
+AIMODEL_METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+# Upper bound on rows accepted by /api/predict-exoplanet/batch/
+AIMODEL_BATCH_MAX_ROWS = 50000
+AIMODEL_BATCH_MAX_BYTES = 64 * 1024 * 1024
+# Opt-in result cache in front of predict_exoplanet. DJANGO_CACHE names an alias in
+# CACHES to share hits between workers; model file changes are picked up every CHECK_INTERVAL seconds.
+AIMODEL_PREDICTION_CACHE = {
+    'ENABLED': False,
+    'MAX_ENTRIES': 10000,
+    'MAX_BYTES': 16 * 1024 * 1024,
+    'TTL': 3600,
+    'CHECK_INTERVAL': 5,
+    'DJANGO_CACHE': None,
+}
+# Background catalogue scoring jobs: inputs and result CSVs, process pool size, rows per chunk
+AIMODEL_JOBS_DIR = BASE_DIR / 'prediction_jobs'
+AIMODEL_JOB_WORKERS = 2
+AIMODEL_JOB_CHUNK_SIZE = 5000
+# Jobs without progress for this many seconds are treated as killed by a restart and marked failed
+AIMODEL_JOB_STALE_AFTER = 600
+# DF frames stored with storage='npy' (memory-mapped column files) live here
+AIMODEL_FRAMES_DIR = BASE_DIR / 'data_frames'
+# Batch scoring execution: MODE 'threads' (CatBoost threads in this process) or 'processes'
+# (matrix split across a process pool). None means derived from the CPUs available to this
+# process divided by WEB_CONCURRENCY, so several WSGI workers do not oversubscribe the host.
+AIMODEL_EXECUTION = {
+    'MODE': 'threads',
+    'WORKERS': None,
+    'THREAD_COUNT': None,
+}
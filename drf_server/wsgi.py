@@ -15,4 +15,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'drf_server.settings')
 
 application = get_wsgi_application()
 
+# Только в процессах, которые обслуживают запросы: прогрев ML-моделей в фоне
+# (AIMODEL_PRELOAD_MODELS) и пометка заданий, прерванных прошлым перезапуском
+from aimodel.apps import on_server_start  # noqa: E402
+
+on_server_start()
+
 os.environ['SECRET_KEY'] = 'django-insecure-f=lwn+2gad%(3dsd^#pm+a&q0$5+dlegyf#%0bd#8s@i_nx108'
\ No newline at end of file
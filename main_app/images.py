@@ -0,0 +1,185 @@
+import hashlib
+import io
+import json
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from PIL import Image, ImageOps
+
+DEFAULTS = {
+    'WIDTHS': [320, 640, 1280, 1920],
+    'WEBP_QUALITY': 80,
+    # 0-6: 6 сжимает на несколько процентов лучше, но в разы медленнее
+    'WEBP_METHOD': 4,
+    'JPEG_QUALITY': 85,
+    'STATIC_PATTERNS': [],
+}
+# Манифест вариантов статики, пишется collectstatic в STATIC_ROOT
+STATIC_MANIFEST = 'responsive-images.json'
+VARIANTS_DIR = 'responsive'
+MIME_TYPES = {'WEBP': 'image/webp', 'PNG': 'image/png', 'JPEG': 'image/jpeg'}
+EXTENSIONS = {'WEBP': 'webp', 'PNG': 'png', 'JPEG': 'jpg'}
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def image_config() -> dict:
+    return {**DEFAULTS, **getattr(settings, 'RESPONSIVE_IMAGES', {})}
+
+
+def source_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def variant_widths(width: int, widths) -> list:
+    """Ширины вариантов без увеличения: все меньше оригинала плюс сам оригинал (не шире максимума)"""
+    largest = min(width, max(widths))
+    return [w for w in sorted(widths) if w < largest] + [largest]
+
+
+def _encode(image, image_format, config) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=config['WEBP_QUALITY'], method=config['WEBP_METHOD'])
+    elif image_format == 'JPEG':
+        image.convert('RGB').save(buffer, 'JPEG', quality=config['JPEG_QUALITY'], optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def build_variants(data: bytes, name: str, save) -> dict:
+    """
+    Уменьшенные копии изображения name: для каждой ширины WebP и запасной формат - PNG для
+    изображений с прозрачностью, иначе JPEG (непрозрачный PNG в JPEG в разы меньше). Имена
+    содержат хэш содержимого, поэтому их можно кэшировать навсегда. save(имя, байты) сохраняет
+    файл и возвращает итоговое имя.
+    Возвращает {'source': name, 'hash': ..., 'width', 'height', 'variants': [...]}.
+    """
+    config = image_config()
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    transparent = 'A' in image.getbands() or 'transparency' in image.info
+    fallback = 'PNG' if transparent else 'JPEG'
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if transparent else 'RGB')
+
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    width, height = image.size
+    variants = []
+    for target in variant_widths(width, config['WIDTHS']):
+        resized = image if target == width else image.resize((target, max(round(height * target / width), 1)), Image.LANCZOS)
+        for image_format in ('WEBP', fallback):
+            encoded = _encode(resized, image_format, config)
+            variant_name = posixpath.join(
+                directory, VARIANTS_DIR, f"{stem}.{target}w.{source_hash(encoded)[:12]}.{EXTENSIONS[image_format]}",
+            )
+            variants.append({
+                'name': save(variant_name, encoded),
+                'width': target,
+                'type': MIME_TYPES[image_format],
+                'bytes': len(encoded),
+            })
+    return {'source': name, 'hash': source_hash(data), 'width': width, 'height': height, 'variants': variants}
+
+
+def resolve_variants(entry, url_for) -> list:
+    """Варианты записи build_variants с URL: [{'url', 'width', 'type'}]"""
+    if not entry:
+        return []
+    return [{'url': url_for(v['name']), 'width': v['width'], 'type': v['type']} for v in entry.get('variants', [])]
+
+
+def pick_variant(variants, width, mime_type=None):
+    """Наименьший вариант не уже width (или самый широкий), опционально только данного типа"""
+    candidates = [v for v in variants if mime_type is None or v['type'] == mime_type]
+    if not candidates:
+        return None
+    wide_enough = [v for v in candidates if v['width'] >= width]
+    if wide_enough:
+        return min(wide_enough, key=lambda v: v['width'])
+    return max(candidates, key=lambda v: v['width'])
+
+
+@lru_cache(maxsize=1)
+def static_manifest() -> dict:
+    """Манифест вариантов статики; пустой, пока не запускался collectstatic (например, при DEBUG)"""
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    try:
+        with staticfiles_storage.open(STATIC_MANIFEST) as f:
+            return json.load(f)
+    except (FileNotFoundError, OSError, ValueError, NotImplementedError):
+        return {}
+
+
+def field_variants(fieldfile, entry) -> list:
+    """Варианты загруженного файла с URL; пусто, если entry построен для другого файла"""
+    if not fieldfile or not entry or entry.get('source') != fieldfile.name:
+        return []
+    return resolve_variants(entry, fieldfile.storage.url)
+
+
+def variants_outdated(fieldfile, entry) -> bool:
+    """Варианты построены не для текущего файла поля (или файл убран)"""
+    return (fieldfile.name or None) != ((entry or {}).get('source') or None)
+
+
+def refresh_field_variants(instance, field_name: str, variants_field: str) -> bool:
+    """
+    Пересобирает варианты ImageField после загрузки нового файла и удаляет копии старого.
+    Пишет только колонку вариантов (queryset.update), чтобы не вызывать post_save повторно.
+    """
+    fieldfile = getattr(instance, field_name)
+    entry = getattr(instance, variants_field) or {}
+    if not variants_outdated(fieldfile, entry):
+        return False
+
+    storage = fieldfile.storage
+    new_entry = {}
+    if fieldfile:
+        with storage.open(fieldfile.name) as f:
+            data = f.read()
+        new_entry = build_variants(data, fieldfile.name, lambda name, content: storage.save(name, ContentFile(content)))
+    for variant in entry.get('variants', []):
+        storage.delete(variant['name'])
+
+    setattr(instance, variants_field, new_entry)
+    type(instance)._default_manager.filter(pk=instance.pk).update(**{variants_field: new_entry})
+    return True
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Пул сборки вариантов загрузок. Один поток: сборка не держит запрос, а повторные
+    загрузки одного объекта обрабатываются по очереди и не удаляют копии друг друга.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variants")
+    return _executor
+
+
+def refresh_saved_variants(model, pk, field_name: str, variants_field: str) -> bool:
+    """Фоновая пересборка вариантов: объект перечитывается из БД, файл там уже закоммичен"""
+    close_old_connections()
+    try:
+        instance = model._default_manager.filter(pk=pk).first()
+        return instance is not None and refresh_field_variants(instance, field_name, variants_field)
+    except Exception:
+        # Без вариантов страницы отдают оригинал
+        logger.exception(f"Could not build image variants for {model.__name__} {pk}")
+        return False
+    finally:
+        close_old_connections()
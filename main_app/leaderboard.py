@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .images import field_variants
+from .models import CustomUser, ForumPost, ForumThread
+
+LEADERBOARD_CACHE_KEY = 'main_app:leaderboard'
+LEADERBOARD_SIZE = 10
+DEFAULT_PHOTO = '/static/hackathon/images/default-user.jpg'
+
+
+def _count_by_author(model):
+    """Коррелированный подзапрос COUNT(*) по автору: не размножает строки, в отличие от двух JOIN"""
+    counts = (
+        model.objects.filter(created_by=OuterRef('pk'))
+        .order_by().values('created_by').annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def build_leaderboard() -> list:
+    """Пользователи главной страницы со статистикой форума - один запрос к БД"""
+    users = (
+        CustomUser.objects.order_by('pk')
+        .only('username', 'email', 'profile_photo', 'profile_photo_variants')
+        .annotate(post_count=_count_by_author(ForumPost), thread_count=_count_by_author(ForumThread))
+        [:LEADERBOARD_SIZE]
+    )
+    return [
+        {
+            'username': user.username,
+            'email': user.email,
+            'border_color': f'hsl({(index * 60) % 360}, 70%, 60%)',
+            'profile_photo': user.profile_photo.url if user.profile_photo else DEFAULT_PHOTO,
+            'profile_photo_variants': field_variants(user.profile_photo, user.profile_photo_variants),
+            'stats': {'posts': user.post_count, 'threads': user.thread_count},
+        }
+        for index, user in enumerate(users)
+    ]
+
+
+def get_leaderboard() -> list:
+    """Кэшированный leaderboard; сбрасывается сигналами при изменении пользователей, тем и постов"""
+    return cache.get_or_set(LEADERBOARD_CACHE_KEY, build_leaderboard, settings.LEADERBOARD_CACHE_TTL)
+
+
+def invalidate_leaderboard(**kwargs):
+    # После коммита: иначе параллельный запрос может успеть закэшировать старые счётчики
+    transaction.on_commit(lambda: cache.delete(LEADERBOARD_CACHE_KEY))
@@ -0,0 +1,110 @@
+import time
+import statistics
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from main_app.models import ForumCategory, ForumPost, ForumThread
+from drf_server.pagination import encode_cursor
+from main_app.views import forum_main, forum_thread
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Query count and latency of the forum pages on a large synthetic forum (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=100000)
+        parser.add_argument('--posts', type=int, default=20000, help="Posts in the single large thread")
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=50)
+
+    def handle(self, *args, **options):
+        # Все данные создаются в транзакции, которая откатывается: база не меняется
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, model, objects, base):
+        started = time.perf_counter()
+        # auto_now_add поставил бы всем строкам одно время: разносим created_at по секунде на строку
+        field = model._meta.get_field('created_at')
+        for i, obj in enumerate(objects):
+            obj.created_at = base - timedelta(seconds=len(objects) - i)
+        field.auto_now_add = False
+        try:
+            model.objects.bulk_create(objects, batch_size=5000)
+        finally:
+            field.auto_now_add = True
+        self.stdout.write(f"Seeded {len(objects)} {model.__name__} rows in {time.perf_counter() - started:.1f}s")
+
+    def run(self, options):
+        User = get_user_model()
+        users = User.objects.bulk_create([
+            User(username=f"bench{i}", email=f"bench{i}@example.com") for i in range(options['users'])
+        ])
+        categories = ForumCategory.objects.bulk_create([
+            ForumCategory(name=f"bench-{i}") for i in range(options['categories'])
+        ])
+        base = timezone.now()
+        self.seed(ForumThread, [
+            ForumThread(title=f"Thread {i}", content="text " * 40, created_by=users[i % len(users)],
+                        category=categories[i % len(categories)])
+            for i in range(options['threads'])
+        ], base)
+        # Старейшая тема (минимальный created_at) получает все посты
+        thread = ForumThread.objects.order_by('created_at', 'id').first()
+        self.seed(ForumPost, [
+            ForumPost(thread=thread, content="reply " * 20, created_by=users[i % len(users)])
+            for i in range(options['posts'])
+        ], base)
+
+        def cursor_at(queryset, fraction, newest_first):
+            order = ['-created_at', '-id'] if newest_first else ['created_at', 'id']
+            row = queryset.order_by(*order).values('created_at', 'id')[int(queryset.count() * fraction)]
+            return encode_cursor(row['created_at'], row['id'])
+
+        threads = ForumThread.objects.all()
+        category = categories[0]
+        posts = thread.posts.all()
+        cases = [
+            ("threads: first page", forum_main, {}, {}),
+            ("threads: page at 90%", forum_main, {}, {'cursor': cursor_at(threads, 0.9, True)}),
+            ("threads: category first page", forum_main, {}, {'category': category.name}),
+            ("threads: category at 90%", forum_main, {}, {
+                'category': category.name, 'cursor': cursor_at(threads.filter(category=category), 0.9, True),
+            }),
+            ("posts: first page", forum_thread, {'thread_id': thread.id}, {}),
+            ("posts: page at 90%", forum_thread, {'thread_id': thread.id}, {'cursor': cursor_at(posts, 0.9, False)}),
+        ]
+
+        factory = RequestFactory()
+        for name, view, kwargs, params in cases:
+            timings = []
+            for _ in range(options['requests']):
+                request = factory.get('/forum/', params)
+                request.user = users[0]
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = view(request, **kwargs)
+                    timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    self.stderr.write(f"{name}: HTTP {response.status_code}")
+                    return
+            timings.sort()
+            self.stdout.write(
+                f"{name:<30} {len(queries)} queries, mean {statistics.mean(timings):.2f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms"
+            )
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0002_delete_contactsubmission_remove_forumthread_tags_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forumpost',
+            index=models.Index(fields=['thread', 'created_at', 'id'], name='forum_post_thread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forumthread',
+            index=models.Index(fields=['created_at', 'id'], name='forum_thread_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forumthread',
+            index=models.Index(fields=['category', 'created_at', 'id'], name='forum_thread_category_idx'),
+        ),
+    ]
@@ -1,15 +1,27 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+from .images import field_variants, pick_variant
+
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     bio = models.TextField(blank=True)
     stats = models.JSONField(default=dict, blank=True)
     profile_photo = models.ImageField(upload_to='profiles/', blank=True)
+    # Уменьшенные WebP/JPEG копии фото (main_app.images.build_variants), строятся в фоне после загрузки
+    profile_photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     def __str__(self): return self.username
 
-    def get_profile_photo_url(self):
+    def get_profile_photo_url(self, width=None):
+        """URL фото; с width - наименьшей копии не уже width в запасном формате"""
         if self.profile_photo and hasattr(self.profile_photo, 'url'):
+            if width:
+                variant = pick_variant(
+                    [v for v in field_variants(self.profile_photo, self.profile_photo_variants) if v['type'] != 'image/webp'],
+                    width,
+                )
+                if variant:
+                    return variant['url']
             return self.profile_photo.url
         return '/static/hackathon/images/default-user.jpg'
 
@@ -26,6 +38,13 @@ class ForumThread(models.Model):
     views = models.IntegerField(default=0)
     def __str__(self): return self.title
 
+    class Meta:
+        # Список тем листается по ключу (created_at, id), в том числе внутри категории
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='forum_thread_created_idx'),
+            models.Index(fields=['category', 'created_at', 'id'], name='forum_thread_category_idx'),
+        ]
+
 class ForumPost(models.Model):
     thread = models.ForeignKey(ForumThread, on_delete=models.CASCADE, related_name='posts')
     content = models.TextField()
@@ -33,11 +52,17 @@ class ForumPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     def __str__(self): return f"Post in {self.thread}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['thread', 'created_at', 'id'], name='forum_post_thread_idx'),
+        ]
+
 class NewsArticle(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     category = models.CharField(max_length=100)
     image = models.ImageField(upload_to='news/', blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     views = models.IntegerField(default=0)
     def __str__(self): return self.title
@@ -51,4 +76,5 @@ class TeamMember(models.Model):
     contact = models.EmailField()
     social_media = models.URLField(blank=True)
     photo = models.ImageField(upload_to='team/', blank=True)
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     def __str__(self): return self.name
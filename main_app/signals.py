@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .images import get_executor, refresh_saved_variants, variants_outdated
+from .leaderboard import invalidate_leaderboard
+from .models import CustomUser, ForumPost, ForumThread, NewsArticle, TeamMember
+
+# Счётчики постов и тем, имена и фото пользователей - всё, из чего строится leaderboard
+for model in (CustomUser, ForumThread, ForumPost):
+    post_save.connect(invalidate_leaderboard, sender=model, dispatch_uid=f'leaderboard_save_{model.__name__}')
+    post_delete.connect(invalidate_leaderboard, sender=model, dispatch_uid=f'leaderboard_delete_{model.__name__}')
+
+
+# Уменьшенные копии загруженных изображений: поле файла -> поле вариантов
+IMAGE_VARIANT_FIELDS = {
+    CustomUser: ('profile_photo', 'profile_photo_variants'),
+    NewsArticle: ('image', 'image_variants'),
+    TeamMember: ('photo', 'photo_variants'),
+}
+
+
+def refresh_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    field_name, variants_field = IMAGE_VARIANT_FIELDS[sender]
+    if not variants_outdated(getattr(instance, field_name), getattr(instance, variants_field)):
+        return
+    # Сборка копий идёт в фоне, а не в потоке запроса; поток читает объект из БД - только после коммита
+    pk = instance.pk
+    transaction.on_commit(lambda: get_executor().submit(refresh_saved_variants, sender, pk, field_name, variants_field))
+
+
+for model in IMAGE_VARIANT_FIELDS:
+    post_save.connect(refresh_image_variants, sender=model, dispatch_uid=f'image_variants_{model.__name__}')
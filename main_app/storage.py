@@ -0,0 +1,55 @@
+import json
+from fnmatch import fnmatch
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .images import STATIC_MANIFEST, VARIANTS_DIR, build_variants, image_config, source_hash, static_manifest
+
+
+class ResponsiveStaticFilesStorage(StaticFilesStorage):
+    """
+    Статика, которая при collectstatic строит варианты изображений из
+    RESPONSIVE_IMAGES['STATIC_PATTERNS'] (WebP + запасной формат нескольких ширин) и пишет
+    их список в STATIC_MANIFEST. Неизменившиеся исходники (по хэшу) не перекодируются.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        parent = getattr(super(), 'post_process', None)
+        if parent is not None:
+            yield from parent(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        patterns = image_config()['STATIC_PATTERNS']
+        previous = self._load_manifest()
+        manifest = {}
+        for name in sorted(paths):
+            if f"/{VARIANTS_DIR}/" in f"/{name}" or not any(fnmatch(name, pattern) for pattern in patterns):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            entry = previous.get(name)
+            if entry and entry['hash'] == source_hash(data) and all(self.exists(v['name']) for v in entry['variants']):
+                manifest[name] = entry
+                continue
+            manifest[name] = build_variants(data, name, self._save_variant)
+            yield name, name, True
+
+        if self.exists(STATIC_MANIFEST):
+            self.delete(STATIC_MANIFEST)
+        self.save(STATIC_MANIFEST, ContentFile(json.dumps(manifest, indent=1).encode()))
+        static_manifest.cache_clear()
+
+    def _save_variant(self, name, data):
+        # Имя содержит хэш содержимого: существующий файл уже тот же самый
+        if not self.exists(name):
+            self.save(name, ContentFile(data))
+        return name
+
+    def _load_manifest(self):
+        try:
+            with self.open(STATIC_MANIFEST) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
@@ -0,0 +1,53 @@
+from django import template
+from django.db.models.fields.files import FieldFile
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from ..images import field_variants, pick_variant, resolve_variants, static_manifest
+
+register = template.Library()
+
+
+def _variants(image, variants):
+    """URL оригинала и варианты для пути статики, загруженного файла или URL с готовыми вариантами"""
+    if isinstance(image, FieldFile):
+        return image.url, field_variants(image, variants)
+    if isinstance(image, str) and not image.startswith(('/', 'http:', 'https:')):
+        return static(image), resolve_variants(static_manifest().get(image), static)
+    return image, variants or []
+
+
+def _srcset(variants, mime_type):
+    return ', '.join(f"{v['url']} {v['width']}w" for v in variants if v['type'] == mime_type)
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', css_class='', variants=None):
+    """
+    <picture> с WebP srcset и запасным <img srcset> нескольких ширин; без вариантов
+    (нет collectstatic или файл ещё не обработан) - обычный <img> с оригиналом.
+    """
+    url, resolved = _variants(image, variants)
+    fallback = [v for v in resolved if v['type'] != 'image/webp']
+    if not fallback:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy" decoding="async">', url, alt, css_class)
+    largest = pick_variant(fallback, max(v['width'] for v in fallback))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy" decoding="async"></picture>',
+        _srcset(resolved, 'image/webp'), sizes, largest['url'], _srcset(fallback, fallback[0]['type']), sizes, alt, css_class,
+    )
+
+
+@register.simple_tag
+def responsive_background(image, width=1920, variants=None):
+    """Значение background-image: image-set() из WebP и запасной копии ширины не меньше width"""
+    url, resolved = _variants(image, variants)
+    webp = pick_variant(resolved, width, 'image/webp')
+    fallback = pick_variant([v for v in resolved if v['type'] != 'image/webp'], width)
+    if not webp or not fallback:
+        return format_html("url('{}')", url)
+    return format_html(
+        "url('{}'); background-image: image-set({})", fallback['url'],
+        format_html_join(', ', "url('{}') type('{}')", [(webp['url'], webp['type']), (fallback['url'], fallback['type'])]),
+    )
@@ -1,3 +1,221 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import QueryDict
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from .counters import ViewCounter
+from .images import build_variants
+from .leaderboard import LEADERBOARD_CACHE_KEY, get_leaderboard
+from .models import CustomUser, ForumCategory, ForumPost, ForumThread, NewsArticle, TeamMember
+
+
+class HomeLeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = ForumCategory.objects.create(name="General")
+
+    def create_user(self, index, threads=1, posts=2):
+        user = CustomUser.objects.create(username=f"user{index}", email=f"user{index}@example.com")
+        for _ in range(threads):
+            thread = ForumThread.objects.create(title="t", content="c", category=self.category, created_by=user)
+            for _ in range(posts):
+                ForumPost.objects.create(thread=thread, content="p", created_by=user)
+        return user
+
+    def assert_home_queries(self, expected):
+        cache.clear()
+        with self.assertNumQueries(expected):
+            self.client.get(reverse('home'))
+
+    def test_query_count_does_not_grow_with_users(self):
+        TeamMember.objects.create(name="a", role="r", bio="b", skills="s", contributions="c", contact="a@example.com")
+        self.create_user(0)
+        # leaderboard + участники команды
+        self.assert_home_queries(2)
+        for index in range(1, 15):
+            self.create_user(index)
+        self.assert_home_queries(2)
+        # Повторный запрос берёт leaderboard из кэша
+        with self.assertNumQueries(1):
+            self.client.get(reverse('home'))
+
+    def test_counts_and_invalidation(self):
+        user = self.create_user(0, threads=2, posts=3)
+        self.assertEqual(get_leaderboard()[0]['stats'], {'posts': 6, 'threads': 2})
+        thread = ForumThread.objects.filter(created_by=user).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            ForumPost.objects.create(thread=thread, content="p", created_by=user)
+        self.assertIsNone(cache.get(LEADERBOARD_CACHE_KEY))
+        self.assertEqual(get_leaderboard()[0]['stats'], {'posts': 7, 'threads': 2})
+        with self.captureOnCommitCallbacks(execute=True):
+            thread.delete()
+        self.assertEqual(get_leaderboard()[0]['stats'], {'posts': 3, 'threads': 1})
+
+
+@override_settings(FORUM_THREADS_PER_PAGE=5, FORUM_POSTS_PER_PAGE=5, VIEW_COUNTERS={'ENABLED': False})
+class ForumPaginationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="reader", email="reader@example.com")
+        self.client.force_login(self.user)
+        self.category = ForumCategory.objects.create(name="General")
+        self.threads = [
+            ForumThread.objects.create(title=f"t{i}", content="c", category=self.category, created_by=self.user)
+            for i in range(12)
+        ]
+
+    def walk(self, url, key):
+        seen, params, query_counts = [], {}, set()
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            query_counts.add(len(queries))
+            seen += [obj.id for obj in response.context[key]]
+            if not response.context['next_query']:
+                return seen, query_counts
+            params = QueryDict(response.context['next_query'])
+
+    def test_threads_keyset_pages(self):
+        seen, query_counts = self.walk(reverse('forum_main'), 'threads')
+        self.assertEqual(seen, [thread.id for thread in reversed(self.threads)])
+        self.assertEqual(len(query_counts), 1)
+
+    def test_posts_keyset_pages(self):
+        thread = self.threads[0]
+        posts = [ForumPost.objects.create(thread=thread, content="p", created_by=self.user) for _ in range(11)]
+        seen, query_counts = self.walk(reverse('forum_thread', args=[thread.id]), 'posts')
+        self.assertEqual(seen, [post.id for post in posts])
+        self.assertEqual(len(query_counts), 1)
+
+    def test_reply_redirects_to_latest_page(self):
+        thread = self.threads[0]
+        for _ in range(7):
+            ForumPost.objects.create(thread=thread, content="p", created_by=self.user)
+        url = reverse('forum_thread', args=[thread.id])
+        self.assertContains(self.client.get(url), '?page=latest')
+
+        response = self.client.post(url, {'content': 'my reply'})
+        post = ForumPost.objects.get(content='my reply')
+        self.assertRedirects(response, f"{url}?page=latest#post-{post.id}", fetch_redirect_response=False)
+        response = self.client.get(url, {'page': 'latest'})
+        latest = list(thread.posts.order_by('created_at', 'id'))[-5:]
+        self.assertEqual([p.id for p in response.context['posts']], [p.id for p in latest])
+        self.assertContains(response, f'id="post-{post.id}"')
+        self.assertNotContains(response, '?page=latest')
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(reverse('forum_main'), {'cursor': 'nope'}).status_code, 400)
+
+
+class ViewCounterTests(TestCase):
+    def test_concurrent_views_are_not_lost(self):
+        articles = [NewsArticle.objects.create(title=f"a{i}", content="c", category="news") for i in range(3)]
+        counter = ViewCounter(flush_interval=3600)
+
+        def view(article, times):
+            for _ in range(times):
+                counter.add(article)
+
+        workers = [threading.Thread(target=view, args=(article, 50 * (i + 1))) for i, article in enumerate(articles) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(counter.pending(articles[0]), 200)
+
+        with self.assertNumQueries(3 + 2):  # по UPDATE на величину прироста + SAVEPOINT/RELEASE
+            self.assertEqual(counter.flush(), 3)
+        counter.add(articles[0], 5)
+        counter.flush()
+        self.assertEqual([a.views for a in NewsArticle.objects.order_by('pk')], [205, 400, 600])
+
+    @override_settings(VIEW_COUNTERS={'ENABLED': False})
+    def test_news_detail_updates_views_column(self):
+        article = NewsArticle.objects.create(title="a", content="c", category="news")
+        for _ in range(3):
+            response = self.client.get(reverse('news_detail', args=[article.id]))
+        self.assertEqual(response.context['article'].views, 3)
+        article.refresh_from_db()
+        self.assertEqual(article.views, 3)
+
+
+def image_bytes(size, mode='RGB', image_format='JPEG'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 100, 50, 128)[:len(mode)]).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class ResponsiveImageTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, MEDIA_URL='/media/'))
+
+    def save(self, instance):
+        """Сохраняет объект и выполняет поставленные после коммита сборки вариантов в потоке теста"""
+        with mock.patch('main_app.signals.get_executor') as get_executor, self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+        tasks = get_executor.return_value.submit.call_args_list
+        for task in tasks:
+            task.args[0](*task.args[1:])
+        instance.refresh_from_db()
+        return len(tasks)
+
+    def test_variants_are_not_upscaled_and_keep_transparency(self):
+        saved = {}
+        entry = build_variants(image_bytes((800, 400)), 'a/photo.jpg', lambda name, data: saved.setdefault(name, data) and name)
+        self.assertEqual([(v['width'], v['type']) for v in entry['variants']], [
+            (320, 'image/webp'), (320, 'image/jpeg'), (640, 'image/webp'), (640, 'image/jpeg'),
+            (800, 'image/webp'), (800, 'image/jpeg'),
+        ])
+        self.assertTrue(all(name.startswith('a/responsive/photo.') for name in saved))
+        self.assertEqual(Image.open(io.BytesIO(saved[entry['variants'][0]['name']])).size, (320, 160))
+
+        entry = build_variants(image_bytes((300, 300), 'RGBA', 'PNG'), 'sun.png', lambda name, data: name)
+        self.assertEqual([v['type'] for v in entry['variants']], ['image/webp', 'image/png'])
+
+    def test_upload_builds_variants_and_replacing_removes_them(self):
+        member = TeamMember(
+            name="A", role="r", bio="b", skills="s", contributions="c", contact="a@example.com",
+            photo=SimpleUploadedFile('a.jpg', image_bytes((1000, 500))),
+        )
+        self.assertEqual(self.save(member), 1)
+        self.assertEqual(member.photo_variants['source'], member.photo.name)
+        old_files = [v['name'] for v in member.photo_variants['variants']]
+        self.assertTrue(all(os.path.exists(os.path.join(self.media_root, name)) for name in old_files))
+
+        html = Template(
+            "{% load responsive_images %}{% responsive_image member.photo alt='A' variants=member.photo_variants %}"
+        ).render(Context({'member': member}))
+        self.assertIn('<source type="image/webp" srcset="/media/team/responsive/a.320w.', html)
+        self.assertIn(' 640w, ', html)
+
+        # Сохранение без нового файла сборку не ставит
+        self.assertEqual(self.save(member), 0)
+        member.photo = SimpleUploadedFile('b.jpg', image_bytes((400, 400)))
+        self.assertEqual(self.save(member), 1)
+        self.assertEqual([v['width'] for v in member.photo_variants['variants']], [320, 320, 400, 400])
+        self.assertFalse(any(os.path.exists(os.path.join(self.media_root, name)) for name in old_files))
+
+    def test_profile_photo_url_picks_smallest_wide_enough_copy(self):
+        user = CustomUser(
+            username="u", email="u@example.com", profile_photo=SimpleUploadedFile('u.jpg', image_bytes((1000, 1000))),
+        )
+        # До сборки вариантов отдаётся оригинал
+        with mock.patch('main_app.signals.get_executor'):
+            user.save()
+        self.assertEqual(user.get_profile_photo_url(width=128), user.profile_photo.url)
+        self.save(user)
+        self.assertRegex(user.get_profile_photo_url(width=128), r'^/media/profiles/responsive/u\.320w\.\w+\.jpg$')
+        self.assertEqual(user.get_profile_photo_url(), user.profile_photo.url)
@@ -1,30 +1,25 @@
+from django.conf import settings
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from .forms import CustomUserCreationForm, LoginForm, ForumThreadForm, ForumPostForm
 from .models import CustomUser, ForumThread, ForumPost, NewsArticle, TeamMember, ForumCategory
+from .counters import record_view
+from .leaderboard import get_leaderboard
+from drf_server.pagination import keyset_page, last_page, with_cursor
 from rest_framework_simplejwt.tokens import RefreshToken
 import random
 
 def home(request):
-    users = CustomUser.objects.all()[:10]
-    users_with_data = [
-        {
-            'username': user.username,
-            'email': user.email,
-            'border_color': f'hsl({(index * 60) % 360}, 70%, 60%)',
-            'profile_photo': user.profile_photo.url if user.profile_photo else '/static/hackathon/images/default-user.jpg',
-            'stats': {
-                'posts': ForumPost.objects.filter(created_by=user).count(),
-                'threads': ForumThread.objects.filter(created_by=user).count(),
-                'random_delay': random.uniform(0, 2)
-            }
-        }
-        for index, user in enumerate(users)
+    users = [
+        dict(user, stats=dict(user['stats'], random_delay=random.uniform(0, 2)))
+        for user in get_leaderboard()
     ]
     context = {
         'team_members': TeamMember.objects.all(),
-        'users': users_with_data,
+        'users': users,
         'disclaimer': 'NASA does not endorse any non-U.S. Government entity.',
         'user': request.user if request.user.is_authenticated else None,
     }
@@ -74,11 +69,13 @@ def user_profile(request):
 
 @login_required
 def forum_main(request):
-    categories = ForumCategory.objects.all()
-    threads = ForumThread.objects.all().order_by('-created_at')
+    categories = list(ForumCategory.objects.all())
+    threads = ForumThread.objects.select_related('created_by', 'category')
     category_filter = request.GET.get('category', '')
     if category_filter:
-        threads = threads.filter(category__name=category_filter)
+        # Категория ищется среди уже загруженных: фильтр по category_id попадает в индекс (category, created_at)
+        category_ids = [category.id for category in categories if category.name == category_filter]
+        threads = threads.filter(category_id__in=category_ids)
     if request.method == 'POST':
         form = ForumThreadForm(request.POST)
         if form.is_valid():
@@ -88,12 +85,21 @@ def forum_main(request):
             return redirect('forum_main')
     else:
         form = ForumThreadForm()
-    context = {'categories': categories, 'threads': threads, 'form': form}
+    try:
+        threads, next_cursor = keyset_page(threads, request.GET.get('cursor'), settings.FORUM_THREADS_PER_PAGE)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    context = {
+        'categories': categories,
+        'threads': threads,
+        'form': form,
+        'next_query': with_cursor(request, next_cursor) if next_cursor else None,
+    }
     return render(request, 'hackathon/forum.html', context)
 
 @login_required
 def forum_thread(request, thread_id):
-    thread = get_object_or_404(ForumThread, id=thread_id)
+    thread = get_object_or_404(ForumThread.objects.select_related('created_by', 'category'), id=thread_id)
     if request.method == 'POST':
         form = ForumPostForm(request.POST)
         if form.is_valid():
@@ -101,12 +107,31 @@ def forum_thread(request, thread_id):
             post.thread = thread
             post.created_by = request.user
             post.save()
-            thread.views += 1
-            thread.save()
-            return redirect('forum_thread', thread_id=thread_id)
+            # Новый пост - последний в теме: страница latest с якорем на него
+            return redirect(f"{reverse('forum_thread', args=[thread_id])}?page=latest#post-{post.id}")
     else:
         form = ForumPostForm()
-    context = {'thread': thread, 'form': form, 'posts': thread.posts.all()}
+    record_view(thread)
+    # Посты в хронологическом порядке, страницами: длинная тема не рендерится целиком
+    posts_queryset = thread.posts.select_related('created_by')
+    latest = request.GET.get('page') == 'latest'
+    if latest:
+        posts, next_cursor = last_page(posts_queryset, settings.FORUM_POSTS_PER_PAGE), None
+    else:
+        try:
+            posts, next_cursor = keyset_page(
+                posts_queryset, request.GET.get('cursor'), settings.FORUM_POSTS_PER_PAGE, newest_first=False,
+            )
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+    context = {
+        'thread': thread,
+        'form': form,
+        'posts': posts,
+        'is_first_page': not latest and not request.GET.get('cursor'),
+        'is_latest_page': latest or not next_cursor,
+        'next_query': with_cursor(request, next_cursor) if next_cursor else None,
+    }
     return render(request, 'hackathon/forum_thread.html', context)
 
 def news_list(request):
@@ -119,8 +144,7 @@ def news_list(request):
 
 def news_detail(request, news_id):
     article = get_object_or_404(NewsArticle, id=news_id)
-    article.views += 1
-    article.save()
+    record_view(article)
     return render(request, 'hackathon/news_detail.html', {'article': article})
 
 def nasa_analytics(request):